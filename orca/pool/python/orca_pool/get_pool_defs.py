@@ -1,16 +1,27 @@
-import requests
-import re
+import sys
+from pool_registry import OrcaPoolRegistry, DEFAULT_SNAPSHOT_PATH
 
-url = 'https://raw.githubusercontent.com/orca-so/typescript-sdk/main/src/constants/pools.ts'
+# usage:
+#   python get_pool_defs.py --update  # download pools.ts, parse it once and write the snapshot (pool_defs.json)
+#   python get_pool_defs.py           # offline, from the snapshot
+#
+# pool_defs.sample.json only shows the snapshot layout with a few pools, it is not used as the snapshot.
 
-response = requests.get(url)
-typescript_code = response.text
+if '--update' in sys.argv[1:]:
+  registry = OrcaPoolRegistry.fetch()
+  registry.save(DEFAULT_SNAPSHOT_PATH)
+elif not DEFAULT_SNAPSHOT_PATH.exists():
+  sys.exit(f'no snapshot at {DEFAULT_SNAPSHOT_PATH}, run "python get_pool_defs.py --update" first')
+else:
+  registry = OrcaPoolRegistry.load(DEFAULT_SNAPSHOT_PATH)
 
-pattern = re.compile(r'export const (\w+):[^;]+poolTokenMint: new PublicKey\("(\w+)"\)[^;]+addr: new PublicKey\("(\w+)"\)[^;]+addr: new PublicKey\("(\w+)"\)')
-defs = pattern.findall(typescript_code)
+for d in registry:
+  print((d.name, d.pool_token_mint, d.token_a_vault, d.token_b_vault))
 
-for d in defs:
-  print(d)
+# lookup
+# registry.get_by_name('solUsdcPool')
+# registry.get_by_pool_token_mint('APDFRM3HMr8CAGXwKHiu2f5ePSpaiEJhaURwhsRrUUt9')
+# registry.get_by_vault('ANP74VNsHwSrq9uUSjiSNyNWvf6ZPrKTmE4gHoNd13Lg')
 
 """
 OUTPUT:
@@ -0,0 +1,113 @@
+import json
+import re
+from dataclasses import dataclass, astuple, fields
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+POOLS_TS_URL = 'https://raw.githubusercontent.com/orca-so/typescript-sdk/main/src/constants/pools.ts'
+
+# local snapshot, not shipped (create with: python get_pool_defs.py --update)
+DEFAULT_SNAPSHOT_PATH = Path(__file__).with_name('pool_defs.json')
+# a few pools to show the snapshot layout, not a complete pool list
+SAMPLE_SNAPSHOT_PATH = Path(__file__).with_name('pool_defs.sample.json')
+
+# bump when the snapshot layout changes
+SNAPSHOT_VERSION = 1
+
+POOL_DEF_PATTERN = re.compile(r'export const (\w+):[^;]+poolTokenMint: new PublicKey\("(\w+)"\)[^;]+addr: new PublicKey\("(\w+)"\)[^;]+addr: new PublicKey\("(\w+)"\)')
+
+
+@dataclass(frozen=True)
+class OrcaPoolDef:
+  name: str
+  pool_token_mint: str
+  token_a_vault: str
+  token_b_vault: str
+
+
+POOL_DEF_FIELDS = [f.name for f in fields(OrcaPoolDef)]
+
+
+def parse_pools_ts(typescript_code: str) -> List[OrcaPoolDef]:
+  return [OrcaPoolDef(*d) for d in POOL_DEF_PATTERN.findall(typescript_code)]
+
+
+def fetch_pools_ts(url: str = POOLS_TS_URL) -> str:
+  # requests is only needed to update the snapshot
+  import requests
+  response = requests.get(url)
+  response.raise_for_status()
+  return response.text
+
+
+class OrcaPoolRegistry:
+  def __init__(self, pools: List[OrcaPoolDef], source: str = POOLS_TS_URL, index: Optional[Dict[str, Dict[str, int]]] = None):
+    self.pools = pools
+    self.source = source
+    self.index = OrcaPoolRegistry.build_index(pools) if index is None else index
+    self._by_name = {pool.name: pool for pool in pools}
+    self._by_pool_token_mint = {key: pools[i] for key, i in self.index['pool_token_mint'].items()}
+    self._by_vault = {key: pools[i] for key, i in self.index['vault'].items()}
+
+  @staticmethod
+  def build_index(pools: List[OrcaPoolDef]) -> Dict[str, Dict[str, int]]:
+    # key -> position in pools
+    return {
+      'pool_token_mint': {pool.pool_token_mint: i for i, pool in enumerate(pools)},
+      'vault': {vault: i for i, pool in enumerate(pools) for vault in (pool.token_a_vault, pool.token_b_vault)},
+    }
+
+  @staticmethod
+  def from_pools_ts(typescript_code: str, source: str = POOLS_TS_URL) -> "OrcaPoolRegistry":
+    return OrcaPoolRegistry(parse_pools_ts(typescript_code), source)
+
+  @staticmethod
+  def fetch(url: str = POOLS_TS_URL) -> "OrcaPoolRegistry":
+    return OrcaPoolRegistry.from_pools_ts(fetch_pools_ts(url), url)
+
+  @staticmethod
+  def load(path: Path = DEFAULT_SNAPSHOT_PATH) -> "OrcaPoolRegistry":
+    with open(path, 'r') as f:
+      snapshot = json.load(f)
+
+    version = snapshot.get('version')
+    if version != SNAPSHOT_VERSION:
+      raise ValueError(f'unsupported snapshot version: {version} (expected {SNAPSHOT_VERSION})')
+    if snapshot['fields'] != POOL_DEF_FIELDS:
+      raise ValueError(f'unexpected snapshot fields: {snapshot["fields"]}')
+
+    pools = [OrcaPoolDef(*row) for row in snapshot['pools']]
+    # the index is derived from rows, a stale or hand-edited index would return wrong pools
+    index = OrcaPoolRegistry.build_index(pools)
+    if snapshot['index'] != index:
+      raise ValueError('snapshot index does not match pools (regenerate the snapshot)')
+
+    return OrcaPoolRegistry(pools, snapshot['source'], index)
+
+  def save(self, path: Path = DEFAULT_SNAPSHOT_PATH):
+    # rows instead of objects to keep the file compact, the index points into rows
+    snapshot = {
+      'version': SNAPSHOT_VERSION,
+      'source': self.source,
+      'fields': POOL_DEF_FIELDS,
+      'pools': [list(astuple(pool)) for pool in self.pools],
+      'index': self.index,
+    }
+    with open(path, 'w') as f:
+      json.dump(snapshot, f, separators=(',', ':'))
+      f.write('\n')
+
+  def __len__(self) -> int:
+    return len(self.pools)
+
+  def __iter__(self) -> Iterator[OrcaPoolDef]:
+    return iter(self.pools)
+
+  def get_by_name(self, name: str) -> Optional[OrcaPoolDef]:
+    return self._by_name.get(name)
+
+  def get_by_pool_token_mint(self, pool_token_mint: str) -> Optional[OrcaPoolDef]:
+    return self._by_pool_token_mint.get(pool_token_mint)
+
+  def get_by_vault(self, vault: str) -> Optional[OrcaPoolDef]:
+    return self._by_vault.get(vault)
@@ -20,7 +20,7 @@ from solana.publickey import PublicKey
 from solana.keypair import Keypair
 
 # ported functions from whirlpools-sdk and common-sdk
-from whirlpool_essentials import WhirlpoolContext, DecimalUtil, PriceMath, PDAUtil, TokenUtil, TickUtil
+from whirlpool_essentials import WhirlpoolContext, DecimalUtil, PriceMath, PDAUtil, TokenUtil, TickUtil, AccountFetcher, RpcBatchClient
 from whirlpool_essentials.types import Percentage
 from whirlpool_essentials.constants import ORCA_WHIRLPOOL_PROGRAM_ID
 from whirlpool_essentials.instruction import WhirlpoolIx, OpenPositionParams, IncreaseLiquidityParams
@@ -41,14 +41,17 @@ async def main():
     print("wallet pubkey", keypair.public_key)
 
     # create client
+    # independent RPC calls issued concurrently are sent in one JSON-RPC batch request
     connection = AsyncClient(RPC_ENDPOINT_URL)
-    ctx = WhirlpoolContext(ORCA_WHIRLPOOL_PROGRAM_ID, connection, keypair)
+    batch_connection = RpcBatchClient(connection, RPC_ENDPOINT_URL)
+    ctx = WhirlpoolContext(ORCA_WHIRLPOOL_PROGRAM_ID, connection, keypair, AccountFetcher(batch_connection))
 
     # get whirlpool
     whirlpool_pubkey = SOL_USDC_WHIRLPOOL_PUBKEY
     whirlpool = await ctx.fetcher.get_whirlpool(whirlpool_pubkey)
-    decimals_a = (await ctx.fetcher.get_token_mint(whirlpool.token_mint_a)).decimals  # SOL_DECIMAL
-    decimals_b = (await ctx.fetcher.get_token_mint(whirlpool.token_mint_b)).decimals  # USDC_DECIMAL
+    mint_a, mint_b = await ctx.fetcher.list_token_mints([whirlpool.token_mint_a, whirlpool.token_mint_b])
+    decimals_a = mint_a.decimals  # SOL_DECIMAL
+    decimals_b = mint_b.decimals  # USDC_DECIMAL
     print("whirlpool token_mint_a", whirlpool.token_mint_a)
     print("whirlpool token_mint_b", whirlpool.token_mint_b)
     print("whirlpool tick_spacing", whirlpool.tick_spacing)
@@ -84,9 +87,12 @@ async def main():
     print("max_token_a", quote.token_max_a)
     print("max_token_a", quote.token_max_b)
 
-    # get ATA (considering WSOL)
-    token_account_a = await TokenUtil.resolve_or_create_ata(ctx.connection, ctx.wallet.public_key, whirlpool.token_mint_a, quote.token_max_a)
-    token_account_b = await TokenUtil.resolve_or_create_ata(ctx.connection, ctx.wallet.public_key, whirlpool.token_mint_b, quote.token_max_b)
+    # get ATA (considering WSOL) and blockhash in one batch request
+    token_account_a, token_account_b, latest_blockhash = await asyncio.gather(
+        TokenUtil.resolve_or_create_ata(batch_connection, ctx.wallet.public_key, whirlpool.token_mint_a, quote.token_max_a),
+        TokenUtil.resolve_or_create_ata(batch_connection, ctx.wallet.public_key, whirlpool.token_mint_b, quote.token_max_b),
+        batch_connection.get_latest_blockhash(),
+    )
     print("token_account_a", token_account_a.pubkey)
     print("token_account_b", token_account_b.pubkey)
 
@@ -143,9 +149,12 @@ async def main():
     tx.add_instruction(increase_liquidity_ix)
 
     # execute
-    signature = await tx.build_and_execute()
+    signature = await tx.build_and_execute(latest_blockhash.value)
     print("TX signature", signature)
 
+    await batch_connection.close()
+    await connection.close()
+
 asyncio.run(main())
 
 """
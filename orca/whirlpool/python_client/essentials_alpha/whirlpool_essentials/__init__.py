@@ -14,7 +14,9 @@ from .constants import \
 # ported from common-sdk
 from .decimalutil import DecimalUtil
 from .q64fixedpointmath import Q64FixedPointMath
+from .fixedpointmath import FixedPointMath
 from .tokenutil import TokenUtil
+from .wrappedsol import WrappedSolAccountManager
 
 # ported from whirlpools-sdk
 from .context import WhirlpoolContext
@@ -24,6 +26,16 @@ from .pricemath import PriceMath
 from .swaputil import SwapUtil
 from .tickutil import TickUtil
 from .positionutil import PositionUtil
+from .rewardutil import RewardUtil
 from .liquiditymath import LiquidityMath
+from .liquiditydistribution import LiquidityDistribution
 from .accountparser import AccountParser
 from .accountfetcher import AccountFetcher
+from .swaprouter import SwapRouter, Route, RouteHop
+from .poolregistry import PoolRegistry
+from .splitswap import SplitSwapOptimizer, SplitSwapParams, SplitSwapPool, SplitSwapPlan
+
+# connection
+from .connectionpool import ConnectionConfig, EndpointPool, HedgedReadClient
+from .rpcbatch import RpcBatchClient
+from .rentcalculator import RentCalculator
@@ -16,6 +16,10 @@ class AccountFetcher:
         self._connection = connection
         self._cache = {}
 
+    @property
+    def connection(self) -> AsyncClient:
+        return self._connection
+
     async def _get(self, pubkey: PublicKey, parser, refresh: bool):
         key = str(pubkey)
         if not refresh and key in self._cache:
@@ -0,0 +1,186 @@
+import asyncio
+import dataclasses
+import inspect
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+import httpx
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
+from .invariant import invariant
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+T = TypeVar("T")
+
+LATENCY_EWMA_ALPHA = 0.2
+ERROR_PENALTY_SECOND = 5.0
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionConfig:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_second: float = 60.0
+    connect_timeout_second: float = 5.0
+    read_timeout_second: float = 10.0
+    write_timeout_second: float = 10.0
+    pool_timeout_second: float = 5.0
+    http2: bool = True
+    # hedged read: send the same request to the next endpoint if the first one is slow
+    hedge_min_delay_second: float = 0.05
+    hedge_latency_multiplier: float = 2.0
+    max_hedged_requests: int = 2
+
+
+def create_async_client(
+    endpoint: str,
+    config: ConnectionConfig = ConnectionConfig(),
+    commitment: Optional[Commitment] = None,
+) -> AsyncClient:
+    client = AsyncClient(endpoint, commitment, timeout=config.read_timeout_second)
+    # AsyncClient accepts only a timeout, so the default session is replaced with a tuned, pooled (and HTTP/2 if possible) one
+    default_session = client._provider.session
+    client._provider.session = httpx.AsyncClient(
+        http2=config.http2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry_second,
+        ),
+        timeout=httpx.Timeout(
+            connect=config.connect_timeout_second,
+            read=config.read_timeout_second,
+            write=config.write_timeout_second,
+            pool=config.pool_timeout_second,
+        ),
+    )
+    close_session(default_session)
+    return client
+
+
+# tasks closing replaced sessions (the event loop keeps only weak references to tasks)
+_closing_sessions = set()
+
+
+def close_session(session: httpx.AsyncClient):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(session.aclose())
+        return
+    task = loop.create_task(session.aclose())
+    _closing_sessions.add(task)
+    task.add_done_callback(_closing_sessions.discard)
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        endpoints: List[str],
+        config: ConnectionConfig = ConnectionConfig(),
+        commitment: Optional[Commitment] = None,
+    ):
+        invariant(len(endpoints) > 0, "len(endpoints) > 0")
+        self._config = config
+        self._clients = [create_async_client(endpoint, config, commitment) for endpoint in endpoints]
+        # untried endpoints have zero latency, so that every endpoint is measured at least once
+        self._latencies = [0.0] * len(endpoints)
+
+    @property
+    def clients(self) -> List[AsyncClient]:
+        return self._clients
+
+    @property
+    def latencies(self) -> List[float]:
+        return list(self._latencies)
+
+    def ranked(self) -> List[int]:
+        return sorted(range(len(self._clients)), key=lambda i: self._latencies[i])
+
+    def best(self) -> AsyncClient:
+        return self._clients[self.ranked()[0]]
+
+    def record_latency(self, index: int, latency: float):
+        if self._latencies[index] == 0.0:
+            self._latencies[index] = latency
+        else:
+            self._latencies[index] += LATENCY_EWMA_ALPHA * (latency - self._latencies[index])
+
+    async def request(self, call: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        return await self._timed(self.ranked()[0], call)
+
+    async def hedged_request(self, call: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        candidates = self.ranked()[:self._config.max_hedged_requests]
+        first = candidates[0]
+        hedge_delay = max(
+            self._config.hedge_min_delay_second,
+            self._latencies[first] * self._config.hedge_latency_multiplier
+        )
+
+        pending = {asyncio.ensure_future(self._timed(first, call))}
+        waiting = candidates[1:]
+        error = None
+        try:
+            while len(pending) > 0:
+                timeout = hedge_delay if len(waiting) > 0 else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                # slow or failed: hedge to the next endpoint
+                if len(waiting) > 0:
+                    pending.add(asyncio.ensure_future(self._timed(waiting.pop(0), call)))
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed(self, index: int, call: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        try:
+            result = await call(self._clients[index])
+        except asyncio.CancelledError:
+            # cancelled because another endpoint was faster, the elapsed time is not the latency of this endpoint
+            raise
+        except Exception:
+            self.record_latency(index, ERROR_PENALTY_SECOND)
+            raise
+        self.record_latency(index, time.monotonic() - start)
+        return result
+
+    async def close(self):
+        for client in self._clients:
+            await client.close()
+
+
+class HedgedReadClient:
+    # reads used by AccountFetcher are hedged over the endpoints,
+    # other AsyncClient methods (get_epoch_info, send_raw_transaction, ...) go to the fastest endpoint without hedging
+    def __init__(self, pool: EndpointPool):
+        self._pool = pool
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._pool.best(), name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self._pool.request(lambda client: getattr(client, name)(*args, **kwargs))
+        return call
+
+    async def close(self):
+        await self._pool.close()
+
+    async def get_account_info(self, *args, **kwargs):
+        return await self._pool.hedged_request(lambda client: client.get_account_info(*args, **kwargs))
+
+    async def get_multiple_accounts(self, *args, **kwargs):
+        return await self._pool.hedged_request(lambda client: client.get_multiple_accounts(*args, **kwargs))
@@ -17,6 +17,7 @@ MIN_SQRT_PRICE = 4295048016
 MAX_SQRT_PRICE = 79226673515401279992447579055
 
 U64_MAX = 18446744073709551615
+U128_MAX = 340282366920938463463374607431768211455
 
 FEE_RATE_MUL_VALUE = 10**6
 PROTOCOL_FEE_RATE_MUL_VALUE = 10**4
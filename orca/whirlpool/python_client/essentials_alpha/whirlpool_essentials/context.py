@@ -1,7 +1,10 @@
+from typing import List, Optional
 from solana.publickey import PublicKey
 from solana.keypair import Keypair
 from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
 from .accountfetcher import AccountFetcher
+from .connectionpool import ConnectionConfig, EndpointPool, HedgedReadClient
 
 
 class WhirlpoolContext:
@@ -9,14 +12,36 @@ class WhirlpoolContext:
     __connection: AsyncClient
     __wallet: Keypair
     __fetcher: AccountFetcher
+    __endpoint_pool: Optional[EndpointPool]
 
-    def __init__(self, program_id: PublicKey, connection: AsyncClient, wallet: Keypair, fetcher: AccountFetcher = None):
+    def __init__(
+        self,
+        program_id: PublicKey,
+        connection: AsyncClient,
+        wallet: Keypair,
+        fetcher: AccountFetcher = None,
+        endpoint_pool: EndpointPool = None,
+    ):
         if fetcher is None:
             fetcher = AccountFetcher(connection)
         self.__program_id = program_id
         self.__connection = connection
         self.__wallet = wallet
         self.__fetcher = fetcher
+        self.__endpoint_pool = endpoint_pool
+
+    @staticmethod
+    def from_endpoints(
+        program_id: PublicKey,
+        endpoints: List[str],
+        wallet: Keypair,
+        config: ConnectionConfig = ConnectionConfig(),
+        commitment: Optional[Commitment] = None,
+    ) -> "WhirlpoolContext":
+        # account reads are hedged over all endpoints, other requests (including sends) go to the fastest endpoint
+        pool = EndpointPool(endpoints, config, commitment)
+        connection = HedgedReadClient(pool)
+        return WhirlpoolContext(program_id, connection, wallet, AccountFetcher(connection), pool)
 
     @property
     def program_id(self):
@@ -33,3 +58,13 @@ class WhirlpoolContext:
     @property
     def fetcher(self):
         return self.__fetcher
+
+    @property
+    def endpoint_pool(self):
+        return self.__endpoint_pool
+
+    async def close(self):
+        if self.__endpoint_pool is not None:
+            await self.__endpoint_pool.close()
+        else:
+            await self.__connection.close()
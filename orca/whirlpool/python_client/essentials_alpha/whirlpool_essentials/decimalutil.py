@@ -1,24 +1,45 @@
-from decimal import Decimal
+from decimal import Decimal, Context, ROUND_HALF_EVEN
+from functools import lru_cache
 from .constants import U64_MAX
 from .invariant import invariant
 
 
+# local context, so that results don't depend on the caller's Decimal context
+DECIMAL_CONTEXT = Context(prec=100, rounding=ROUND_HALF_EVEN)
+
+
+@lru_cache(maxsize=None)
+def get_quantizer(decimals: int) -> Decimal:
+    return Decimal(1).scaleb(-decimals)
+
+
 class DecimalUtil:
     # https://github.com/orca-so/orca-sdks/blob/main/packages/common-sdk/src/math/decimal-util.ts
     @staticmethod
     def to_u64(num: Decimal, shift: int = 0) -> int:
-        u64 = int(num * 10**shift)
+        u64 = int(DECIMAL_CONTEXT.multiply(num, Decimal(10**shift)))
         invariant(0 <= u64 <= U64_MAX, "0 <= u64 <= U64_MAX")
         return u64
 
     @staticmethod
     def from_u64(u64: int, shift: int = 0) -> Decimal:
         invariant(0 <= u64 <= U64_MAX, "0 <= u64 <= U64_MAX")
-        return Decimal(u64) / Decimal(10**shift)
+        return DECIMAL_CONTEXT.divide(Decimal(u64), Decimal(10**shift))
 
     @staticmethod
     def to_fixed(num: Decimal, decimals: int) -> Decimal:
+        return num.quantize(get_quantizer(decimals), context=DECIMAL_CONTEXT)
+
+    @staticmethod
+    def fraction_to_fixed_str(numerator: int, denominator: int, decimals: int) -> str:
+        # same result as str(to_fixed(Decimal(numerator) / Decimal(denominator), decimals)) with integer math only
+        invariant(numerator >= 0 and denominator > 0, "numerator >= 0 and denominator > 0")
+        q, r = divmod(numerator * 10**decimals, denominator)
+        if r * 2 > denominator or (r * 2 == denominator and q & 1 == 1):
+            q += 1  # ROUND_HALF_EVEN
+
+        digits = str(q)
         if decimals == 0:
-            return num.quantize(Decimal("1"))
-        else:
-            return num.quantize(Decimal("0." + "0"*(decimals-1) + "1"))
+            return digits
+        digits = digits.rjust(decimals + 1, "0")
+        return "{}.{}".format(digits[:-decimals], digits[-decimals:])
@@ -0,0 +1,95 @@
+import math
+from decimal import Decimal
+from fractions import Fraction
+from typing import Tuple, Union
+from .constants import U64_MAX, U128_MAX
+from .invariant import invariant
+
+
+Q64_RESOLUTION = 64
+Q64_ONE = 1 << Q64_RESOLUTION
+Q64_MASK = Q64_ONE - 1
+# 1 / 2^64 = 5^64 / 10^64
+Q64_DECIMAL_FACTOR = 5**Q64_RESOLUTION
+Q128_DECIMAL_FACTOR = 5**(2*Q64_RESOLUTION)
+
+# exact number: int, Fraction or Decimal (float is also accepted, but it is already rounded)
+Number = Union[int, Fraction, Decimal]
+
+
+def _as_integer_ratio(num: Number) -> Tuple[int, int]:
+    if isinstance(num, int):
+        return num, 1
+    numerator, denominator = num.as_integer_ratio()
+    return numerator, denominator
+
+
+def _to_decimal(numerator: int, exponent: int) -> Decimal:
+    # numerator * 10^exponent without any rounding (construction from string is independent from Decimal context)
+    return Decimal("{}E{}".format(numerator, exponent))
+
+
+class FixedPointMath:
+    # integer fixed point math mirroring the on-chain program
+    # https://github.com/orca-so/whirlpools/blob/2c9366a/programs/whirlpool/src/math/bit_math.rs
+    @staticmethod
+    def mul_div(n0: int, n1: int, d: int, round_up: bool = False) -> int:
+        invariant(d != 0, "d != 0")
+        p = n0 * n1
+        result = p // d
+        if round_up and p % d > 0:
+            result += 1
+        invariant(result <= U128_MAX, "mul_div overflow")
+        return result
+
+    @staticmethod
+    def mul_shift_right(n0: int, n1: int, round_up: bool = False) -> int:
+        p = n0 * n1
+        result = p >> Q64_RESOLUTION
+        if round_up and p & Q64_MASK > 0:
+            result += 1
+        invariant(result <= U64_MAX, "mul_shift_right overflow")
+        return result
+
+    @staticmethod
+    def div_round_up_if(n: int, d: int, round_up: bool) -> int:
+        invariant(d != 0, "d != 0")
+        q, r = divmod(n, d)
+        if round_up and r > 0:
+            q += 1
+        return q
+
+    @staticmethod
+    def div_round_up(n: int, d: int) -> int:
+        return FixedPointMath.div_round_up_if(n, d, True)
+
+    @staticmethod
+    def sqrt(n: int, round_up: bool = False) -> int:
+        root = math.isqrt(n)
+        if round_up and root * root < n:
+            root += 1
+        return root
+
+    @staticmethod
+    def sqrt_x64(num_x64: int, round_up: bool = False) -> int:
+        # sqrt(num_x64 / 2^64) * 2^64 = sqrt(num_x64 * 2^64)
+        return FixedPointMath.sqrt(num_x64 << Q64_RESOLUTION, round_up)
+
+    @staticmethod
+    def to_x64(num: Number, round_up: bool = False) -> int:
+        numerator, denominator = _as_integer_ratio(num)
+        return FixedPointMath.div_round_up_if(numerator << Q64_RESOLUTION, denominator, round_up)
+
+    # exact conversions for the display boundary
+    @staticmethod
+    def x64_to_fraction(num_x64: int) -> Fraction:
+        return Fraction(num_x64, Q64_ONE)
+
+    @staticmethod
+    def x64_to_decimal(num_x64: int) -> Decimal:
+        return _to_decimal(num_x64 * Q64_DECIMAL_FACTOR, -Q64_RESOLUTION)
+
+    @staticmethod
+    def x128_to_decimal(num_x128: int, shift: int = 0) -> Decimal:
+        # num / 2^128 * 10^shift
+        return _to_decimal(num_x128 * Q128_DECIMAL_FACTOR, shift - 2*Q64_RESOLUTION)
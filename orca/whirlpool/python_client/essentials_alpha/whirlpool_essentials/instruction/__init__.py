@@ -25,4 +25,6 @@ from .whirlpoolix import (
     SetRewardEmissionsSuperAuthorityParams,
     SwapParams,
     UpdateFeesAndRewardsParams,
-)
\ No newline at end of file
+)
+from .encoder import WhirlpoolIxEncoder
+from .swaptemplate import SwapTemplate
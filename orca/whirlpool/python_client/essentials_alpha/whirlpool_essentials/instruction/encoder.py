@@ -0,0 +1,166 @@
+import struct
+from solana.publickey import PublicKey
+from solana.transaction import TransactionInstruction, AccountMeta
+from spl.token.constants import TOKEN_PROGRAM_ID
+
+
+# precompiled layouts (discriminator + borsh encoded args)
+# - u128 is packed as two little endian u64 (lo, hi)
+# - discriminators are the same as static_client/instructions
+SWAP_DISCRIMINATOR = b"\xf8\xc6\x9e\x91\xe1u\x87\xc8"
+INCREASE_LIQUIDITY_DISCRIMINATOR = b".\x9c\xf3v\r\xcd\xfb\xb2"
+DECREASE_LIQUIDITY_DISCRIMINATOR = b"\xa0&\xd0oh[,\x01"
+
+SWAP_LAYOUT = struct.Struct("<8sQQQQ??")
+MODIFY_LIQUIDITY_LAYOUT = struct.Struct("<8sQQQQ")
+
+U64_MASK = (1 << 64) - 1
+
+def encode_swap_data(
+    amount: int,
+    other_amount_threshold: int,
+    sqrt_price_limit: int,
+    amount_specified_is_input: bool,
+    a_to_b: bool,
+) -> bytes:
+    return SWAP_LAYOUT.pack(
+        SWAP_DISCRIMINATOR,
+        amount,
+        other_amount_threshold,
+        sqrt_price_limit & U64_MASK,
+        sqrt_price_limit >> 64,
+        amount_specified_is_input,
+        a_to_b,
+    )
+
+
+def encode_modify_liquidity_data(
+    discriminator: bytes,
+    liquidity_amount: int,
+    token_amount_a: int,
+    token_amount_b: int,
+) -> bytes:
+    return MODIFY_LIQUIDITY_LAYOUT.pack(
+        discriminator,
+        liquidity_amount & U64_MASK,
+        liquidity_amount >> 64,
+        token_amount_a,
+        token_amount_b,
+    )
+
+
+class WhirlpoolIxEncoder:
+    # byte-identical to static_client/instructions/swap.py
+    @staticmethod
+    def swap(
+        program_id: PublicKey,
+        amount: int,
+        other_amount_threshold: int,
+        sqrt_price_limit: int,
+        amount_specified_is_input: bool,
+        a_to_b: bool,
+        token_authority: PublicKey,
+        whirlpool: PublicKey,
+        token_owner_account_a: PublicKey,
+        token_vault_a: PublicKey,
+        token_owner_account_b: PublicKey,
+        token_vault_b: PublicKey,
+        tick_array_0: PublicKey,
+        tick_array_1: PublicKey,
+        tick_array_2: PublicKey,
+        oracle: PublicKey,
+    ) -> TransactionInstruction:
+        keys = [
+            AccountMeta(TOKEN_PROGRAM_ID, False, False),
+            AccountMeta(token_authority, True, False),
+            AccountMeta(whirlpool, False, True),
+            AccountMeta(token_owner_account_a, False, True),
+            AccountMeta(token_vault_a, False, True),
+            AccountMeta(token_owner_account_b, False, True),
+            AccountMeta(token_vault_b, False, True),
+            AccountMeta(tick_array_0, False, True),
+            AccountMeta(tick_array_1, False, True),
+            AccountMeta(tick_array_2, False, True),
+            AccountMeta(oracle, False, False),
+        ]
+        data = encode_swap_data(amount, other_amount_threshold, sqrt_price_limit, amount_specified_is_input, a_to_b)
+        return TransactionInstruction(keys, program_id, data)
+
+    # byte-identical to static_client/instructions/increase_liquidity.py
+    @staticmethod
+    def increase_liquidity(
+        program_id: PublicKey,
+        liquidity_amount: int,
+        token_max_a: int,
+        token_max_b: int,
+        whirlpool: PublicKey,
+        position_authority: PublicKey,
+        position: PublicKey,
+        position_token_account: PublicKey,
+        token_owner_account_a: PublicKey,
+        token_owner_account_b: PublicKey,
+        token_vault_a: PublicKey,
+        token_vault_b: PublicKey,
+        tick_array_lower: PublicKey,
+        tick_array_upper: PublicKey,
+    ) -> TransactionInstruction:
+        keys = WhirlpoolIxEncoder._modify_liquidity_keys(
+            whirlpool, position_authority, position, position_token_account,
+            token_owner_account_a, token_owner_account_b, token_vault_a, token_vault_b,
+            tick_array_lower, tick_array_upper,
+        )
+        data = encode_modify_liquidity_data(INCREASE_LIQUIDITY_DISCRIMINATOR, liquidity_amount, token_max_a, token_max_b)
+        return TransactionInstruction(keys, program_id, data)
+
+    # byte-identical to static_client/instructions/decrease_liquidity.py
+    @staticmethod
+    def decrease_liquidity(
+        program_id: PublicKey,
+        liquidity_amount: int,
+        token_min_a: int,
+        token_min_b: int,
+        whirlpool: PublicKey,
+        position_authority: PublicKey,
+        position: PublicKey,
+        position_token_account: PublicKey,
+        token_owner_account_a: PublicKey,
+        token_owner_account_b: PublicKey,
+        token_vault_a: PublicKey,
+        token_vault_b: PublicKey,
+        tick_array_lower: PublicKey,
+        tick_array_upper: PublicKey,
+    ) -> TransactionInstruction:
+        keys = WhirlpoolIxEncoder._modify_liquidity_keys(
+            whirlpool, position_authority, position, position_token_account,
+            token_owner_account_a, token_owner_account_b, token_vault_a, token_vault_b,
+            tick_array_lower, tick_array_upper,
+        )
+        data = encode_modify_liquidity_data(DECREASE_LIQUIDITY_DISCRIMINATOR, liquidity_amount, token_min_a, token_min_b)
+        return TransactionInstruction(keys, program_id, data)
+
+    @staticmethod
+    def _modify_liquidity_keys(
+        whirlpool: PublicKey,
+        position_authority: PublicKey,
+        position: PublicKey,
+        position_token_account: PublicKey,
+        token_owner_account_a: PublicKey,
+        token_owner_account_b: PublicKey,
+        token_vault_a: PublicKey,
+        token_vault_b: PublicKey,
+        tick_array_lower: PublicKey,
+        tick_array_upper: PublicKey,
+    ):
+        return [
+            AccountMeta(whirlpool, False, True),
+            AccountMeta(TOKEN_PROGRAM_ID, False, False),
+            AccountMeta(position_authority, True, False),
+            AccountMeta(position, False, True),
+            AccountMeta(position_token_account, False, False),
+            AccountMeta(token_owner_account_a, False, True),
+            AccountMeta(token_owner_account_b, False, True),
+            AccountMeta(token_vault_a, False, True),
+            AccountMeta(token_vault_b, False, True),
+            AccountMeta(tick_array_lower, False, True),
+            AccountMeta(tick_array_upper, False, True),
+        ]
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional, Tuple
+from solana.publickey import PublicKey
+from solana.transaction import TransactionInstruction, AccountMeta
+from spl.token.constants import TOKEN_PROGRAM_ID
+from ..static_client.accounts import Whirlpool
+from ..constants import MAX_SWAP_TICK_ARRAYS
+from ..tickutil import TickUtil
+from ..pdautil import PDAUtil
+from ..swaputil import SwapUtil
+from ..transaction import Instruction
+from ..invariant import invariant
+from .encoder import encode_swap_data
+from .whirlpoolix import to_instruction
+
+
+TICK_ARRAY_KEY_INDEX = 7
+
+
+class SwapTemplate:
+    # accounts of swap instruction are fixed for a given pool, direction and owner.
+    # only instruction data and tick array slots are patched on each build.
+    # NOTE: returned instructions share the keys list while tick arrays are unchanged, do not mutate it.
+    def __init__(
+        self,
+        program_id: PublicKey,
+        whirlpool_pubkey: PublicKey,
+        whirlpool: Whirlpool,
+        a_to_b: bool,
+        token_authority: PublicKey,
+        token_owner_account_a: PublicKey,
+        token_owner_account_b: PublicKey,
+    ):
+        self._program_id = program_id
+        self._whirlpool_pubkey = whirlpool_pubkey
+        self._tick_spacing = whirlpool.tick_spacing
+        self._a_to_b = a_to_b
+        self._tick_array_cache: Dict[int, PublicKey] = {}
+
+        oracle = PDAUtil.get_oracle(program_id, whirlpool_pubkey).pubkey
+        tick_arrays = SwapUtil.get_tick_array_pubkeys(
+            whirlpool.tick_current_index,
+            whirlpool.tick_spacing,
+            a_to_b,
+            program_id,
+            whirlpool_pubkey,
+        )
+        self._tick_arrays = tuple(tick_arrays)
+        self._keys = [
+            AccountMeta(TOKEN_PROGRAM_ID, False, False),
+            AccountMeta(token_authority, True, False),
+            AccountMeta(whirlpool_pubkey, False, True),
+            AccountMeta(token_owner_account_a, False, True),
+            AccountMeta(whirlpool.token_vault_a, False, True),
+            AccountMeta(token_owner_account_b, False, True),
+            AccountMeta(whirlpool.token_vault_b, False, True),
+            AccountMeta(tick_arrays[0], False, True),
+            AccountMeta(tick_arrays[1], False, True),
+            AccountMeta(tick_arrays[2], False, True),
+            AccountMeta(oracle, False, False),
+        ]
+
+    @property
+    def a_to_b(self) -> bool:
+        return self._a_to_b
+
+    @property
+    def tick_arrays(self) -> Tuple[PublicKey, ...]:
+        return self._tick_arrays
+
+    def set_tick_arrays(self, tick_arrays: List[PublicKey]):
+        tick_arrays = tuple(tick_arrays)
+        invariant(len(tick_arrays) == MAX_SWAP_TICK_ARRAYS, "len(tick_arrays) == MAX_SWAP_TICK_ARRAYS")
+        if tick_arrays == self._tick_arrays:
+            return
+
+        keys = list(self._keys)
+        for i, tick_array in enumerate(tick_arrays):
+            keys[TICK_ARRAY_KEY_INDEX + i] = AccountMeta(tick_array, False, True)
+        self._keys = keys
+        self._tick_arrays = tick_arrays
+
+    def update_tick_current_index(self, tick_current_index: int):
+        # same derivation as SwapUtil.get_tick_array_pubkeys, but PDAs are cached per start tick index
+        tick_arrays = []
+        offset = 0
+        for i in range(MAX_SWAP_TICK_ARRAYS):
+            start_tick_index = TickUtil.get_start_tick_index(tick_current_index, self._tick_spacing, offset)
+            tick_arrays.append(self._get_tick_array_pubkey(start_tick_index))
+            offset = (offset - 1) if self._a_to_b else (offset + 1)
+        self.set_tick_arrays(tick_arrays)
+
+    def build_ix(
+        self,
+        amount: int,
+        other_amount_threshold: int,
+        sqrt_price_limit: Optional[int] = None,
+        amount_specified_is_input: bool = True,
+        tick_arrays: Optional[List[PublicKey]] = None,
+    ) -> TransactionInstruction:
+        if tick_arrays is not None:
+            self.set_tick_arrays(tick_arrays)
+        if sqrt_price_limit is None:
+            sqrt_price_limit = SwapUtil.get_default_sqrt_price_limit(self._a_to_b)
+
+        data = encode_swap_data(amount, other_amount_threshold, sqrt_price_limit, amount_specified_is_input, self._a_to_b)
+        return TransactionInstruction(self._keys, self._program_id, data)
+
+    def build(
+        self,
+        amount: int,
+        other_amount_threshold: int,
+        sqrt_price_limit: Optional[int] = None,
+        amount_specified_is_input: bool = True,
+        tick_arrays: Optional[List[PublicKey]] = None,
+    ) -> Instruction:
+        return to_instruction([self.build_ix(
+            amount,
+            other_amount_threshold,
+            sqrt_price_limit,
+            amount_specified_is_input,
+            tick_arrays,
+        )])
+
+    def _get_tick_array_pubkey(self, start_tick_index: int) -> PublicKey:
+        pubkey = self._tick_array_cache.get(start_tick_index)
+        if pubkey is None:
+            pubkey = PDAUtil.get_tick_array(self._program_id, self._whirlpool_pubkey, start_tick_index).pubkey
+            self._tick_array_cache[start_tick_index] = pubkey
+        return pubkey
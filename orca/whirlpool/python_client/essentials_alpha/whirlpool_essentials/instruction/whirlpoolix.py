@@ -12,6 +12,7 @@ from ..static_client import types
 from ..constants import METAPLEX_METADATA_PROGRAM_ID, ORCA_WHIRLPOOL_NFT_UPDATE_AUTHORITY
 from ..types import PDA
 from ..transaction import Instruction
+from .encoder import WhirlpoolIxEncoder
 
 
 def to_instruction(
@@ -290,28 +291,23 @@ class SetRewardEmissionsSuperAuthorityParams:
 class WhirlpoolIx:
     @staticmethod
     def swap(program_id: PublicKey, params: SwapParams):
-        ix = instructions.swap(
-            instructions.SwapArgs(
-                amount=params.amount,
-                other_amount_threshold=params.other_amount_threshold,
-                sqrt_price_limit=params.sqrt_price_limit,
-                amount_specified_is_input=params.amount_specified_is_input,
-                a_to_b=params.a_to_b,
-            ),
-            instructions.SwapAccounts(
-                token_program=TOKEN_PROGRAM_ID,
-                token_authority=params.token_authority,
-                whirlpool=params.whirlpool,
-                token_owner_account_a=params.token_owner_account_a,
-                token_vault_a=params.token_vault_a,
-                token_owner_account_b=params.token_owner_account_b,
-                token_vault_b=params.token_vault_b,
-                tick_array0=params.tick_array_0,
-                tick_array1=params.tick_array_1,
-                tick_array2=params.tick_array_2,
-                oracle=params.oracle,
-            ),
-            program_id
+        ix = WhirlpoolIxEncoder.swap(
+            program_id,
+            amount=params.amount,
+            other_amount_threshold=params.other_amount_threshold,
+            sqrt_price_limit=params.sqrt_price_limit,
+            amount_specified_is_input=params.amount_specified_is_input,
+            a_to_b=params.a_to_b,
+            token_authority=params.token_authority,
+            whirlpool=params.whirlpool,
+            token_owner_account_a=params.token_owner_account_a,
+            token_vault_a=params.token_vault_a,
+            token_owner_account_b=params.token_owner_account_b,
+            token_vault_b=params.token_vault_b,
+            tick_array_0=params.tick_array_0,
+            tick_array_1=params.tick_array_1,
+            tick_array_2=params.tick_array_2,
+            oracle=params.oracle,
         )
         return to_instruction([ix])
 
@@ -371,51 +367,41 @@ class WhirlpoolIx:
 
     @staticmethod
     def increase_liquidity(program_id: PublicKey, params: IncreaseLiquidityParams):
-        ix = instructions.increase_liquidity(
-            instructions.IncreaseLiquidityArgs(
-                liquidity_amount=params.liquidity_amount,
-                token_max_a=params.token_max_a,
-                token_max_b=params.token_max_b,
-            ),
-            instructions.IncreaseLiquidityAccounts(
-                whirlpool=params.whirlpool,
-                token_program=TOKEN_PROGRAM_ID,
-                position_authority=params.position_authority,
-                position=params.position,
-                position_token_account=params.position_token_account,
-                token_owner_account_a=params.token_owner_account_a,
-                token_owner_account_b=params.token_owner_account_b,
-                token_vault_a=params.token_vault_a,
-                token_vault_b=params.token_vault_b,
-                tick_array_lower=params.tick_array_lower,
-                tick_array_upper=params.tick_array_upper,
-            ),
-            program_id
+        ix = WhirlpoolIxEncoder.increase_liquidity(
+            program_id,
+            liquidity_amount=params.liquidity_amount,
+            token_max_a=params.token_max_a,
+            token_max_b=params.token_max_b,
+            whirlpool=params.whirlpool,
+            position_authority=params.position_authority,
+            position=params.position,
+            position_token_account=params.position_token_account,
+            token_owner_account_a=params.token_owner_account_a,
+            token_owner_account_b=params.token_owner_account_b,
+            token_vault_a=params.token_vault_a,
+            token_vault_b=params.token_vault_b,
+            tick_array_lower=params.tick_array_lower,
+            tick_array_upper=params.tick_array_upper,
         )
         return to_instruction([ix])
 
     @staticmethod
     def decrease_liquidity(program_id: PublicKey, params: DecreaseLiquidityParams):
-        ix = instructions.decrease_liquidity(
-            instructions.DecreaseLiquidityArgs(
-                liquidity_amount=params.liquidity_amount,
-                token_min_a=params.token_min_a,
-                token_min_b=params.token_min_b,
-            ),
-            instructions.DecreaseLiquidityAccounts(
-                whirlpool=params.whirlpool,
-                token_program=TOKEN_PROGRAM_ID,
-                position_authority=params.position_authority,
-                position=params.position,
-                position_token_account=params.position_token_account,
-                token_owner_account_a=params.token_owner_account_a,
-                token_owner_account_b=params.token_owner_account_b,
-                token_vault_a=params.token_vault_a,
-                token_vault_b=params.token_vault_b,
-                tick_array_lower=params.tick_array_lower,
-                tick_array_upper=params.tick_array_upper,
-            ),
-            program_id
+        ix = WhirlpoolIxEncoder.decrease_liquidity(
+            program_id,
+            liquidity_amount=params.liquidity_amount,
+            token_min_a=params.token_min_a,
+            token_min_b=params.token_min_b,
+            whirlpool=params.whirlpool,
+            position_authority=params.position_authority,
+            position=params.position,
+            position_token_account=params.position_token_account,
+            token_owner_account_a=params.token_owner_account_a,
+            token_owner_account_b=params.token_owner_account_b,
+            token_vault_a=params.token_vault_a,
+            token_vault_b=params.token_vault_b,
+            tick_array_lower=params.tick_array_lower,
+            tick_array_upper=params.tick_array_upper,
         )
         return to_instruction([ix])
 
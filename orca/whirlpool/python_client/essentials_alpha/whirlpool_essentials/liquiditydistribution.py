@@ -0,0 +1,110 @@
+from typing import List, Optional, Tuple
+from solana.publickey import PublicKey
+from .static_client.accounts import TickArray
+from .constants import TICK_ARRAY_SIZE
+from .invariant import invariant
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class LiquidityDistribution:
+    # active liquidity curve built from the initialized ticks of tick arrays.
+    #
+    # tick_indexes: sorted initialized tick indexes (int64)
+    # liquidity_net: liquidity_net of each tick (object, i128 doesn't fit in int64)
+    # liquidity: active liquidity in [tick_indexes[i], tick_indexes[i+1]) (object, cumulative sum of liquidity_net)
+    #
+    # liquidity below the lowest given tick is assumed to be 0, so all initialized tick arrays of the pool should be given.
+    def __init__(self, tick_spacing: int, tick_arrays: List[TickArray]):
+        invariant(NUMPY_AVAILABLE, "numpy is required for LiquidityDistribution")
+        self._tick_spacing = tick_spacing
+        self._whirlpool: Optional[PublicKey] = None
+
+        tick_arrays = sorted(tick_arrays, key=lambda ta: ta.start_tick_index)
+        for i in range(1, len(tick_arrays)):
+            invariant(tick_arrays[i - 1].start_tick_index != tick_arrays[i].start_tick_index, "duplicated tick array")
+
+        tick_indexes, liquidity_net = [], []
+        for tick_array in tick_arrays:
+            segment_tick_indexes, segment_liquidity_net = self._get_segment(tick_array)
+            tick_indexes.extend(segment_tick_indexes)
+            liquidity_net.extend(segment_liquidity_net)
+
+        self._tick_indexes = np.array(tick_indexes, dtype=np.int64)
+        self._liquidity_net = np.array(liquidity_net, dtype=object)
+        self._liquidity = np.cumsum(self._liquidity_net) if len(liquidity_net) > 0 else np.array([], dtype=object)
+
+    @property
+    def tick_spacing(self) -> int:
+        return self._tick_spacing
+
+    @property
+    def tick_indexes(self) -> "np.ndarray":
+        return self._tick_indexes
+
+    @property
+    def liquidity_net(self) -> "np.ndarray":
+        return self._liquidity_net
+
+    @property
+    def liquidity(self) -> "np.ndarray":
+        return self._liquidity
+
+    def get_liquidity(self, tick_index: int) -> int:
+        # active liquidity while tick_current_index == tick_index
+        i = int(np.searchsorted(self._tick_indexes, tick_index, side="right"))
+        return 0 if i == 0 else self._liquidity[i - 1]
+
+    def get_liquidity_array(self, tick_indexes) -> "np.ndarray":
+        i = np.searchsorted(self._tick_indexes, np.asarray(tick_indexes, dtype=np.int64), side="right")
+        liquidity = np.concatenate((np.array([0], dtype=object), self._liquidity))
+        return liquidity[i]
+
+    def get_prices(self, decimals_a: int, decimals_b: int) -> "np.ndarray":
+        # float64 prices of tick_indexes for charting (use PriceMath for exact prices)
+        return np.power(1.0001, self._tick_indexes.astype(np.float64)) * (10.0 ** (decimals_a - decimals_b))
+
+    def update_tick_array(self, tick_array: TickArray):
+        # replaces (or adds) the ticks of a tick array.
+        # only the ticks of the tick array are re-accumulated, following ticks are shifted by the change of net liquidity.
+        start_tick_index = tick_array.start_tick_index
+        end_tick_index = start_tick_index + TICK_ARRAY_SIZE * self._tick_spacing
+        lo = int(np.searchsorted(self._tick_indexes, start_tick_index, side="left"))
+        hi = int(np.searchsorted(self._tick_indexes, end_tick_index, side="left"))
+
+        segment_tick_indexes, segment_liquidity_net = self._get_segment(tick_array)
+        segment_liquidity_net = np.array(segment_liquidity_net, dtype=object)
+
+        base = 0 if lo == 0 else self._liquidity[lo - 1]
+        delta = int(segment_liquidity_net.sum()) - int(self._liquidity_net[lo:hi].sum())
+        segment_liquidity = base + np.cumsum(segment_liquidity_net) if len(segment_liquidity_net) > 0 else segment_liquidity_net
+
+        tail_liquidity = self._liquidity[hi:]
+        if delta != 0:
+            tail_liquidity = tail_liquidity + delta
+
+        self._tick_indexes = np.concatenate((
+            self._tick_indexes[:lo],
+            np.array(segment_tick_indexes, dtype=np.int64),
+            self._tick_indexes[hi:],
+        ))
+        self._liquidity_net = np.concatenate((self._liquidity_net[:lo], segment_liquidity_net, self._liquidity_net[hi:]))
+        self._liquidity = np.concatenate((self._liquidity[:lo], segment_liquidity, tail_liquidity))
+
+    def _get_segment(self, tick_array: TickArray) -> Tuple[List[int], List[int]]:
+        if self._whirlpool is None:
+            self._whirlpool = tick_array.whirlpool
+        invariant(tick_array.whirlpool == self._whirlpool, "tick arrays of different whirlpools")
+
+        tick_indexes, liquidity_net = [], []
+        start_tick_index = tick_array.start_tick_index
+        for i, tick in enumerate(tick_array.ticks):
+            if not tick.initialized:
+                continue
+            tick_indexes.append(start_tick_index + i * self._tick_spacing)
+            liquidity_net.append(tick.liquidity_net)
+        return tick_indexes, liquidity_net
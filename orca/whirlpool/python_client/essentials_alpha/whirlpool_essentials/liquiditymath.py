@@ -1,9 +1,26 @@
-import math
-from decimal import Decimal
 from .types import TokenAmounts
+from .fixedpointmath import FixedPointMath, Q64_ONE
 from .invariant import invariant
 
 
+# integer only, same as get_amount_delta_a/b of the on-chain program
+# https://github.com/orca-so/whirlpools/blob/2c9366a/programs/whirlpool/src/math/token_math.rs
+def get_amount_delta_a(sqrt_price_x64_0: int, sqrt_price_x64_1: int, liquidity: int, round_up: bool) -> int:
+    # a = L * x64 * (large - small) / (small * large)
+    small_sqrt_price_x64, large_sqrt_price_x64 = min(sqrt_price_x64_0, sqrt_price_x64_1), max(sqrt_price_x64_0, sqrt_price_x64_1)
+    return FixedPointMath.mul_div(
+        liquidity << 64,
+        large_sqrt_price_x64 - small_sqrt_price_x64,
+        small_sqrt_price_x64 * large_sqrt_price_x64,
+        round_up,
+    )
+
+
+def get_amount_delta_b(sqrt_price_x64_0: int, sqrt_price_x64_1: int, liquidity: int, round_up: bool) -> int:
+    # b = L * (large - small) / x64
+    return FixedPointMath.mul_div(liquidity, abs(sqrt_price_x64_1 - sqrt_price_x64_0), Q64_ONE, round_up)
+
+
 class LiquidityMath:
     # https://orca-so.github.io/whirlpools/classes/PoolUtil.html#getTokenAmountsFromLiquidity
     # https://github.com/orca-so/whirlpools/blob/7b9ec35/sdk/src/utils/public/pool-utils.ts#L84
@@ -16,20 +33,11 @@ class LiquidityMath:
         round_up: bool
     ) -> TokenAmounts:
         invariant(sqrt_price_x64_lower < sqrt_price_x64_upper, "sqrt_price_x64_lower < sqrt_price_x64_upper")
-
-        liq = Decimal(liquidity)
-        lower = Decimal(sqrt_price_x64_lower)
-        upper = Decimal(sqrt_price_x64_upper)
-        current = min(max(Decimal(sqrt_price_x64_current), lower), upper)  # bounded
-
-        shift_64 = Decimal(2)**64
-        token_a = liq * shift_64 * (upper - current) / (current * upper)
-        token_b = liq * (current - lower) / shift_64
-
-        if round_up:
-            return TokenAmounts(int(math.ceil(token_a)), int(math.ceil(token_b)))
-        else:
-            return TokenAmounts(int(math.floor(token_a)), int(math.floor(token_b)))
+        current = min(max(sqrt_price_x64_current, sqrt_price_x64_lower), sqrt_price_x64_upper)  # bounded
+        return TokenAmounts(
+            get_amount_delta_a(current, sqrt_price_x64_upper, liquidity, round_up),
+            get_amount_delta_b(sqrt_price_x64_lower, current, liquidity, round_up),
+        )
 
     @staticmethod
     def get_token_a_from_liquidity(
@@ -39,13 +47,9 @@ class LiquidityMath:
         sqrt_price_x64_upper: int,
         round_up: bool
     ) -> int:
-        return LiquidityMath.get_token_amounts_from_liquidity(
-            liquidity,
-            sqrt_price_x64_current,
-            sqrt_price_x64_lower,
-            sqrt_price_x64_upper,
-            round_up
-        ).token_a
+        invariant(sqrt_price_x64_lower < sqrt_price_x64_upper, "sqrt_price_x64_lower < sqrt_price_x64_upper")
+        current = min(max(sqrt_price_x64_current, sqrt_price_x64_lower), sqrt_price_x64_upper)  # bounded
+        return get_amount_delta_a(current, sqrt_price_x64_upper, liquidity, round_up)
 
     @staticmethod
     def get_token_b_from_liquidity(
@@ -55,13 +59,9 @@ class LiquidityMath:
             sqrt_price_x64_upper: int,
             round_up: bool
     ) -> int:
-        return LiquidityMath.get_token_amounts_from_liquidity(
-            liquidity,
-            sqrt_price_x64_current,
-            sqrt_price_x64_lower,
-            sqrt_price_x64_upper,
-            round_up
-        ).token_b
+        invariant(sqrt_price_x64_lower < sqrt_price_x64_upper, "sqrt_price_x64_lower < sqrt_price_x64_upper")
+        current = min(max(sqrt_price_x64_current, sqrt_price_x64_lower), sqrt_price_x64_upper)  # bounded
+        return get_amount_delta_b(sqrt_price_x64_lower, current, liquidity, round_up)
 
     # https://github.com/orca-so/whirlpools/blob/7b9ec35/sdk/src/utils/public/pool-utils.ts#L237
     @staticmethod
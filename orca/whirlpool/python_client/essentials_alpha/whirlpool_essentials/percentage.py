@@ -1,15 +1,58 @@
+import math
 from decimal import Decimal
-from fractions import Fraction
+from functools import lru_cache
+from typing import Sequence, Union
 from .constants import U64_MAX
 from .invariant import invariant
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+PERCENTAGE_DECIMALS = 4
+PERCENTAGE_SCALE = 10**PERCENTAGE_DECIMALS
+PERCENTAGE_CACHE_SIZE = 1024
+
+# list of int, or numpy.ndarray of uint64 (returned as the same type)
+Amounts = Union[Sequence[int], "np.ndarray"]
+
+
+def mul_div_floor_array(amounts: Amounts, mul: int, div: int) -> Amounts:
+    if NUMPY_AVAILABLE and isinstance(amounts, np.ndarray):
+        if mul == 0:
+            return np.zeros_like(amounts)
+        # amount * mul // div = q * mul + r * mul // div (amount = q * div + r), without 128 bit intermediates
+        fits_u64 = div * mul <= U64_MAX and (len(amounts) == 0 or int(amounts.max()) <= U64_MAX // mul * div)
+        if fits_u64:
+            amounts = amounts.astype(np.uint64, copy=False)
+            mul_u64, div_u64 = np.uint64(mul), np.uint64(div)
+            q, r = np.divmod(amounts, div_u64)
+            return q * mul_u64 + r * mul_u64 // div_u64
+        return np.array([amount * mul // div for amount in amounts.tolist()], dtype=object)
+    return [amount * mul // div for amount in amounts]
+
 
 class Percentage:
+    # immutable, because instances are cached and shared by from_fraction and from_percentage
+    __slots__ = ("numerator", "denominator")
+
     def __init__(self, numerator: int, denominator: int):
         invariant(0 <= numerator <= U64_MAX, "0 <= numerator <= U64_MAX")
         invariant(0 <= denominator <= U64_MAX, "0 <= denominator <= U64_MAX")
-        self.numerator = numerator
-        self.denominator = denominator
+        object.__setattr__(self, "numerator", numerator)
+        object.__setattr__(self, "denominator", denominator)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Percentage is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Percentage is immutable")
+
+    def __reduce__(self):
+        return Percentage, (self.numerator, self.denominator)
 
     def __str__(self):
         return "{}/{}".format(self.numerator, self.denominator)
@@ -25,14 +68,34 @@ class Percentage:
     def adjust_sub(self, num: int) -> int:
         return num * (self.denominator - self.numerator) // self.denominator
 
+    def adjust_add_array(self, nums: Amounts) -> Amounts:
+        return mul_div_floor_array(nums, self.numerator + self.denominator, self.denominator)
+
+    def adjust_sub_array(self, nums: Amounts) -> Amounts:
+        return mul_div_floor_array(nums, self.denominator - self.numerator, self.denominator)
+
     @staticmethod
+    @lru_cache(maxsize=PERCENTAGE_CACHE_SIZE)
     def from_fraction(numerator: int, denominator: int) -> "Percentage":
         return Percentage(numerator, denominator)
 
     @staticmethod
-    def from_percentage(percentage: str) -> "Percentage":
-        d = Decimal(percentage)
-        invariant(d == 0 or Decimal("0.0001") <= d <= Decimal("100"))
+    @lru_cache(maxsize=PERCENTAGE_CACHE_SIZE)
+    def from_percentage(percentage: Union[str, Decimal, int]) -> "Percentage":
+        scaled, scale = None, None
+        if isinstance(percentage, str):
+            # parse "12.3456" without Decimal
+            whole, _, fraction = percentage.strip().partition(".")
+            if (whole + fraction).isdigit():
+                scale = 10**len(fraction)
+                scaled = int(whole + fraction)
+        if scaled is None:
+            # Decimal, int and other notations ("1e-2", "-1", ...)
+            scaled, scale = Decimal(percentage).as_integer_ratio()
+        invariant(scaled == 0 or scale <= scaled * PERCENTAGE_SCALE and scaled <= 100 * scale)
 
-        f = Fraction(int(d * 10000), 100*10000)
-        return Percentage(f.numerator, f.denominator)
+        # truncate to PERCENTAGE_DECIMALS
+        numerator = scaled * PERCENTAGE_SCALE // scale
+        denominator = 100 * PERCENTAGE_SCALE
+        gcd = math.gcd(numerator, denominator)
+        return Percentage(numerator // gcd, denominator // gcd)
@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional, Set, Tuple
+from solana.publickey import PublicKey
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import MemcmpOpts
+from .static_client.accounts import Whirlpool
+from .constants import ORCA_WHIRLPOOL_PROGRAM_ID, ORCA_WHIRLPOOLS_CONFIG
+from .accountfetcher import AccountFetcher
+from .accountparser import AccountParser
+
+
+WHIRLPOOL_ACCOUNT_SIZE = 8 + Whirlpool.layout.sizeof()
+# whirlpools_config is the first field after the discriminator
+WHIRLPOOLS_CONFIG_OFFSET = 8
+
+PairKey = Tuple[PublicKey, PublicKey]
+
+
+def get_pair_key(mint_x: PublicKey, mint_y: PublicKey) -> PairKey:
+    # the order of mints doesn't matter for lookups
+    return (mint_x, mint_y) if bytes(mint_x) <= bytes(mint_y) else (mint_y, mint_x)
+
+
+class PoolRegistry:
+    # index of whirlpools by token pair, tick_spacing, fee_rate and token.
+    #
+    # every lookup is a dict access. the index is updated per whirlpool (update/remove),
+    # so the registry can be kept fresh by refreshing only the changed whirlpools.
+    def __init__(self, whirlpools: Optional[Dict[PublicKey, Whirlpool]] = None):
+        self._whirlpools: Dict[PublicKey, Whirlpool] = {}
+        self._by_pair: Dict[PairKey, Set[PublicKey]] = {}
+        self._by_tick_spacing: Dict[Tuple[PairKey, int], Set[PublicKey]] = {}
+        self._by_fee_rate: Dict[Tuple[PairKey, int], Set[PublicKey]] = {}
+        self._by_token: Dict[PublicKey, Set[PublicKey]] = {}
+        if whirlpools is not None:
+            for pubkey, whirlpool in whirlpools.items():
+                self.update(pubkey, whirlpool)
+
+    @staticmethod
+    async def load(
+        connection: AsyncClient,
+        program_id: PublicKey = ORCA_WHIRLPOOL_PROGRAM_ID,
+        whirlpools_config: Optional[PublicKey] = ORCA_WHIRLPOOLS_CONFIG,
+    ) -> "PoolRegistry":
+        registry = PoolRegistry()
+        await registry.load_snapshot(connection, program_id, whirlpools_config)
+        return registry
+
+    async def load_snapshot(
+        self,
+        connection: AsyncClient,
+        program_id: PublicKey = ORCA_WHIRLPOOL_PROGRAM_ID,
+        whirlpools_config: Optional[PublicKey] = ORCA_WHIRLPOOLS_CONFIG,
+    ):
+        # one getProgramAccounts call for all whirlpools (of the whirlpools_config if given)
+        filters = [WHIRLPOOL_ACCOUNT_SIZE]
+        if whirlpools_config is not None:
+            filters.append(MemcmpOpts(offset=WHIRLPOOLS_CONFIG_OFFSET, bytes=str(whirlpools_config)))
+        res = await connection.get_program_accounts(program_id, encoding="base64", filters=filters)
+
+        fetched = set()
+        for keyed_account in res.value:
+            whirlpool = AccountParser.parse_whirlpool(keyed_account.account.data)
+            if whirlpool is None:
+                continue
+            pubkey = PublicKey(bytes(keyed_account.pubkey))
+            fetched.add(pubkey)
+            self.update(pubkey, whirlpool)
+
+        # closed accounts (not expected for whirlpools, but keep the index consistent with the snapshot)
+        for pubkey in list(self._whirlpools.keys()):
+            if pubkey not in fetched:
+                self.remove(pubkey)
+
+    async def refresh(self, fetcher: AccountFetcher, pubkeys: Optional[List[PublicKey]] = None):
+        # refetch only the given whirlpools (all registered whirlpools if None)
+        pubkeys = list(self._whirlpools.keys()) if pubkeys is None else pubkeys
+        whirlpools = await fetcher.list_whirlpools(pubkeys, True)
+        for pubkey, whirlpool in zip(pubkeys, whirlpools):
+            if whirlpool is None:
+                self.remove(pubkey)
+            else:
+                self.update(pubkey, whirlpool)
+
+    def update(self, pubkey: PublicKey, whirlpool: Whirlpool):
+        prev = self._whirlpools.get(pubkey)
+        if prev is not None:
+            # fee_rate can be changed, other keys are fixed at initialization
+            if prev.fee_rate == whirlpool.fee_rate:
+                self._whirlpools[pubkey] = whirlpool
+                return
+            self._unindex(pubkey, prev)
+        self._whirlpools[pubkey] = whirlpool
+        self._index(pubkey, whirlpool)
+
+    def remove(self, pubkey: PublicKey):
+        whirlpool = self._whirlpools.pop(pubkey, None)
+        if whirlpool is not None:
+            self._unindex(pubkey, whirlpool)
+
+    def __len__(self) -> int:
+        return len(self._whirlpools)
+
+    def __contains__(self, pubkey: PublicKey) -> bool:
+        return pubkey in self._whirlpools
+
+    @property
+    def whirlpools(self) -> Dict[PublicKey, Whirlpool]:
+        return self._whirlpools
+
+    def get_whirlpool(self, pubkey: PublicKey) -> Optional[Whirlpool]:
+        return self._whirlpools.get(pubkey)
+
+    def get_pools_by_pair(self, mint_x: PublicKey, mint_y: PublicKey) -> Dict[PublicKey, Whirlpool]:
+        return self._select(self._by_pair.get(get_pair_key(mint_x, mint_y)))
+
+    def get_pools_by_tick_spacing(self, mint_x: PublicKey, mint_y: PublicKey, tick_spacing: int) -> Dict[PublicKey, Whirlpool]:
+        return self._select(self._by_tick_spacing.get((get_pair_key(mint_x, mint_y), tick_spacing)))
+
+    def get_pools_by_fee_rate(self, mint_x: PublicKey, mint_y: PublicKey, fee_rate: int) -> Dict[PublicKey, Whirlpool]:
+        return self._select(self._by_fee_rate.get((get_pair_key(mint_x, mint_y), fee_rate)))
+
+    def get_pools_by_token(self, mint: PublicKey) -> Dict[PublicKey, Whirlpool]:
+        return self._select(self._by_token.get(mint))
+
+    def _select(self, pubkeys: Optional[Set[PublicKey]]) -> Dict[PublicKey, Whirlpool]:
+        if pubkeys is None:
+            return {}
+        return {pubkey: self._whirlpools[pubkey] for pubkey in pubkeys}
+
+    def _keys(self, whirlpool: Whirlpool):
+        pair_key = get_pair_key(whirlpool.token_mint_a, whirlpool.token_mint_b)
+        return (
+            (self._by_pair, pair_key),
+            (self._by_tick_spacing, (pair_key, whirlpool.tick_spacing)),
+            (self._by_fee_rate, (pair_key, whirlpool.fee_rate)),
+            (self._by_token, whirlpool.token_mint_a),
+            (self._by_token, whirlpool.token_mint_b),
+        )
+
+    def _index(self, pubkey: PublicKey, whirlpool: Whirlpool):
+        for index, key in self._keys(whirlpool):
+            index.setdefault(key, set()).add(pubkey)
+
+    def _unindex(self, pubkey: PublicKey, whirlpool: Whirlpool):
+        for index, key in self._keys(whirlpool):
+            pubkeys = index.get(key)
+            if pubkeys is None:
+                continue
+            pubkeys.discard(pubkey)
+            if len(pubkeys) == 0:
+                del index[key]
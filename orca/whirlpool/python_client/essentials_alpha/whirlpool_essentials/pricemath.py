@@ -1,9 +1,14 @@
 import math
-from decimal import Decimal
-from .q64fixedpointmath import Q64FixedPointMath
+from decimal import Decimal, Context, ROUND_CEILING
+from .fixedpointmath import FixedPointMath
+from .decimalutil import DecimalUtil, DECIMAL_CONTEXT
 from .tickutil import TickUtil
 
 
+# rounded up, so that price_to_sqrt_price_x64 (floor) maps the price back to the same sqrt_price
+PRICE_CONTEXT = Context(prec=DECIMAL_CONTEXT.prec, rounding=ROUND_CEILING)
+
+
 def mul_shift(a: int, b: int, shift: int) -> int:
     return (a * b) >> shift
 
@@ -87,9 +92,27 @@ class PriceMath:
     # https://github.com/orca-so/whirlpools/blob/main/sdk/src/utils/public/price-math.ts#L22
     @staticmethod
     def sqrt_price_x64_to_price(sqrt_price_x64: int, decimals_a: int, decimals_b: int) -> Decimal:
-        decimal_adjust = Decimal(10)**(decimals_a - decimals_b)
-        price = Q64FixedPointMath.from_x64(sqrt_price_x64) ** 2 * decimal_adjust
-        return price
+        # sqrt_price_x64^2 / 2^128 * 10^(decimals_a - decimals_b) with DECIMAL_CONTEXT precision
+        numerator = sqrt_price_x64**2
+        denominator = 1 << 128
+        decimals_diff = decimals_a - decimals_b
+        if decimals_diff >= 0:
+            numerator *= 10**decimals_diff
+        else:
+            denominator *= 10**(-decimals_diff)
+        return PRICE_CONTEXT.divide(Decimal(numerator), Decimal(denominator))
+
+    @staticmethod
+    def sqrt_price_x64_to_price_str(sqrt_price_x64: int, decimals_a: int, decimals_b: int, decimals: int) -> str:
+        # fast path for display: str(DecimalUtil.to_fixed(sqrt_price_x64_to_price(...), decimals)) without Decimal
+        numerator = sqrt_price_x64**2
+        denominator = 1 << 128
+        decimals_diff = decimals_a - decimals_b
+        if decimals_diff >= 0:
+            numerator *= 10**decimals_diff
+        else:
+            denominator *= 10**(-decimals_diff)
+        return DecimalUtil.fraction_to_fixed_str(numerator, denominator, decimals)
 
     # https://orca-so.github.io/whirlpools/classes/PriceMath.html#sqrtPriceX64ToTickIndex
     # https://github.com/orca-so/whirlpools/blob/2df89bb/sdk/src/utils/public/price-math.ts#L49
@@ -129,8 +152,14 @@ class PriceMath:
     # https://github.com/orca-so/whirlpools/blob/7b9ec35/sdk/src/utils/public/price-math.ts#L18
     @staticmethod
     def price_to_sqrt_price_x64(price: Decimal, decimals_a: int, decimals_b: int) -> int:
-        decimal_adjust = Decimal(10)**(decimals_a - decimals_b)
-        return Q64FixedPointMath.to_x64((price / decimal_adjust).sqrt())
+        # floor(sqrt(price / 10^(decimals_a - decimals_b)) * 2^64) = isqrt(floor(price * 2^128 / 10^(decimals_a - decimals_b)))
+        numerator, denominator = price.as_integer_ratio()
+        decimals_diff = decimals_a - decimals_b
+        if decimals_diff >= 0:
+            denominator *= 10**decimals_diff
+        else:
+            numerator *= 10**(-decimals_diff)
+        return FixedPointMath.sqrt((numerator << 128) // denominator)
 
     # https://orca-so.github.io/whirlpools/classes/PriceMath.html#priceToTickIndex
     # https://github.com/orca-so/whirlpools/blob/7b9ec35/sdk/src/utils/public/price-math.ts#L109
@@ -1,14 +1,12 @@
-import math
 from decimal import Decimal
+from .fixedpointmath import FixedPointMath
 
 
 class Q64FixedPointMath:
     @staticmethod
     def to_x64(num: Decimal) -> int:
-        shift_64 = Decimal(2)**64
-        return math.floor(num * shift_64)
+        return FixedPointMath.to_x64(num)
 
     @staticmethod
     def from_x64(num: int) -> Decimal:
-        shift_64 = Decimal(2)**64
-        return Decimal(num) / shift_64
+        return FixedPointMath.x64_to_decimal(num)
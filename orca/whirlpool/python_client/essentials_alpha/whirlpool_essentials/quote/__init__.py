@@ -1,3 +1,7 @@
-from .increase_liquidity import IncreaseLiquidityQuote, IncreaseLiquidityQuoteParams
-from .decrease_liquidity import DecreaseLiquidityQuote, DecreaseLiquidityQuoteParams
+from .increase_liquidity import IncreaseLiquidityQuote, IncreaseLiquidityQuoteParams, IncreaseLiquidityBatchQuoteParams
+from .decrease_liquidity import DecreaseLiquidityQuote, DecreaseLiquidityQuoteParams, DecreaseLiquidityBatchQuoteParams
+from .rangeoptimizer import RangeOptimizer, RangeOptimizerParams, RangeCandidate, RangeObjective
+from .swap import SwapQuote, SwapQuoteParams, SwapTickSequenceExhaustedError
+from .depositplanner import DepositPlanner, DepositPlannerParams, DepositPlan
+from .collect import CollectFeesQuote, CollectFeesQuoteParams, CollectRewardsQuote, CollectRewardsQuoteParams, CollectQuote, CollectBatchQuoteParams
 from .quotebuilder import QuoteBuilder
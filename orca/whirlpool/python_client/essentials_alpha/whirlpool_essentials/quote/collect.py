@@ -0,0 +1,220 @@
+# https://github.com/orca-so/whirlpools/blob/main/sdk/src/quotes/public/collect-fees-quote.ts
+# https://github.com/orca-so/whirlpools/blob/main/sdk/src/quotes/public/collect-rewards-quote.ts
+# https://github.com/orca-so/whirlpools/blob/main/programs/whirlpool/src/manager/tick_manager.rs
+
+import dataclasses
+from typing import Dict, List, Optional, Tuple
+from ..static_client.accounts import Whirlpool, Position, TickArray
+from ..static_client.types import Tick
+from ..invariant import invariant
+from ..constants import NUM_REWARDS, U64_MAX, U128_MAX
+from ..tickutil import TickUtil
+from ..poolutil import PoolUtil
+from ..rewardutil import RewardUtil
+
+
+@dataclasses.dataclass(frozen=True)
+class CollectFeesQuoteParams:
+    whirlpool: Whirlpool
+    position: Position
+    tick_lower: Tick
+    tick_upper: Tick
+
+
+@dataclasses.dataclass(frozen=True)
+class CollectRewardsQuoteParams:
+    whirlpool: Whirlpool
+    position: Position
+    tick_lower: Tick
+    tick_upper: Tick
+    # project rewards to this unix timestamp (None: reward_last_updated_timestamp of the whirlpool)
+    timestamp: Optional[int] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class CollectBatchQuoteParams:
+    # all positions must belong to the whirlpool
+    whirlpool: Whirlpool
+    positions: List[Position]
+    # cached tick arrays containing the boundary ticks of the positions (order doesn't matter)
+    tick_arrays: List[TickArray]
+    # project rewards to this unix timestamp (None: reward_last_updated_timestamp of the whirlpool)
+    timestamp: Optional[int] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class CollectFeesQuote:
+    fee_owed_a: int
+    fee_owed_b: int
+
+
+@dataclasses.dataclass(frozen=True)
+class CollectRewardsQuote:
+    # None if the reward is not initialized
+    reward_owed: List[Optional[int]]
+
+
+@dataclasses.dataclass(frozen=True)
+class CollectQuote:
+    fees: CollectFeesQuote
+    rewards: CollectRewardsQuote
+
+
+def collect_fees_quote_with_params(params: CollectFeesQuoteParams) -> CollectFeesQuote:
+    growths_inside = get_growths_inside(
+        get_growths_global(params.whirlpool),
+        params.whirlpool.tick_current_index,
+        params.position.tick_lower_index,
+        params.tick_lower,
+        params.position.tick_upper_index,
+        params.tick_upper,
+    )
+    return collect_fees_quote_core(params.position, growths_inside)
+
+
+def collect_rewards_quote_with_params(params: CollectRewardsQuoteParams) -> CollectRewardsQuote:
+    whirlpool = get_whirlpool_at(params.whirlpool, params.timestamp)
+    growths_inside = get_growths_inside(
+        get_growths_global(whirlpool),
+        whirlpool.tick_current_index,
+        params.position.tick_lower_index,
+        params.tick_lower,
+        params.position.tick_upper_index,
+        params.tick_upper,
+    )
+    return collect_rewards_quote_core(whirlpool, params.position, growths_inside)
+
+
+def collect_quote_batch_with_params(params: CollectBatchQuoteParams) -> List[CollectQuote]:
+    whirlpool = get_whirlpool_at(params.whirlpool, params.timestamp)
+    tick_spacing = whirlpool.tick_spacing
+    tick_current_index = whirlpool.tick_current_index
+    growths_global = get_growths_global(whirlpool)
+
+    tick_arrays = {}
+    for tick_array in params.tick_arrays:
+        tick_arrays[tick_array.start_tick_index] = tick_array
+
+    # positions often share boundary ticks, so growths below/above are calculated once per tick
+    growths_below = {}
+    growths_above = {}
+
+    quotes = []
+    for position in params.positions:
+        tick_lower_index = position.tick_lower_index
+        tick_upper_index = position.tick_upper_index
+
+        growth_below = growths_below.get(tick_lower_index)
+        if growth_below is None:
+            tick_lower = get_tick(tick_arrays, tick_lower_index, tick_spacing, position)
+            growth_below = get_growths_below(growths_global, tick_current_index, tick_lower_index, tick_lower)
+            growths_below[tick_lower_index] = growth_below
+
+        growth_above = growths_above.get(tick_upper_index)
+        if growth_above is None:
+            tick_upper = get_tick(tick_arrays, tick_upper_index, tick_spacing, position)
+            growth_above = get_growths_above(growths_global, tick_current_index, tick_upper_index, tick_upper)
+            growths_above[tick_upper_index] = growth_above
+
+        growths_inside = get_growths_inside_from_below_above(growths_global, growth_below, growth_above)
+        quotes.append(CollectQuote(
+            fees=collect_fees_quote_core(position, growths_inside),
+            rewards=collect_rewards_quote_core(whirlpool, position, growths_inside),
+        ))
+    return quotes
+
+
+def get_whirlpool_at(whirlpool: Whirlpool, timestamp: Optional[int]) -> Whirlpool:
+    # fee growths are not affected, only reward growths are advanced
+    return whirlpool if timestamp is None else RewardUtil.get_whirlpool_at(whirlpool, timestamp)
+
+
+def get_tick(tick_arrays: Dict[int, TickArray], tick_index: int, tick_spacing: int, position: Position) -> Tick:
+    start_tick_index = TickUtil.get_start_tick_index(tick_index, tick_spacing)
+    tick_array = tick_arrays.get(start_tick_index)
+    invariant(tick_array is not None, "tick array {} is not given".format(start_tick_index))
+    invariant(tick_array.whirlpool == position.whirlpool, "tick_array.whirlpool == position.whirlpool")
+    return tick_array.ticks[(tick_index - start_tick_index) // tick_spacing]
+
+
+# growths are stored as a tuple of (fee_a, fee_b, reward_0, reward_1, reward_2)
+Growths = Tuple[int, ...]
+
+
+def get_growths_global(whirlpool: Whirlpool) -> Growths:
+    return (
+        whirlpool.fee_growth_global_a,
+        whirlpool.fee_growth_global_b,
+        *map(lambda r: r.growth_global_x64, whirlpool.reward_infos),
+    )
+
+
+def get_growths_outside(tick: Tick) -> Growths:
+    return (tick.fee_growth_outside_a, tick.fee_growth_outside_b, *tick.reward_growths_outside)
+
+
+def get_growths_below(growths_global: Growths, tick_current_index: int, tick_lower_index: int, tick_lower: Tick) -> Growths:
+    # by convention, when initializing a tick, all fees have been earned below the tick
+    if not tick_lower.initialized:
+        return growths_global
+    growths_outside = get_growths_outside(tick_lower)
+    if tick_current_index < tick_lower_index:
+        return tuple((g - o) & U128_MAX for g, o in zip(growths_global, growths_outside))
+    return growths_outside
+
+
+def get_growths_above(growths_global: Growths, tick_current_index: int, tick_upper_index: int, tick_upper: Tick) -> Growths:
+    # by convention, when initializing a tick, no fees have been earned above the tick
+    if not tick_upper.initialized:
+        return (0,) * (2 + NUM_REWARDS)
+    growths_outside = get_growths_outside(tick_upper)
+    if tick_current_index < tick_upper_index:
+        return growths_outside
+    return tuple((g - o) & U128_MAX for g, o in zip(growths_global, growths_outside))
+
+
+def get_growths_inside_from_below_above(growths_global: Growths, growths_below: Growths, growths_above: Growths) -> Growths:
+    return tuple(
+        (g - b - a) & U128_MAX
+        for g, b, a in zip(growths_global, growths_below, growths_above)
+    )
+
+
+def get_growths_inside(
+    growths_global: Growths,
+    tick_current_index: int,
+    tick_lower_index: int,
+    tick_lower: Tick,
+    tick_upper_index: int,
+    tick_upper: Tick,
+) -> Growths:
+    return get_growths_inside_from_below_above(
+        growths_global,
+        get_growths_below(growths_global, tick_current_index, tick_lower_index, tick_lower),
+        get_growths_above(growths_global, tick_current_index, tick_upper_index, tick_upper),
+    )
+
+
+def get_owed_delta(liquidity: int, growth_inside: int, growth_checkpoint: int) -> int:
+    return (liquidity * ((growth_inside - growth_checkpoint) & U128_MAX)) >> 64
+
+
+def collect_fees_quote_core(position: Position, growths_inside: Growths) -> CollectFeesQuote:
+    liquidity = position.liquidity
+    return CollectFeesQuote(
+        fee_owed_a=(position.fee_owed_a + get_owed_delta(liquidity, growths_inside[0], position.fee_growth_checkpoint_a)) & U64_MAX,
+        fee_owed_b=(position.fee_owed_b + get_owed_delta(liquidity, growths_inside[1], position.fee_growth_checkpoint_b)) & U64_MAX,
+    )
+
+
+def collect_rewards_quote_core(whirlpool: Whirlpool, position: Position, growths_inside: Growths) -> CollectRewardsQuote:
+    liquidity = position.liquidity
+    reward_owed = []
+    for i in range(NUM_REWARDS):
+        if not PoolUtil.is_reward_initialized(whirlpool.reward_infos[i]):
+            reward_owed.append(None)
+            continue
+        reward_info = position.reward_infos[i]
+        delta = get_owed_delta(liquidity, growths_inside[2 + i], reward_info.growth_inside_checkpoint)
+        reward_owed.append((reward_info.amount_owed + delta) & U64_MAX)
+    return CollectRewardsQuote(reward_owed=reward_owed)
@@ -1,11 +1,13 @@
 # https://github.com/orca-so/whirlpools/blob/main/sdk/src/quotes/public/decrease-liquidity-quote.ts
 
 import dataclasses
+from typing import List
 from ..types import Percentage
 from ..invariant import invariant
 from ..tickutil import TickUtil
-from ..liquiditymath import LiquidityMath
+from ..liquiditymath import get_amount_delta_a, get_amount_delta_b
 from ..pricemath import PriceMath
+from .increase_liquidity import get_sqrt_prices
 
 
 @dataclasses.dataclass(frozen=True)
@@ -18,6 +20,17 @@ class DecreaseLiquidityQuoteParams:
     slippage_tolerance: Percentage
 
 
+@dataclasses.dataclass(frozen=True)
+class DecreaseLiquidityBatchQuoteParams:
+    # i-th quote: (liquidities[i], tick_lower_indexes[i], tick_upper_indexes[i])
+    liquidities: List[int]
+    tick_current_index: int
+    sqrt_price: int
+    tick_lower_indexes: List[int]
+    tick_upper_indexes: List[int]
+    slippage_tolerance: Percentage
+
+
 @dataclasses.dataclass(frozen=True)
 class DecreaseLiquidityQuote:
     liquidity: int
@@ -35,22 +48,59 @@ def decrease_liquidity_quote_by_liquidity_with_params(
     invariant(TickUtil.is_tick_index_in_bounds(params.tick_current_index), "tick_current_index is out of bounds")
     invariant(params.tick_lower_index < params.tick_upper_index, "tick_lower_index < tick_upper_index")
 
-    lower = PriceMath.tick_index_to_sqrt_price_x64(params.tick_lower_index)
-    upper = PriceMath.tick_index_to_sqrt_price_x64(params.tick_upper_index)
-    current = min(max(params.sqrt_price, lower), upper)  # bounded
-
-    estimate_amount = LiquidityMath.get_token_amounts_from_liquidity(
+    return decrease_liquidity_quote_by_liquidity_core(
         params.liquidity,
-        current,
-        lower,
-        upper,
-        False
+        params.sqrt_price,
+        PriceMath.tick_index_to_sqrt_price_x64(params.tick_lower_index),
+        PriceMath.tick_index_to_sqrt_price_x64(params.tick_upper_index),
+        params.slippage_tolerance,
     )
 
+
+def decrease_liquidity_quote_by_liquidity_batch_with_params(
+    params: DecreaseLiquidityBatchQuoteParams
+) -> List[DecreaseLiquidityQuote]:
+    num_quotes = len(params.liquidities)
+    invariant(len(params.tick_lower_indexes) == num_quotes, "len(tick_lower_indexes) == len(liquidities)")
+    invariant(len(params.tick_upper_indexes) == num_quotes, "len(tick_upper_indexes) == len(liquidities)")
+    invariant(TickUtil.is_tick_index_in_bounds(params.tick_current_index), "tick_current_index is out of bounds")
+
+    sqrt_prices = get_sqrt_prices(params.tick_lower_indexes, params.tick_upper_indexes)
+
+    quotes = []
+    for liquidity, tick_lower_index, tick_upper_index in zip(
+        params.liquidities,
+        params.tick_lower_indexes,
+        params.tick_upper_indexes,
+    ):
+        invariant(tick_lower_index < tick_upper_index, "tick_lower_index < tick_upper_index")
+        quotes.append(decrease_liquidity_quote_by_liquidity_core(
+            liquidity,
+            params.sqrt_price,
+            sqrt_prices[tick_lower_index],
+            sqrt_prices[tick_upper_index],
+            params.slippage_tolerance,
+        ))
+    return quotes
+
+
+# integer only core shared by the single and batch quotes (params are already validated)
+def decrease_liquidity_quote_by_liquidity_core(
+    liquidity: int,
+    sqrt_price: int,
+    sqrt_price_lower: int,
+    sqrt_price_upper: int,
+    slippage_tolerance: Percentage,
+) -> DecreaseLiquidityQuote:
+    current = min(max(sqrt_price, sqrt_price_lower), sqrt_price_upper)  # bounded
+
+    token_est_a = get_amount_delta_a(current, sqrt_price_upper, liquidity, False)
+    token_est_b = get_amount_delta_b(sqrt_price_lower, current, liquidity, False)
+
     return DecreaseLiquidityQuote(
-        liquidity=params.liquidity,
-        token_est_a=estimate_amount.token_a,
-        token_est_b=estimate_amount.token_b,
-        token_min_a=params.slippage_tolerance.adjust_sub(estimate_amount.token_a),
-        token_min_b=params.slippage_tolerance.adjust_sub(estimate_amount.token_b),
+        liquidity=liquidity,
+        token_est_a=token_est_a,
+        token_est_b=token_est_b,
+        token_min_a=slippage_tolerance.adjust_sub(token_est_a),
+        token_min_b=slippage_tolerance.adjust_sub(token_est_b),
     )
@@ -0,0 +1,142 @@
+import dataclasses
+from typing import List, Optional, Tuple
+from ..static_client.accounts import TickArray
+from ..types import Percentage, TokenAmounts
+from ..invariant import invariant
+from ..tickutil import TickUtil
+from ..liquiditymath import LiquidityMath, get_amount_delta_a, get_amount_delta_b
+from ..pricemath import PriceMath
+from .increase_liquidity import IncreaseLiquidityQuote
+from .swap import SwapQuote, SwapQuoteParams, SwapTickSequenceExhaustedError, swap_quote_with_params
+
+
+@dataclasses.dataclass(frozen=True)
+class DepositPlannerParams:
+    token_amount_a: int
+    token_amount_b: int
+    tick_lower_index: int
+    tick_upper_index: int
+    tick_current_index: int
+    sqrt_price: int
+    liquidity: int
+    fee_rate: int
+    tick_spacing: int
+    # SwapUtil.get_tick_array_pubkeys(a_to_b=True/False), None if not initialized
+    tick_arrays_a_to_b: List[Optional[TickArray]]
+    tick_arrays_b_to_a: List[Optional[TickArray]]
+    slippage_tolerance: Percentage
+
+
+@dataclasses.dataclass(frozen=True)
+class DepositPlan:
+    # None if no swap is needed
+    swap_quote: Optional[SwapQuote]
+    increase_liquidity_quote: IncreaseLiquidityQuote
+
+
+class DepositPlanner:
+    # finds the swap amount that leaves token A and B in the ratio required by the range at the post-swap price.
+    # excess(x) = balance_a * rate_b - balance_b * rate_a after swapping x decreases monotonically as more A is swapped
+    # (and increases as more B is swapped), so the swap amount is bisected within [0, balance] using off-chain swap quotes.
+    @staticmethod
+    def plan(params: DepositPlannerParams) -> DepositPlan:
+        invariant(TickUtil.is_tick_index_in_bounds(params.tick_lower_index), "tick_lower_index is out of bounds")
+        invariant(TickUtil.is_tick_index_in_bounds(params.tick_upper_index), "tick_upper_index is out of bounds")
+        invariant(params.tick_lower_index < params.tick_upper_index, "tick_lower_index < tick_upper_index")
+
+        lower = PriceMath.tick_index_to_sqrt_price_x64(params.tick_lower_index)
+        upper = PriceMath.tick_index_to_sqrt_price_x64(params.tick_upper_index)
+
+        excess = DepositPlanner._get_excess(params.token_amount_a, params.token_amount_b, params.sqrt_price, lower, upper)
+        if excess == 0:
+            return DepositPlanner._build_plan(params, None, lower, upper)
+
+        a_to_b = excess > 0
+        balance = params.token_amount_a if a_to_b else params.token_amount_b
+
+        # find the largest swap amount which doesn't overshoot the ratio
+        best = None
+        low, high = 1, balance
+        while low <= high:
+            amount = (low + high) // 2
+            quote = DepositPlanner._try_swap_quote(params, a_to_b, amount)
+            if quote is None:
+                high = amount - 1
+                continue
+
+            token_amount_a, token_amount_b = DepositPlanner._get_balances_after_swap(params, quote)
+            excess = DepositPlanner._get_excess(token_amount_a, token_amount_b, quote.estimated_end_sqrt_price, lower, upper)
+            if excess == 0 or (excess > 0) == a_to_b:
+                best = quote
+                low = amount + 1
+            else:
+                high = amount - 1
+
+        return DepositPlanner._build_plan(params, best, lower, upper)
+
+    @staticmethod
+    def _get_excess(token_amount_a: int, token_amount_b: int, sqrt_price: int, lower: int, upper: int) -> int:
+        # sign of token_amount_a / rate_a - token_amount_b / rate_b (positive: too much A)
+        # rate_a = x64 * (upper - current) / (current * upper), rate_b = (current - lower) / x64 (per unit liquidity)
+        current = min(max(sqrt_price, lower), upper)
+        return token_amount_a * (current - lower) * current * upper - token_amount_b * (upper - current) * (1 << 128)
+
+    @staticmethod
+    def _try_swap_quote(params: DepositPlannerParams, a_to_b: bool, amount: int) -> Optional[SwapQuote]:
+        try:
+            return swap_quote_with_params(SwapQuoteParams(
+                amount=amount,
+                amount_specified_is_input=True,
+                a_to_b=a_to_b,
+                tick_current_index=params.tick_current_index,
+                sqrt_price=params.sqrt_price,
+                liquidity=params.liquidity,
+                fee_rate=params.fee_rate,
+                tick_spacing=params.tick_spacing,
+                tick_arrays=params.tick_arrays_a_to_b if a_to_b else params.tick_arrays_b_to_a,
+                slippage_tolerance=params.slippage_tolerance,
+            ))
+        except SwapTickSequenceExhaustedError:
+            # too large to be swapped within the given tick arrays
+            return None
+
+    @staticmethod
+    def _get_balances_after_swap(params: DepositPlannerParams, quote: SwapQuote, use_threshold: bool = False) -> Tuple[int, int]:
+        amount_out = quote.other_amount_threshold if use_threshold else quote.estimated_amount_out
+        if quote.a_to_b:
+            return params.token_amount_a - quote.estimated_amount_in, params.token_amount_b + amount_out
+        return params.token_amount_a + amount_out, params.token_amount_b - quote.estimated_amount_in
+
+    @staticmethod
+    def _build_plan(params: DepositPlannerParams, swap_quote: Optional[SwapQuote], lower: int, upper: int) -> DepositPlan:
+        if swap_quote is None:
+            sqrt_price = params.sqrt_price
+            token_amount_a, token_amount_b = params.token_amount_a, params.token_amount_b
+        else:
+            sqrt_price = swap_quote.estimated_end_sqrt_price
+            # only the minimum output of the swap is guaranteed
+            token_amount_a, token_amount_b = DepositPlanner._get_balances_after_swap(params, swap_quote, True)
+
+        # token_max = adjust_add(token_est) must be within balance
+        slippage_tolerance = params.slippage_tolerance
+        liquidity = LiquidityMath.get_max_liquidity_from_token_amounts(
+            sqrt_price,
+            lower,
+            upper,
+            TokenAmounts(slippage_tolerance.adjust_sub(token_amount_a), slippage_tolerance.adjust_sub(token_amount_b))
+        )
+
+        current = min(max(sqrt_price, lower), upper)  # bounded
+        token_est_a = get_amount_delta_a(current, upper, liquidity, True)
+        token_est_b = get_amount_delta_b(lower, current, liquidity, True)
+
+        return DepositPlan(
+            swap_quote=swap_quote,
+            increase_liquidity_quote=IncreaseLiquidityQuote(
+                liquidity=liquidity,
+                token_est_a=token_est_a,
+                token_est_b=token_est_b,
+                token_max_a=slippage_tolerance.adjust_add(token_est_a),
+                token_max_b=slippage_tolerance.adjust_add(token_est_b),
+            )
+        )
@@ -1,12 +1,12 @@
 # https://github.com/orca-so/whirlpools/blob/main/sdk/src/quotes/public/increase-liquidity-quote.ts
 
 import dataclasses
+from typing import Dict, List
 from solana.publickey import PublicKey
 from ..types import Percentage
 from ..invariant import invariant
 from ..tickutil import TickUtil
-from ..liquiditymath import LiquidityMath
-from ..positionutil import PositionUtil, PositionStatus
+from ..liquiditymath import LiquidityMath, get_amount_delta_a, get_amount_delta_b
 from ..pricemath import PriceMath
 
 
@@ -23,6 +23,20 @@ class IncreaseLiquidityQuoteParams:
     slippage_tolerance: Percentage
 
 
+@dataclasses.dataclass(frozen=True)
+class IncreaseLiquidityBatchQuoteParams:
+    # i-th quote: (input_token_amounts[i], tick_lower_indexes[i], tick_upper_indexes[i])
+    input_token_amounts: List[int]
+    input_token_mint: PublicKey
+    token_mint_a: PublicKey
+    token_mint_b: PublicKey
+    tick_current_index: int
+    sqrt_price: int
+    tick_lower_indexes: List[int]
+    tick_upper_indexes: List[int]
+    slippage_tolerance: Percentage
+
+
 @dataclasses.dataclass(frozen=True)
 class IncreaseLiquidityQuote:
     liquidity: int
@@ -44,41 +58,96 @@ def increase_liquidity_quote_by_input_token_with_params(
         "input_token_mint does not match either token_mint_a or token_mint_b"
     )
 
-    input_token_is_a = params.input_token_mint == params.token_mint_a
-    input_token_is_b = not input_token_is_a
-    position_status = PositionUtil.get_position_status(
+    return increase_liquidity_quote_by_input_token_core(
+        params.input_token_mint == params.token_mint_a,
+        params.input_token_amount,
         params.tick_current_index,
+        params.sqrt_price,
         params.tick_lower_index,
-        params.tick_upper_index
+        params.tick_upper_index,
+        PriceMath.tick_index_to_sqrt_price_x64(params.tick_lower_index),
+        PriceMath.tick_index_to_sqrt_price_x64(params.tick_upper_index),
+        params.slippage_tolerance,
+    )
+
+
+def increase_liquidity_quote_by_input_token_batch_with_params(
+    params: IncreaseLiquidityBatchQuoteParams
+) -> List[IncreaseLiquidityQuote]:
+    num_quotes = len(params.input_token_amounts)
+    invariant(len(params.tick_lower_indexes) == num_quotes, "len(tick_lower_indexes) == len(input_token_amounts)")
+    invariant(len(params.tick_upper_indexes) == num_quotes, "len(tick_upper_indexes) == len(input_token_amounts)")
+    invariant(TickUtil.is_tick_index_in_bounds(params.tick_current_index), "tick_current_index is out of bounds")
+    invariant(
+        params.input_token_mint in [params.token_mint_a, params.token_mint_b],
+        "input_token_mint does not match either token_mint_a or token_mint_b"
     )
 
-    if position_status == PositionStatus.PriceIsAboveRange and input_token_is_a:
+    input_token_is_a = params.input_token_mint == params.token_mint_a
+    sqrt_prices = get_sqrt_prices(params.tick_lower_indexes, params.tick_upper_indexes)
+
+    quotes = []
+    for input_token_amount, tick_lower_index, tick_upper_index in zip(
+        params.input_token_amounts,
+        params.tick_lower_indexes,
+        params.tick_upper_indexes,
+    ):
+        invariant(tick_lower_index < tick_upper_index, "tick_lower_index < tick_upper_index")
+        quotes.append(increase_liquidity_quote_by_input_token_core(
+            input_token_is_a,
+            input_token_amount,
+            params.tick_current_index,
+            params.sqrt_price,
+            tick_lower_index,
+            tick_upper_index,
+            sqrt_prices[tick_lower_index],
+            sqrt_prices[tick_upper_index],
+            params.slippage_tolerance,
+        ))
+    return quotes
+
+
+def get_sqrt_prices(tick_lower_indexes: List[int], tick_upper_indexes: List[int]) -> Dict[int, int]:
+    # a grid shares few distinct ticks, so each sqrt price is calculated once
+    sqrt_prices = {}
+    for tick_index in set(tick_lower_indexes).union(tick_upper_indexes):
+        invariant(TickUtil.is_tick_index_in_bounds(tick_index), "tick index is out of bounds")
+        sqrt_prices[tick_index] = PriceMath.tick_index_to_sqrt_price_x64(tick_index)
+    return sqrt_prices
+
+
+# integer only core shared by the single and batch quotes (params are already validated)
+def increase_liquidity_quote_by_input_token_core(
+    input_token_is_a: bool,
+    input_token_amount: int,
+    tick_current_index: int,
+    sqrt_price: int,
+    tick_lower_index: int,
+    tick_upper_index: int,
+    sqrt_price_lower: int,
+    sqrt_price_upper: int,
+    slippage_tolerance: Percentage,
+) -> IncreaseLiquidityQuote:
+    # PositionUtil.get_position_status
+    if tick_current_index >= tick_upper_index and input_token_is_a:
         return IncreaseLiquidityQuote(0, 0, 0, 0, 0)
-    if position_status == PositionStatus.PriceIsBelowRange and input_token_is_b:
+    if tick_current_index < tick_lower_index and not input_token_is_a:
         return IncreaseLiquidityQuote(0, 0, 0, 0, 0)
 
-    lower = PriceMath.tick_index_to_sqrt_price_x64(params.tick_lower_index)
-    upper = PriceMath.tick_index_to_sqrt_price_x64(params.tick_upper_index)
-    current = min(max(params.sqrt_price, lower), upper)  # bounded
+    current = min(max(sqrt_price, sqrt_price_lower), sqrt_price_upper)  # bounded
 
-    liquidity = 0
     if input_token_is_a:
-        liquidity = LiquidityMath.get_liquidity_from_token_a(current, upper, params.input_token_amount)
-    if input_token_is_b:
-        liquidity = LiquidityMath.get_liquidity_from_token_b(lower, current, params.input_token_amount)
-
-    estimate_amount = LiquidityMath.get_token_amounts_from_liquidity(
-        liquidity,
-        current,
-        lower,
-        upper,
-        True
-    )
+        liquidity = LiquidityMath.get_liquidity_from_token_a(current, sqrt_price_upper, input_token_amount)
+    else:
+        liquidity = LiquidityMath.get_liquidity_from_token_b(sqrt_price_lower, current, input_token_amount)
+
+    token_est_a = get_amount_delta_a(current, sqrt_price_upper, liquidity, True)
+    token_est_b = get_amount_delta_b(sqrt_price_lower, current, liquidity, True)
 
     return IncreaseLiquidityQuote(
         liquidity=liquidity,
-        token_est_a=estimate_amount.token_a,
-        token_est_b=estimate_amount.token_b,
-        token_max_a=params.slippage_tolerance.adjust_add(estimate_amount.token_a),
-        token_max_b=params.slippage_tolerance.adjust_add(estimate_amount.token_b),
+        token_est_a=token_est_a,
+        token_est_b=token_est_b,
+        token_max_a=slippage_tolerance.adjust_add(token_est_a),
+        token_max_b=slippage_tolerance.adjust_add(token_est_b),
     )
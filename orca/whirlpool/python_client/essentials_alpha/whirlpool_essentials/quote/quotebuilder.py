@@ -1,5 +1,14 @@
+from typing import List
 from .increase_liquidity import IncreaseLiquidityQuote, IncreaseLiquidityQuoteParams, increase_liquidity_quote_by_input_token_with_params
+from .increase_liquidity import IncreaseLiquidityBatchQuoteParams, increase_liquidity_quote_by_input_token_batch_with_params
 from .decrease_liquidity import DecreaseLiquidityQuote, DecreaseLiquidityQuoteParams, decrease_liquidity_quote_by_liquidity_with_params
+from .decrease_liquidity import DecreaseLiquidityBatchQuoteParams, decrease_liquidity_quote_by_liquidity_batch_with_params
+from .rangeoptimizer import RangeOptimizer, RangeOptimizerParams, RangeCandidate
+from .swap import SwapQuote, SwapQuoteParams, swap_quote_with_params
+from .depositplanner import DepositPlanner, DepositPlannerParams, DepositPlan
+from .collect import CollectFeesQuote, CollectFeesQuoteParams, collect_fees_quote_with_params
+from .collect import CollectRewardsQuote, CollectRewardsQuoteParams, collect_rewards_quote_with_params
+from .collect import CollectQuote, CollectBatchQuoteParams, collect_quote_batch_with_params
 
 
 class QuoteBuilder:
@@ -7,6 +16,38 @@ class QuoteBuilder:
     def increase_liquidity_by_input_token(params: IncreaseLiquidityQuoteParams) -> IncreaseLiquidityQuote:
         return increase_liquidity_quote_by_input_token_with_params(params)
 
+    @staticmethod
+    def increase_liquidity_by_input_token_batch(params: IncreaseLiquidityBatchQuoteParams) -> List[IncreaseLiquidityQuote]:
+        return increase_liquidity_quote_by_input_token_batch_with_params(params)
+
     @staticmethod
     def decrease_liquidity_by_liquidity(params: DecreaseLiquidityQuoteParams) -> DecreaseLiquidityQuote:
         return decrease_liquidity_quote_by_liquidity_with_params(params)
+
+    @staticmethod
+    def decrease_liquidity_by_liquidity_batch(params: DecreaseLiquidityBatchQuoteParams) -> List[DecreaseLiquidityQuote]:
+        return decrease_liquidity_quote_by_liquidity_batch_with_params(params)
+
+    @staticmethod
+    def optimize_range(params: RangeOptimizerParams) -> List[RangeCandidate]:
+        return RangeOptimizer.optimize(params)
+
+    @staticmethod
+    def swap(params: SwapQuoteParams) -> SwapQuote:
+        return swap_quote_with_params(params)
+
+    @staticmethod
+    def plan_deposit(params: DepositPlannerParams) -> DepositPlan:
+        return DepositPlanner.plan(params)
+
+    @staticmethod
+    def collect_fees(params: CollectFeesQuoteParams) -> CollectFeesQuote:
+        return collect_fees_quote_with_params(params)
+
+    @staticmethod
+    def collect_rewards(params: CollectRewardsQuoteParams) -> CollectRewardsQuote:
+        return collect_rewards_quote_with_params(params)
+
+    @staticmethod
+    def collect_batch(params: CollectBatchQuoteParams) -> List[CollectQuote]:
+        return collect_quote_batch_with_params(params)
@@ -0,0 +1,173 @@
+import bisect
+import dataclasses
+import heapq
+import math
+from enum import Enum
+from typing import Callable, List, Optional, Tuple
+from solana.publickey import PublicKey
+from ..types import Percentage
+from ..invariant import invariant
+from ..constants import MIN_TICK_INDEX, MAX_TICK_INDEX, U128_MAX
+from ..tickutil import TickUtil
+from ..liquiditymath import LiquidityMath
+from ..pricemath import PriceMath
+from .increase_liquidity import IncreaseLiquidityQuote, IncreaseLiquidityBatchQuoteParams, increase_liquidity_quote_by_input_token_batch_with_params
+
+
+class RangeObjective(str, Enum):
+    Liquidity = "liquidity"
+    # liquidity * probability that the price stays in range
+    FeeCapture = "fee_capture"
+
+
+@dataclasses.dataclass(frozen=True)
+class RangeOptimizerParams:
+    token_max_a: int
+    token_max_b: int
+    token_mint_a: PublicKey
+    token_mint_b: PublicKey
+    tick_current_index: int
+    sqrt_price: int
+    tick_spacing: int
+    min_width: int
+    max_width: int
+    slippage_tolerance: Percentage
+    objective: RangeObjective = RangeObjective.Liquidity
+    # FeeCapture: standard deviation of tick movement over the holding period (normal distribution is assumed)
+    tick_volatility: Optional[float] = None
+    # FeeCapture: custom probability that the price stays in [tick_lower_index, tick_upper_index)
+    in_range_probability: Optional[Callable[[int, int], float]] = None
+    top_k: int = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class RangeCandidate:
+    tick_lower_index: int
+    tick_upper_index: int
+    score: float
+    quote: IncreaseLiquidityQuote
+
+
+def normal_in_range_probability(tick_current_index: int, tick_volatility: float) -> Callable[[int, int], float]:
+    def cdf(tick_index: int) -> float:
+        return 0.5 * (1.0 + math.erf((tick_index - tick_current_index) / (tick_volatility * math.sqrt(2.0))))
+    return lambda tick_lower_index, tick_upper_index: cdf(tick_upper_index) - cdf(tick_lower_index)
+
+
+class RangeOptimizer:
+    # searches in-range positions (tick_lower_index <= tick_current_index < tick_upper_index) funded by both tokens.
+    #
+    # liquidity of a range is min(La(upper), Lb(lower)), where La (from token A budget) only depends on upper
+    # and decreases as upper moves away, Lb (from token B budget) only depends on lower and decreases as lower moves away.
+    # so La and Lb are calculated once per tick, and pairs are pruned by their upper bound of the score.
+    @staticmethod
+    def optimize(params: RangeOptimizerParams) -> List[RangeCandidate]:
+        invariant(TickUtil.is_tick_index_in_bounds(params.tick_current_index), "tick_current_index is out of bounds")
+        invariant(0 < params.min_width <= params.max_width, "0 < min_width <= max_width")
+        invariant(params.top_k > 0, "top_k > 0")
+
+        in_range_probability = RangeOptimizer._get_in_range_probability(params)
+
+        # token_max = adjust_add(token_est) must be within budget
+        budget_a = params.slippage_tolerance.adjust_sub(params.token_max_a)
+        budget_b = params.slippage_tolerance.adjust_sub(params.token_max_b)
+
+        spacing = params.tick_spacing
+        current = params.tick_current_index
+        min_lower = max(current - params.max_width, MIN_TICK_INDEX)
+        max_upper = min(current + params.max_width, MAX_TICK_INDEX)
+
+        # lowers: nearest first (Lb descending), uppers: nearest first (La descending)
+        lowers = list(range(current // spacing * spacing, min_lower - 1, -spacing))
+        uppers = list(range((current // spacing + 1) * spacing, max_upper + 1, spacing))
+        if len(lowers) == 0 or len(uppers) == 0:
+            return []
+
+        liquidity_b = [RangeOptimizer._get_liquidity_b(params.sqrt_price, lower, budget_b) for lower in lowers]
+        liquidity_a = [RangeOptimizer._get_liquidity_a(params.sqrt_price, upper, budget_a) for upper in uppers]
+
+        heap = []  # min-heap of (score, lower, upper)
+        for i, lower in enumerate(lowers):
+            first = bisect.bisect_left(uppers, lower + params.min_width)
+            last = bisect.bisect_right(uppers, lower + params.max_width)
+            if first >= last:
+                continue
+
+            # the widest range has the highest probability
+            max_probability = 1.0 if in_range_probability is None else in_range_probability(lower, uppers[last - 1])
+            if len(heap) == params.top_k and liquidity_b[i] * max_probability <= heap[0][0]:
+                if in_range_probability is None:
+                    break  # Lb only decreases for farther lowers
+                continue
+
+            for j in range(first, last):
+                liquidity = min(liquidity_a[j], liquidity_b[i])
+                # La only decreases for farther uppers
+                if len(heap) == params.top_k and liquidity * max_probability <= heap[0][0]:
+                    break
+                score = liquidity if in_range_probability is None else liquidity * in_range_probability(lower, uppers[j])
+                if len(heap) < params.top_k:
+                    heapq.heappush(heap, (score, lower, uppers[j]))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, lower, uppers[j]))
+
+        best = sorted(heap, reverse=True)
+        return RangeOptimizer._quote(params, budget_a, budget_b, best)
+
+    @staticmethod
+    def _get_in_range_probability(params: RangeOptimizerParams) -> Optional[Callable[[int, int], float]]:
+        if params.objective == RangeObjective.Liquidity:
+            return None
+        if params.in_range_probability is not None:
+            return params.in_range_probability
+        invariant(
+            params.tick_volatility is not None and params.tick_volatility > 0,
+            "tick_volatility or in_range_probability is required for FeeCapture"
+        )
+        return normal_in_range_probability(params.tick_current_index, params.tick_volatility)
+
+    @staticmethod
+    def _get_liquidity_a(sqrt_price: int, tick_upper_index: int, budget_a: int) -> int:
+        upper = PriceMath.tick_index_to_sqrt_price_x64(tick_upper_index)
+        if sqrt_price >= upper:
+            return U128_MAX  # token A is not needed
+        return LiquidityMath.get_liquidity_from_token_a(sqrt_price, upper, budget_a)
+
+    @staticmethod
+    def _get_liquidity_b(sqrt_price: int, tick_lower_index: int, budget_b: int) -> int:
+        lower = PriceMath.tick_index_to_sqrt_price_x64(tick_lower_index)
+        if sqrt_price <= lower:
+            return U128_MAX  # token B is not needed
+        return LiquidityMath.get_liquidity_from_token_b(lower, sqrt_price, budget_b)
+
+    @staticmethod
+    def _quote(params: RangeOptimizerParams, budget_a: int, budget_b: int, best: List[Tuple[float, int, int]]) -> List[RangeCandidate]:
+        # quote by the binding token of each range, one batch call per input token
+        by_input_token = {params.token_mint_a: [], params.token_mint_b: []}
+        for score, lower, upper in best:
+            liquidity_a = RangeOptimizer._get_liquidity_a(params.sqrt_price, upper, budget_a)
+            liquidity_b = RangeOptimizer._get_liquidity_b(params.sqrt_price, lower, budget_b)
+            input_token_mint = params.token_mint_a if liquidity_a <= liquidity_b else params.token_mint_b
+            by_input_token[input_token_mint].append((score, lower, upper))
+
+        candidates = []
+        for input_token_mint, ranges in by_input_token.items():
+            if len(ranges) == 0:
+                continue
+            budget = budget_a if input_token_mint == params.token_mint_a else budget_b
+            quotes = increase_liquidity_quote_by_input_token_batch_with_params(IncreaseLiquidityBatchQuoteParams(
+                input_token_amounts=[budget] * len(ranges),
+                input_token_mint=input_token_mint,
+                token_mint_a=params.token_mint_a,
+                token_mint_b=params.token_mint_b,
+                tick_current_index=params.tick_current_index,
+                sqrt_price=params.sqrt_price,
+                tick_lower_indexes=[lower for _, lower, _ in ranges],
+                tick_upper_indexes=[upper for _, _, upper in ranges],
+                slippage_tolerance=params.slippage_tolerance,
+            ))
+            for (score, lower, upper), quote in zip(ranges, quotes):
+                candidates.append(RangeCandidate(lower, upper, score, quote))
+
+        candidates.sort(key=lambda c: c.score, reverse=True)
+        return candidates
@@ -0,0 +1,304 @@
+# https://github.com/orca-so/whirlpools/blob/main/sdk/src/quotes/public/swap-quote.ts
+# swap simulation is ported from the on-chain program (swap_manager.rs, swap_math.rs, token_math.rs)
+# https://github.com/orca-so/whirlpools/tree/2c9366a/programs/whirlpool/src
+
+import dataclasses
+from typing import List, Optional, Tuple
+from ..static_client.accounts import TickArray
+from ..types import Percentage
+from ..invariant import invariant, InvaliantFailedError, PREFIX
+from ..constants import TICK_ARRAY_SIZE, MIN_TICK_INDEX, MAX_TICK_INDEX, MIN_SQRT_PRICE, MAX_SQRT_PRICE, FEE_RATE_MUL_VALUE
+from ..liquiditymath import get_amount_delta_a, get_amount_delta_b
+from ..pricemath import PriceMath
+from ..swaputil import SwapUtil
+
+
+@dataclasses.dataclass(frozen=True)
+class SwapQuoteParams:
+    amount: int
+    amount_specified_is_input: bool
+    a_to_b: bool
+    tick_current_index: int
+    sqrt_price: int
+    liquidity: int
+    fee_rate: int
+    tick_spacing: int
+    # tick arrays in swap direction (fetched with SwapUtil.get_tick_array_pubkeys), None if not initialized
+    tick_arrays: List[Optional[TickArray]]
+    slippage_tolerance: Percentage
+    sqrt_price_limit: Optional[int] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class SwapQuote:
+    amount: int
+    other_amount_threshold: int
+    sqrt_price_limit: int
+    amount_specified_is_input: bool
+    a_to_b: bool
+    estimated_amount_in: int
+    estimated_amount_out: int
+    estimated_end_tick_index: int
+    estimated_end_sqrt_price: int
+    estimated_fee_amount: int
+
+
+@dataclasses.dataclass(frozen=True)
+class SwapStepComputation:
+    amount_in: int
+    amount_out: int
+    next_sqrt_price: int
+    fee_amount: int
+
+
+class SwapTickSequenceExhaustedError(InvaliantFailedError):
+    # the amount cannot be swapped within the given tick arrays
+    pass
+
+
+class SwapTickSequence:
+    def __init__(self, tick_arrays: List[Optional[TickArray]], tick_spacing: int):
+        # uninitialized tick array terminates the sequence
+        self._tick_arrays = []
+        for tick_array in tick_arrays:
+            if tick_array is None:
+                break
+            self._tick_arrays.append(tick_array)
+        invariant(len(self._tick_arrays) > 0, "tick_arrays[0] must be initialized")
+        self._tick_spacing = tick_spacing
+        self._ticks_in_array = TICK_ARRAY_SIZE * tick_spacing
+
+    def get_tick(self, array_index: int, tick_index: int):
+        tick_array = self._tick_arrays[array_index]
+        offset = (tick_index - tick_array.start_tick_index) // self._tick_spacing
+        invariant(0 <= offset < TICK_ARRAY_SIZE, "tick index is out of the tick array")
+        return tick_array.ticks[offset]
+
+    def get_next_initialized_tick_index(self, tick_index: int, a_to_b: bool, array_index: int) -> Tuple[int, int]:
+        search_index = tick_index
+        while True:
+            if array_index >= len(self._tick_arrays):
+                raise SwapTickSequenceExhaustedError("{}: tick array sequence is exhausted".format(PREFIX))
+            tick_array = self._tick_arrays[array_index]
+            # a boundary tick of the tick array has been crossed, the search continues from the next tick array
+            if a_to_b:
+                crossed = search_index < tick_array.start_tick_index
+            else:
+                crossed = search_index >= tick_array.start_tick_index + self._ticks_in_array - self._tick_spacing
+            if crossed:
+                array_index += 1
+                continue
+            next_tick_index = self._get_next_init_tick_index(tick_array, search_index, a_to_b)
+            if next_tick_index is not None:
+                return array_index, next_tick_index
+
+            start_tick_index = tick_array.start_tick_index
+            if a_to_b and start_tick_index <= MIN_TICK_INDEX:
+                return array_index, MIN_TICK_INDEX
+            if not a_to_b and start_tick_index + self._ticks_in_array > MAX_TICK_INDEX:
+                return array_index, MAX_TICK_INDEX
+
+            # last tick of the last tick array in the sequence
+            if array_index + 1 == len(self._tick_arrays):
+                if a_to_b:
+                    return array_index, start_tick_index
+                return array_index, start_tick_index + (TICK_ARRAY_SIZE - 1) * self._tick_spacing
+
+            search_index = start_tick_index - 1 if a_to_b else start_tick_index + self._ticks_in_array - 1
+            array_index += 1
+
+    def _get_next_init_tick_index(self, tick_array: TickArray, tick_index: int, a_to_b: bool) -> Optional[int]:
+        # b to a search starts from the tick next to tick_index, so the search range is shifted by one tick
+        lower = tick_array.start_tick_index
+        upper = lower + self._ticks_in_array
+        if not a_to_b:
+            lower -= self._tick_spacing
+            upper -= self._tick_spacing
+        invariant(lower <= tick_index < upper, "tick index is out of the tick array sequence")
+
+        offset = (tick_index - tick_array.start_tick_index) // self._tick_spacing
+        step = -1 if a_to_b else 1
+        if not a_to_b:
+            offset += 1
+
+        ticks = tick_array.ticks
+        while 0 <= offset < TICK_ARRAY_SIZE:
+            if ticks[offset].initialized:
+                return tick_array.start_tick_index + offset * self._tick_spacing
+            offset += step
+        return None
+
+
+def get_next_sqrt_price_from_a_round_up(sqrt_price: int, liquidity: int, amount: int, amount_specified_is_input: bool) -> int:
+    if amount == 0:
+        return sqrt_price
+
+    product = sqrt_price * amount
+    numerator = (liquidity * sqrt_price) << 64
+    liquidity_shift_left = liquidity << 64
+    if amount_specified_is_input:
+        denominator = liquidity_shift_left + product
+    else:
+        invariant(liquidity_shift_left > product, "divide by zero")
+        denominator = liquidity_shift_left - product
+
+    price = -(-numerator // denominator)  # round up
+    invariant(MIN_SQRT_PRICE <= price <= MAX_SQRT_PRICE, "sqrt price out of bounds")
+    return price
+
+
+def get_next_sqrt_price_from_b_round_down(sqrt_price: int, liquidity: int, amount: int, amount_specified_is_input: bool) -> int:
+    # input (adding B) rounds the delta down, output (removing B) rounds it up, so that the price is always rounded down
+    amount_x64 = amount << 64
+    delta, remainder = divmod(amount_x64, liquidity)
+    if not amount_specified_is_input and remainder > 0:
+        delta += 1
+
+    if amount_specified_is_input:
+        return sqrt_price + delta
+    invariant(sqrt_price >= delta, "sqrt price underflow")
+    return sqrt_price - delta
+
+
+def get_next_sqrt_price(sqrt_price: int, liquidity: int, amount: int, amount_specified_is_input: bool, a_to_b: bool) -> int:
+    if amount_specified_is_input == a_to_b:
+        return get_next_sqrt_price_from_a_round_up(sqrt_price, liquidity, amount, amount_specified_is_input)
+    return get_next_sqrt_price_from_b_round_down(sqrt_price, liquidity, amount, amount_specified_is_input)
+
+
+def get_amount_fixed_delta(sqrt_price_current: int, sqrt_price_target: int, liquidity: int, amount_specified_is_input: bool, a_to_b: bool) -> int:
+    if a_to_b == amount_specified_is_input:
+        return get_amount_delta_a(sqrt_price_current, sqrt_price_target, liquidity, amount_specified_is_input)
+    return get_amount_delta_b(sqrt_price_current, sqrt_price_target, liquidity, amount_specified_is_input)
+
+
+def get_amount_unfixed_delta(sqrt_price_current: int, sqrt_price_target: int, liquidity: int, amount_specified_is_input: bool, a_to_b: bool) -> int:
+    if a_to_b == amount_specified_is_input:
+        return get_amount_delta_b(sqrt_price_current, sqrt_price_target, liquidity, not amount_specified_is_input)
+    return get_amount_delta_a(sqrt_price_current, sqrt_price_target, liquidity, not amount_specified_is_input)
+
+
+def compute_swap_step(
+    amount_remaining: int,
+    fee_rate: int,
+    liquidity: int,
+    sqrt_price_current: int,
+    sqrt_price_target: int,
+    amount_specified_is_input: bool,
+    a_to_b: bool,
+) -> SwapStepComputation:
+    amount_fixed_delta = get_amount_fixed_delta(sqrt_price_current, sqrt_price_target, liquidity, amount_specified_is_input, a_to_b)
+
+    amount_calc = amount_remaining
+    if amount_specified_is_input:
+        amount_calc = amount_remaining * (FEE_RATE_MUL_VALUE - fee_rate) // FEE_RATE_MUL_VALUE
+
+    if amount_calc >= amount_fixed_delta:
+        next_sqrt_price = sqrt_price_target
+    else:
+        next_sqrt_price = get_next_sqrt_price(sqrt_price_current, liquidity, amount_calc, amount_specified_is_input, a_to_b)
+
+    is_max_swap = next_sqrt_price == sqrt_price_target
+    amount_unfixed_delta = get_amount_unfixed_delta(sqrt_price_current, next_sqrt_price, liquidity, amount_specified_is_input, a_to_b)
+
+    # the swap doesn't reach the target, so the fixed amount is recalculated
+    if not is_max_swap:
+        amount_fixed_delta = get_amount_fixed_delta(sqrt_price_current, next_sqrt_price, liquidity, amount_specified_is_input, a_to_b)
+
+    if amount_specified_is_input:
+        amount_in, amount_out = amount_fixed_delta, amount_unfixed_delta
+    else:
+        amount_in, amount_out = amount_unfixed_delta, min(amount_fixed_delta, amount_remaining)
+
+    if amount_specified_is_input and not is_max_swap:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = -(-amount_in * fee_rate // (FEE_RATE_MUL_VALUE - fee_rate))  # round up
+
+    return SwapStepComputation(amount_in, amount_out, next_sqrt_price, fee_amount)
+
+
+def swap_quote_with_params(params: SwapQuoteParams) -> SwapQuote:
+    invariant(params.amount > 0, "amount > 0")
+
+    a_to_b = params.a_to_b
+    amount_specified_is_input = params.amount_specified_is_input
+    sqrt_price_limit = params.sqrt_price_limit
+    if sqrt_price_limit is None:
+        sqrt_price_limit = SwapUtil.get_default_sqrt_price_limit(a_to_b)
+    invariant(MIN_SQRT_PRICE <= sqrt_price_limit <= MAX_SQRT_PRICE, "sqrt_price_limit is out of bounds")
+    if a_to_b:
+        invariant(sqrt_price_limit < params.sqrt_price, "sqrt_price_limit must be lower than sqrt_price for a to b")
+    else:
+        invariant(sqrt_price_limit > params.sqrt_price, "sqrt_price_limit must be higher than sqrt_price for b to a")
+
+    sequence = SwapTickSequence(params.tick_arrays, params.tick_spacing)
+
+    amount_remaining = params.amount
+    amount_calculated = 0
+    fee_amount = 0
+    curr_sqrt_price = params.sqrt_price
+    curr_tick_index = params.tick_current_index
+    curr_liquidity = params.liquidity
+    curr_array_index = 0
+
+    while amount_remaining > 0 and curr_sqrt_price != sqrt_price_limit:
+        next_array_index, next_tick_index = sequence.get_next_initialized_tick_index(curr_tick_index, a_to_b, curr_array_index)
+
+        next_tick_sqrt_price = PriceMath.tick_index_to_sqrt_price_x64(next_tick_index)
+        if a_to_b:
+            sqrt_price_target = max(next_tick_sqrt_price, sqrt_price_limit)
+        else:
+            sqrt_price_target = min(next_tick_sqrt_price, sqrt_price_limit)
+
+        step = compute_swap_step(
+            amount_remaining,
+            params.fee_rate,
+            curr_liquidity,
+            curr_sqrt_price,
+            sqrt_price_target,
+            amount_specified_is_input,
+            a_to_b,
+        )
+
+        if amount_specified_is_input:
+            amount_remaining -= step.amount_in + step.fee_amount
+            amount_calculated += step.amount_out
+        else:
+            amount_remaining -= step.amount_out
+            amount_calculated += step.amount_in + step.fee_amount
+        fee_amount += step.fee_amount
+
+        if step.next_sqrt_price == next_tick_sqrt_price:
+            next_tick = sequence.get_tick(next_array_index, next_tick_index)
+            if next_tick.initialized:
+                liquidity_net = -next_tick.liquidity_net if a_to_b else next_tick.liquidity_net
+                curr_liquidity += liquidity_net
+                invariant(curr_liquidity >= 0, "liquidity underflow")
+            curr_tick_index = next_tick_index - 1 if a_to_b else next_tick_index
+        elif step.next_sqrt_price != curr_sqrt_price:
+            curr_tick_index = PriceMath.sqrt_price_x64_to_tick_index(step.next_sqrt_price)
+
+        curr_sqrt_price = step.next_sqrt_price
+        curr_array_index = next_array_index
+
+    amount_used = params.amount - amount_remaining
+    if amount_specified_is_input:
+        amount_in, amount_out = amount_used, amount_calculated
+        other_amount_threshold = params.slippage_tolerance.adjust_sub(amount_out)
+    else:
+        amount_in, amount_out = amount_calculated, amount_used
+        other_amount_threshold = params.slippage_tolerance.adjust_add(amount_in)
+
+    return SwapQuote(
+        amount=params.amount,
+        other_amount_threshold=other_amount_threshold,
+        sqrt_price_limit=sqrt_price_limit,
+        amount_specified_is_input=amount_specified_is_input,
+        a_to_b=a_to_b,
+        estimated_amount_in=amount_in,
+        estimated_amount_out=amount_out,
+        estimated_end_tick_index=curr_tick_index,
+        estimated_end_sqrt_price=curr_sqrt_price,
+        estimated_fee_amount=fee_amount,
+    )
@@ -0,0 +1,84 @@
+import asyncio
+import dataclasses
+import struct
+import time
+from typing import Optional
+from solana.rpc.async_api import AsyncClient
+from solana.sysvar import SYSVAR_RENT_PUBKEY
+from .invariant import invariant
+
+
+# https://github.com/solana-labs/solana/blob/v1.14.10/sdk/program/src/rent.rs
+ACCOUNT_STORAGE_OVERHEAD = 128
+RENT_LAYOUT = struct.Struct("<QdB")
+
+# used only to estimate when the current epoch ends
+ESTIMATED_SLOT_SECOND = 0.4
+
+
+@dataclasses.dataclass(frozen=True)
+class Rent:
+    lamports_per_byte_year: int
+    exemption_threshold: float
+    burn_percent: int
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Rent":
+        lamports_per_byte_year, exemption_threshold, burn_percent = RENT_LAYOUT.unpack_from(data)
+        return Rent(lamports_per_byte_year, exemption_threshold, burn_percent)
+
+    def minimum_balance(self, data_len: int) -> int:
+        # same arithmetic as Rent::minimum_balance (u64 -> f64 -> u64)
+        bytes_ = ACCOUNT_STORAGE_OVERHEAD + data_len
+        return int(float(bytes_ * self.lamports_per_byte_year) * self.exemption_threshold)
+
+
+class RentCalculator:
+    # rent parameters are read from the rent sysvar and refreshed at most once per epoch
+    def __init__(self, connection: AsyncClient):
+        self._connection = connection
+        self._rent: Optional[Rent] = None
+        self._epoch: Optional[int] = None
+        self._expire_at = 0.0
+        self._refreshing: Optional[asyncio.Future] = None
+
+    @property
+    def rent(self) -> Optional[Rent]:
+        return self._rent
+
+    @property
+    def epoch(self) -> Optional[int]:
+        return self._epoch
+
+    async def get_minimum_balance_for_rent_exemption(self, data_len: int, refresh: bool = False) -> int:
+        rent = await self.get_rent(refresh)
+        return rent.minimum_balance(data_len)
+
+    async def get_rent(self, refresh: bool = False) -> Rent:
+        if refresh or self._rent is None or time.monotonic() >= self._expire_at:
+            await self.refresh()
+        return self._rent
+
+    async def refresh(self):
+        # concurrent callers share one in-flight refresh
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+        refreshing = self._refreshing
+        try:
+            await asyncio.shield(refreshing)
+        finally:
+            if self._refreshing is refreshing and refreshing.done():
+                self._refreshing = None
+
+    async def _refresh(self):
+        rent_res, epoch_info_res = await asyncio.gather(
+            self._connection.get_account_info(SYSVAR_RENT_PUBKEY),
+            self._connection.get_epoch_info(),
+        )
+        invariant(rent_res.value is not None, "rent sysvar not found")
+        epoch_info = epoch_info_res.value
+
+        remaining_slots = epoch_info.slots_in_epoch - epoch_info.slot_index
+        self._rent = Rent.from_bytes(rent_res.value.data)
+        self._epoch = epoch_info.epoch
+        self._expire_at = time.monotonic() + remaining_slots * ESTIMATED_SLOT_SECOND
@@ -0,0 +1,77 @@
+import dataclasses
+from typing import List
+from .static_client.accounts import Whirlpool, Position
+from .static_client.types import WhirlpoolRewardInfo
+from .constants import U128_MAX
+from .invariant import invariant
+from .poolutil import PoolUtil
+from .positionutil import PositionUtil
+from .types import PositionStatus
+
+
+class RewardUtil:
+    # same as checked_mul_div in next_whirlpool_reward_infos of the on-chain program (0 on u128 overflow)
+    # https://github.com/orca-so/whirlpools/blob/2c9366a/programs/whirlpool/src/manager/whirlpool_manager.rs
+    @staticmethod
+    def get_reward_growth_delta(time_delta: int, emissions_per_second_x64: int, liquidity: int) -> int:
+        product = time_delta * emissions_per_second_x64
+        if product > U128_MAX:
+            return 0
+        return product // liquidity
+
+    @staticmethod
+    def get_next_reward_growths_global(whirlpool: Whirlpool, timestamp: int) -> List[int]:
+        invariant(timestamp >= whirlpool.reward_last_updated_timestamp, "timestamp >= reward_last_updated_timestamp")
+
+        growths_global = list(map(lambda r: r.growth_global_x64, whirlpool.reward_infos))
+        # no reward is emitted while no liquidity is active
+        if whirlpool.liquidity == 0 or timestamp == whirlpool.reward_last_updated_timestamp:
+            return growths_global
+
+        time_delta = timestamp - whirlpool.reward_last_updated_timestamp
+        for i, reward_info in enumerate(whirlpool.reward_infos):
+            if not PoolUtil.is_reward_initialized(reward_info):
+                continue
+            delta = RewardUtil.get_reward_growth_delta(time_delta, reward_info.emissions_per_second_x64, whirlpool.liquidity)
+            growths_global[i] = (growths_global[i] + delta) & U128_MAX
+        return growths_global
+
+    @staticmethod
+    def get_next_reward_infos(whirlpool: Whirlpool, timestamp: int) -> List[WhirlpoolRewardInfo]:
+        growths_global = RewardUtil.get_next_reward_growths_global(whirlpool, timestamp)
+        return [
+            dataclasses.replace(reward_info, growth_global_x64=growth_global)
+            for reward_info, growth_global in zip(whirlpool.reward_infos, growths_global)
+        ]
+
+    # whirlpool whose reward_infos are updated to timestamp (assuming that price and liquidity don't change)
+    @staticmethod
+    def get_whirlpool_at(whirlpool: Whirlpool, timestamp: int) -> Whirlpool:
+        if timestamp == whirlpool.reward_last_updated_timestamp:
+            return whirlpool
+        return dataclasses.replace(
+            whirlpool,
+            reward_last_updated_timestamp=timestamp,
+            reward_infos=RewardUtil.get_next_reward_infos(whirlpool, timestamp),
+        )
+
+    # current reward emissions shared by each position (x64 per second, 0 if out of range or not initialized)
+    @staticmethod
+    def get_position_emissions_per_second_x64(whirlpool: Whirlpool, positions: List[Position]) -> List[List[int]]:
+        emissions = [
+            reward_info.emissions_per_second_x64 if PoolUtil.is_reward_initialized(reward_info) else 0
+            for reward_info in whirlpool.reward_infos
+        ]
+
+        result = []
+        for position in positions:
+            status = PositionUtil.get_position_status(
+                whirlpool.tick_current_index,
+                position.tick_lower_index,
+                position.tick_upper_index,
+            )
+            if whirlpool.liquidity == 0 or status != PositionStatus.PriceIsInRange:
+                result.append([0] * len(emissions))
+                continue
+            result.append([e * position.liquidity // whirlpool.liquidity for e in emissions])
+        return result
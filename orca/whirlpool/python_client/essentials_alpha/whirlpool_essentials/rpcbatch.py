@@ -0,0 +1,206 @@
+import asyncio
+import json
+from typing import Any, Callable, List, Optional, Set, Tuple
+import httpx
+from solders.account_decoder import UiAccountEncoding, UiDataSliceConfig
+from solders.commitment_config import CommitmentLevel
+from solders.rpc.config import RpcAccountInfoConfig, RpcContextConfig
+from solders.rpc.requests import GetAccountInfo, GetMultipleAccounts, GetMinimumBalanceForRentExemption, GetLatestBlockhash, batch_to_json
+from solders.rpc.responses import (
+    GetAccountInfoResp,
+    GetMultipleAccountsResp,
+    GetMinimumBalanceForRentExemptionResp,
+    GetLatestBlockhashResp,
+)
+from solana.publickey import PublicKey
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
+from solana.rpc.core import RPCException
+from solana.rpc.types import DataSliceOpts
+
+
+DEFAULT_MAX_BATCH_SIZE = 100
+
+# parsers of GetAccountInfoResp and GetMultipleAccountsResp accept only binary encodings
+ACCOUNT_ENCODINGS = {
+    "base64": UiAccountEncoding.Base64,
+    "base64+zstd": UiAccountEncoding.Base64Zstd,
+}
+
+# (make_body(id), parser, future)
+PendingRequest = Tuple[Callable[[int], Any], Any, asyncio.Future]
+
+
+class RpcBatchClient:
+    # drop-in replacement of AsyncClient for AccountFetcher and TokenUtil.
+    # independent calls issued in the same event loop iteration (e.g. asyncio.gather)
+    # are grouped into one JSON-RPC batch POST to endpoint. other methods are delegated to the wrapped client.
+    def __init__(
+        self,
+        connection: AsyncClient,
+        endpoint: str,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        session: Optional[httpx.AsyncClient] = None,
+    ):
+        self._connection = connection
+        self._endpoint = endpoint
+        self._max_batch_size = max_batch_size
+        self._owns_session = session is None
+        self._session = httpx.AsyncClient() if session is None else session
+        self._queue: List[PendingRequest] = []
+        self._flush_scheduled = False
+        self._send_tasks: Set[asyncio.Task] = set()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._connection, name)
+
+    @property
+    def connection(self) -> AsyncClient:
+        return self._connection
+
+    async def close(self):
+        # the wrapped client is owned by the caller
+        if self._owns_session:
+            await self._session.aclose()
+
+    async def get_account_info(
+        self,
+        pubkey: PublicKey,
+        commitment: Optional[Commitment] = None,
+        encoding: str = "base64",
+        data_slice: Optional[DataSliceOpts] = None,
+    ) -> GetAccountInfoResp:
+        config = self._account_info_config(commitment, encoding, data_slice)
+        return await self._enqueue(lambda id: GetAccountInfo(pubkey.to_solders(), config, id), GetAccountInfoResp)
+
+    async def get_multiple_accounts(
+        self,
+        pubkeys: List[PublicKey],
+        commitment: Optional[Commitment] = None,
+        encoding: str = "base64",
+        data_slice: Optional[DataSliceOpts] = None,
+    ) -> GetMultipleAccountsResp:
+        accounts = [pubkey.to_solders() for pubkey in pubkeys]
+        config = self._account_info_config(commitment, encoding, data_slice)
+        return await self._enqueue(lambda id: GetMultipleAccounts(accounts, config, id), GetMultipleAccountsResp)
+
+    async def get_minimum_balance_for_rent_exemption(
+        self,
+        usize: int,
+        commitment: Optional[Commitment] = None,
+    ) -> GetMinimumBalanceForRentExemptionResp:
+        commitment_level = self._commitment_level(commitment)
+        return await self._enqueue(
+            lambda id: GetMinimumBalanceForRentExemption(usize, commitment_level, id),
+            GetMinimumBalanceForRentExemptionResp
+        )
+
+    async def get_latest_blockhash(self, commitment: Optional[Commitment] = None) -> GetLatestBlockhashResp:
+        config = RpcContextConfig(self._commitment_level(commitment))
+        return await self._enqueue(lambda id: GetLatestBlockhash(config, id), GetLatestBlockhashResp)
+
+    def _commitment_level(self, commitment: Optional[Commitment]) -> CommitmentLevel:
+        return CommitmentLevel.from_string(commitment or self._connection.commitment)
+
+    def _account_info_config(
+        self,
+        commitment: Optional[Commitment],
+        encoding: str,
+        data_slice: Optional[DataSliceOpts],
+    ) -> RpcAccountInfoConfig:
+        return RpcAccountInfoConfig(
+            encoding=ACCOUNT_ENCODINGS[encoding],
+            data_slice=None if data_slice is None else UiDataSliceConfig(offset=data_slice.offset, length=data_slice.length),
+            commitment=self._commitment_level(commitment),
+        )
+
+    def _enqueue(self, make_body: Callable[[int], Any], parser) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((make_body, parser, future))
+
+        if len(self._queue) >= self._max_batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            # wait for the other tasks ready in this iteration to enqueue their requests
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if len(self._queue) == 0:
+            return
+        queue, self._queue = self._queue, []
+        # the event loop keeps only weak references to tasks, so the task is kept until it is done
+        task = asyncio.ensure_future(self._send(queue))
+        self._send_tasks.add(task)
+        task.add_done_callback(lambda task: self._on_sent(task, queue))
+
+    def _on_sent(self, task: asyncio.Task, queue: List[PendingRequest]):
+        self._send_tasks.discard(task)
+        # _send resolves every future, this is for unexpected errors and cancellation
+        for _, _, future in queue:
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_exception(RPCException({"message": "batch request is completed without response"}))
+
+    async def _send(self, queue: List[PendingRequest]):
+        try:
+            bodies = [make_body(id) for id, (make_body, _, _) in enumerate(queue)]
+            response = await self._session.post(
+                self._endpoint,
+                content=batch_to_json(bodies),
+                headers={"Content-Type": "application/json"},
+            )
+            response.raise_for_status()
+
+            responses = response.json()
+            # the whole batch is rejected (e.g. rate limited, parse error)
+            if not isinstance(responses, list):
+                raise RPCException(responses.get("error", responses) if isinstance(responses, dict) else responses)
+        except Exception as e:
+            for _, _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # responses may be returned in any order, error responses may have null id
+        by_id = {}
+        errors_without_id = []
+        for response in responses:
+            if not isinstance(response, dict):
+                continue
+            id = response.get("id")
+            if isinstance(id, int) and 0 <= id < len(queue):
+                by_id[id] = response
+            elif "error" in response:
+                errors_without_id.append(response["error"])
+
+        for id, (_, parser, future) in enumerate(queue):
+            if future.done():
+                continue
+            response = by_id.get(id)
+            if response is None:
+                error = errors_without_id[0] if len(errors_without_id) > 0 else {"message": "no response for request id {}".format(id)}
+                future.set_exception(RPCException(error))
+                continue
+            if "error" in response:
+                future.set_exception(RPCException(response["error"]))
+                continue
+            try:
+                result = parser.from_json(json.dumps(response))
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            if not isinstance(result, parser):
+                future.set_exception(RPCException(result))
+            else:
+                future.set_result(result)
@@ -0,0 +1,273 @@
+import bisect
+import dataclasses
+import math
+from typing import List, Optional
+from solana.publickey import PublicKey
+from .static_client.accounts import Whirlpool, TickArray
+from .context import WhirlpoolContext
+from .types import Percentage
+from .invariant import invariant
+from .constants import TICK_ARRAY_SIZE, MIN_TICK_INDEX, MAX_TICK_INDEX, MIN_SQRT_PRICE, MAX_SQRT_PRICE, FEE_RATE_MUL_VALUE
+from .liquiditymath import get_amount_delta_a, get_amount_delta_b
+from .liquiditydistribution import LiquidityDistribution
+from .pricemath import PriceMath
+from .pdautil import PDAUtil
+from .swaputil import SwapUtil
+from .quote.swap import SwapQuote, SwapQuoteParams, swap_quote_with_params
+from .instruction import WhirlpoolIx, SwapParams
+from .transaction import TransactionBuilder
+
+
+@dataclasses.dataclass(frozen=True)
+class SplitSwapPool:
+    whirlpool_pubkey: PublicKey
+    whirlpool: Whirlpool
+    distribution: LiquidityDistribution
+    # tick arrays in swap direction (fetched with SwapUtil.get_tick_array_pubkeys), None if not initialized
+    tick_arrays: List[Optional[TickArray]]
+
+
+@dataclasses.dataclass(frozen=True)
+class SplitSwapParams:
+    # exact input amount
+    amount: int
+    a_to_b: bool
+    # whirlpools of the same token pair
+    pools: List[SplitSwapPool]
+    slippage_tolerance: Percentage
+
+
+@dataclasses.dataclass(frozen=True)
+class SplitSwapLeg:
+    whirlpool_pubkey: PublicKey
+    whirlpool: Whirlpool
+    quote: SwapQuote
+
+
+@dataclasses.dataclass(frozen=True)
+class SplitSwapPlan:
+    a_to_b: bool
+    # pools with no allocation are not included
+    legs: List[SplitSwapLeg]
+    estimated_amount_in: int
+    estimated_amount_out: int
+    other_amount_threshold: int
+
+
+class SwapCurve:
+    # input amount required to move the price of a pool to a target sqrt price, within the reach of its tick arrays.
+    #
+    # breakpoints are the sqrt prices of the initialized ticks in swap direction, and cumulative input (before fee)
+    # up to each breakpoint is precomputed, so that each evaluation is one binary search and one amount delta.
+    def __init__(self, pool: SplitSwapPool, a_to_b: bool):
+        whirlpool = pool.whirlpool
+        self.a_to_b = a_to_b
+        self.fee_rate = whirlpool.fee_rate
+        self.sqrt_price = whirlpool.sqrt_price
+
+        limit_tick_index = SwapCurve._get_limit_tick_index(pool, a_to_b)
+        limit_sqrt_price = PriceMath.tick_index_to_sqrt_price_x64(limit_tick_index)
+
+        tick_indexes = pool.distribution.tick_indexes
+        if a_to_b:
+            lo = int(tick_indexes.searchsorted(limit_tick_index, side="right"))
+            hi = int(tick_indexes.searchsorted(whirlpool.tick_current_index, side="right"))
+            crossed = range(hi - 1, lo - 1, -1)
+        else:
+            lo = int(tick_indexes.searchsorted(whirlpool.tick_current_index, side="right"))
+            hi = int(tick_indexes.searchsorted(limit_tick_index, side="left"))
+            crossed = range(lo, hi)
+
+        # breakpoints (monotonic in swap direction), liquidity and cumulative input of each segment
+        self.breakpoints = [whirlpool.sqrt_price]
+        self.liquidities = [whirlpool.liquidity]
+        self.cumulative_inputs = [0]
+        liquidity_net = pool.distribution.liquidity_net
+        for i in crossed:
+            self._add_breakpoint(PriceMath.tick_index_to_sqrt_price_x64(int(tick_indexes[i])))
+            liquidity = self.liquidities[-1] - liquidity_net[i] if a_to_b else self.liquidities[-1] + liquidity_net[i]
+            self.liquidities.append(liquidity)
+        self._add_breakpoint(limit_sqrt_price)
+        self.limit_sqrt_price = self.breakpoints[-1]
+
+        # for bisect (ascending)
+        self._keys = [-b for b in self.breakpoints] if a_to_b else self.breakpoints
+
+    def _add_breakpoint(self, sqrt_price: int):
+        prev = self.breakpoints[-1]
+        if self.a_to_b:
+            sqrt_price = min(sqrt_price, prev)
+        else:
+            sqrt_price = max(sqrt_price, prev)
+        delta = self._get_amount_delta(prev, sqrt_price, self.liquidities[-1])
+        self.breakpoints.append(sqrt_price)
+        self.cumulative_inputs.append(self.cumulative_inputs[-1] + delta)
+
+    def _get_amount_delta(self, sqrt_price_0: int, sqrt_price_1: int, liquidity: int) -> int:
+        if self.a_to_b:
+            return get_amount_delta_a(sqrt_price_0, sqrt_price_1, liquidity, True)
+        return get_amount_delta_b(sqrt_price_0, sqrt_price_1, liquidity, True)
+
+    @staticmethod
+    def _get_limit_tick_index(pool: SplitSwapPool, a_to_b: bool) -> int:
+        # the swap stops at the end of the last initialized tick array in the sequence
+        tick_arrays = []
+        for tick_array in pool.tick_arrays:
+            if tick_array is None:
+                break
+            tick_arrays.append(tick_array)
+        invariant(len(tick_arrays) > 0, "tick_arrays[0] must be initialized")
+
+        start_tick_index = tick_arrays[-1].start_tick_index
+        if a_to_b:
+            return max(start_tick_index, MIN_TICK_INDEX)
+        return min(start_tick_index + (TICK_ARRAY_SIZE - 1) * pool.whirlpool.tick_spacing, MAX_TICK_INDEX)
+
+    def get_target_sqrt_price(self, level: int) -> int:
+        # sqrt price where the marginal rate after fee reaches level^2 (x128)
+        # a to b: price * (1 - fee) = level^2, b to a: price / (1 - fee) = level^2
+        if self.a_to_b:
+            return math.isqrt(level * level * FEE_RATE_MUL_VALUE // (FEE_RATE_MUL_VALUE - self.fee_rate))
+        return math.isqrt(level * level * (FEE_RATE_MUL_VALUE - self.fee_rate) // FEE_RATE_MUL_VALUE)
+
+    def get_input_amount(self, level: int) -> int:
+        # input amount (including fee) to move the marginal rate to level
+        target = self.get_target_sqrt_price(level)
+        if self.a_to_b:
+            if target >= self.sqrt_price:
+                return 0
+            target = max(target, self.limit_sqrt_price)
+            k = bisect.bisect_right(self._keys, -target) - 1
+        else:
+            if target <= self.sqrt_price:
+                return 0
+            target = min(target, self.limit_sqrt_price)
+            k = bisect.bisect_right(self._keys, target) - 1
+
+        amount = self.cumulative_inputs[k]
+        if k + 1 < len(self.breakpoints):
+            amount += self._get_amount_delta(self.breakpoints[k], target, self.liquidities[k])
+        # fee is charged on top of the amount moving the price
+        denominator = FEE_RATE_MUL_VALUE - self.fee_rate
+        return (amount * FEE_RATE_MUL_VALUE + denominator - 1) // denominator
+
+    def get_max_input_amount(self) -> int:
+        return self.get_input_amount(MIN_SQRT_PRICE if self.a_to_b else MAX_SQRT_PRICE)
+
+
+class SplitSwapOptimizer:
+    # splits an exact input swap across whirlpools of the same pair by equalizing their marginal rates after fee.
+    #
+    # the common marginal rate (level) is bisected so that the sum of input amounts moving every pool to the level
+    # matches the order amount, then each allocation is quoted with the off-chain swap quote.
+    @staticmethod
+    def optimize(params: SplitSwapParams) -> SplitSwapPlan:
+        invariant(params.amount > 0, "amount > 0")
+        invariant(len(params.pools) > 0, "len(pools) > 0")
+        mint_a, mint_b = params.pools[0].whirlpool.token_mint_a, params.pools[0].whirlpool.token_mint_b
+        for pool in params.pools:
+            invariant(pool.whirlpool.token_mint_a == mint_a and pool.whirlpool.token_mint_b == mint_b, "pools must have the same token pair")
+
+        curves = [SwapCurve(pool, params.a_to_b) for pool in params.pools]
+        max_inputs = [curve.get_max_input_amount() for curve in curves]
+        invariant(sum(max_inputs) >= params.amount, "not enough liquidity within the tick arrays")
+
+        # a to b: the input grows as the level goes down, b to a: the input grows as the level goes up
+        lo, hi = MIN_SQRT_PRICE, MAX_SQRT_PRICE
+        while lo < hi:
+            if params.a_to_b:
+                level = (lo + hi) // 2
+                if SplitSwapOptimizer._get_total_input(curves, level) <= params.amount:
+                    hi = level
+                else:
+                    lo = level + 1
+            else:
+                level = (lo + hi + 1) // 2
+                if SplitSwapOptimizer._get_total_input(curves, level) <= params.amount:
+                    lo = level
+                else:
+                    hi = level - 1
+        allocations = [curve.get_input_amount(lo) for curve in curves]
+
+        # the remainder (rounding of the level) goes to the pools which still have room, the largest allocation first
+        remainder = params.amount - sum(allocations)
+        order = sorted(range(len(curves)), key=lambda i: allocations[i], reverse=True)
+        for i in order:
+            if remainder == 0:
+                break
+            added = min(remainder, max_inputs[i] - allocations[i])
+            allocations[i] += added
+            remainder -= added
+
+        legs = []
+        for pool, curve, allocation in zip(params.pools, curves, allocations):
+            if allocation == 0:
+                continue
+            whirlpool = pool.whirlpool
+            quote = swap_quote_with_params(SwapQuoteParams(
+                amount=allocation,
+                amount_specified_is_input=True,
+                a_to_b=params.a_to_b,
+                tick_current_index=whirlpool.tick_current_index,
+                sqrt_price=whirlpool.sqrt_price,
+                liquidity=whirlpool.liquidity,
+                fee_rate=whirlpool.fee_rate,
+                tick_spacing=whirlpool.tick_spacing,
+                tick_arrays=pool.tick_arrays,
+                slippage_tolerance=params.slippage_tolerance,
+                # fee rounding may leave a few units on a leg filled up to the end of its tick arrays
+                sqrt_price_limit=curve.limit_sqrt_price,
+            ))
+            legs.append(SplitSwapLeg(pool.whirlpool_pubkey, whirlpool, quote))
+
+        return SplitSwapPlan(
+            a_to_b=params.a_to_b,
+            legs=legs,
+            estimated_amount_in=sum(map(lambda leg: leg.quote.estimated_amount_in, legs)),
+            estimated_amount_out=sum(map(lambda leg: leg.quote.estimated_amount_out, legs)),
+            other_amount_threshold=sum(map(lambda leg: leg.quote.other_amount_threshold, legs)),
+        )
+
+    @staticmethod
+    def _get_total_input(curves: List[SwapCurve], level: int) -> int:
+        return sum(map(lambda curve: curve.get_input_amount(level), curves))
+
+    @staticmethod
+    def build_transaction(
+        ctx: WhirlpoolContext,
+        plan: SplitSwapPlan,
+        token_owner_account_a: PublicKey,
+        token_owner_account_b: PublicKey,
+    ) -> TransactionBuilder:
+        # one swap instruction per leg, each leg is protected by its own threshold
+        builder = TransactionBuilder(ctx.connection, ctx.wallet)
+        for leg in plan.legs:
+            whirlpool = leg.whirlpool
+            tick_array_pubkeys = SwapUtil.get_tick_array_pubkeys(
+                whirlpool.tick_current_index,
+                whirlpool.tick_spacing,
+                plan.a_to_b,
+                ctx.program_id,
+                leg.whirlpool_pubkey,
+            )
+            builder.add_instruction(WhirlpoolIx.swap(
+                ctx.program_id,
+                SwapParams(
+                    amount=leg.quote.amount,
+                    other_amount_threshold=leg.quote.other_amount_threshold,
+                    sqrt_price_limit=leg.quote.sqrt_price_limit,
+                    amount_specified_is_input=leg.quote.amount_specified_is_input,
+                    a_to_b=leg.quote.a_to_b,
+                    token_authority=ctx.wallet.public_key,
+                    whirlpool=leg.whirlpool_pubkey,
+                    token_owner_account_a=token_owner_account_a,
+                    token_vault_a=whirlpool.token_vault_a,
+                    token_owner_account_b=token_owner_account_b,
+                    token_vault_b=whirlpool.token_vault_b,
+                    tick_array_0=tick_array_pubkeys[0],
+                    tick_array_1=tick_array_pubkeys[1],
+                    tick_array_2=tick_array_pubkeys[2],
+                    oracle=PDAUtil.get_oracle(ctx.program_id, leg.whirlpool_pubkey).pubkey,
+                )
+            ))
+        return builder
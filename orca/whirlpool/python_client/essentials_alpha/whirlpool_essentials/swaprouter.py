@@ -0,0 +1,241 @@
+import dataclasses
+from typing import Dict, List, Optional, Tuple
+from solana.publickey import PublicKey
+from .static_client.accounts import Whirlpool, TickArray
+from .accountfetcher import AccountFetcher
+from .types import Percentage
+from .invariant import invariant
+from .swaputil import SwapUtil
+from .quote.swap import SwapQuote, SwapQuoteParams, SwapTickSequenceExhaustedError, swap_quote_with_params
+
+
+@dataclasses.dataclass(frozen=True)
+class RouteHop:
+    whirlpool_pubkey: PublicKey
+    whirlpool: Whirlpool
+    input_token_mint: PublicKey
+    output_token_mint: PublicKey
+    tick_array_pubkeys: List[PublicKey]
+    quote: SwapQuote
+
+
+@dataclasses.dataclass(frozen=True)
+class Route:
+    input_token_mint: PublicKey
+    output_token_mint: PublicKey
+    amount_specified_is_input: bool
+    hops: List[RouteHop]
+    estimated_amount_in: int
+    estimated_amount_out: int
+    # minimum output (exact input) or maximum input (exact output) of the whole route
+    other_amount_threshold: int
+
+
+@dataclasses.dataclass(frozen=True)
+class RouteEdge:
+    whirlpool_pubkey: PublicKey
+    a_to_b: bool
+    output_token_mint: PublicKey
+
+
+# 1 or 2 hops
+Path = Tuple[RouteEdge, ...]
+
+
+class SwapRouter:
+    # finds the best 1 or 2 hop route over the given (cached) whirlpools.
+    #
+    # tick arrays of all candidate hops are fetched with one bulk fetch, then every path is quoted off-chain.
+    # hops shared by several paths (e.g. the first hop into a popular intermediate token) are quoted only once.
+    def __init__(self, program_id: PublicKey, fetcher: AccountFetcher, whirlpools: Dict[PublicKey, Whirlpool]):
+        self._program_id = program_id
+        self._fetcher = fetcher
+        self._whirlpools: Dict[PublicKey, Whirlpool] = {}
+        self._edges: Dict[PublicKey, Dict[PublicKey, RouteEdge]] = {}  # input mint -> whirlpool pubkey -> edge
+        for pubkey, whirlpool in whirlpools.items():
+            self.update_whirlpool(pubkey, whirlpool)
+
+    @staticmethod
+    async def load(program_id: PublicKey, fetcher: AccountFetcher, pubkeys: List[PublicKey], refresh: bool = False) -> "SwapRouter":
+        whirlpools = await fetcher.list_whirlpools(pubkeys, refresh)
+        return SwapRouter(program_id, fetcher, {
+            pubkey: whirlpool
+            for pubkey, whirlpool in zip(pubkeys, whirlpools)
+            if whirlpool is not None
+        })
+
+    @property
+    def whirlpools(self) -> Dict[PublicKey, Whirlpool]:
+        return self._whirlpools
+
+    def update_whirlpool(self, pubkey: PublicKey, whirlpool: Whirlpool):
+        # token mints of a whirlpool never change, so only the state is replaced on update
+        self._whirlpools[pubkey] = whirlpool
+        mint_a, mint_b = whirlpool.token_mint_a, whirlpool.token_mint_b
+        self._edges.setdefault(mint_a, {})[pubkey] = RouteEdge(pubkey, True, mint_b)
+        self._edges.setdefault(mint_b, {})[pubkey] = RouteEdge(pubkey, False, mint_a)
+
+    def get_paths(self, input_token_mint: PublicKey, output_token_mint: PublicKey) -> List[Path]:
+        invariant(input_token_mint != output_token_mint, "input_token_mint != output_token_mint")
+
+        paths = []
+        for first in self._edges.get(input_token_mint, {}).values():
+            if first.output_token_mint == output_token_mint:
+                paths.append((first,))
+                continue
+            for second in self._edges.get(first.output_token_mint, {}).values():
+                if second.output_token_mint == output_token_mint:
+                    paths.append((first, second))
+        return paths
+
+    async def find_routes(
+        self,
+        input_token_mint: PublicKey,
+        output_token_mint: PublicKey,
+        amount: int,
+        amount_specified_is_input: bool,
+        slippage_tolerance: Percentage,
+        refresh: bool = False,
+    ) -> List[Route]:
+        # all routes which can be quoted, the best first
+        paths = self.get_paths(input_token_mint, output_token_mint)
+        if len(paths) == 0:
+            return []
+
+        tick_arrays = await self._fetch_tick_arrays(paths, refresh)
+
+        quote_cache = {}
+        routes = []
+        for path in paths:
+            route = self._quote_path(path, input_token_mint, amount, amount_specified_is_input, slippage_tolerance, tick_arrays, quote_cache)
+            if route is not None:
+                routes.append(route)
+
+        if amount_specified_is_input:
+            routes.sort(key=lambda r: r.estimated_amount_out, reverse=True)
+        else:
+            routes.sort(key=lambda r: r.estimated_amount_in)
+        return routes
+
+    async def find_best_route(
+        self,
+        input_token_mint: PublicKey,
+        output_token_mint: PublicKey,
+        amount: int,
+        amount_specified_is_input: bool,
+        slippage_tolerance: Percentage,
+        refresh: bool = False,
+    ) -> Optional[Route]:
+        routes = await self.find_routes(input_token_mint, output_token_mint, amount, amount_specified_is_input, slippage_tolerance, refresh)
+        return routes[0] if len(routes) > 0 else None
+
+    def _get_tick_array_pubkeys(self, edge: RouteEdge) -> List[PublicKey]:
+        whirlpool = self._whirlpools[edge.whirlpool_pubkey]
+        return SwapUtil.get_tick_array_pubkeys(
+            whirlpool.tick_current_index,
+            whirlpool.tick_spacing,
+            edge.a_to_b,
+            self._program_id,
+            edge.whirlpool_pubkey,
+        )
+
+    async def _fetch_tick_arrays(self, paths: List[Path], refresh: bool) -> Dict[Tuple[PublicKey, bool], Tuple[List[PublicKey], List[Optional[TickArray]]]]:
+        edges = {}
+        for path in paths:
+            for edge in path:
+                edges[(edge.whirlpool_pubkey, edge.a_to_b)] = edge
+
+        pubkeys_by_edge = {key: self._get_tick_array_pubkeys(edge) for key, edge in edges.items()}
+        unique_pubkeys = list({pubkey: None for pubkeys in pubkeys_by_edge.values() for pubkey in pubkeys}.keys())
+        fetched = await self._fetcher.list_tick_arrays(unique_pubkeys, refresh)
+        tick_array_by_pubkey = dict(zip(unique_pubkeys, fetched))
+
+        return {
+            key: (pubkeys, [tick_array_by_pubkey[pubkey] for pubkey in pubkeys])
+            for key, pubkeys in pubkeys_by_edge.items()
+        }
+
+    def _quote_hop(
+        self,
+        edge: RouteEdge,
+        amount: int,
+        amount_specified_is_input: bool,
+        slippage_tolerance: Percentage,
+        tick_arrays,
+        quote_cache: Dict,
+    ) -> Optional[RouteHop]:
+        key = (edge.whirlpool_pubkey, edge.a_to_b, amount, amount_specified_is_input)
+        if key in quote_cache:
+            return quote_cache[key]
+
+        whirlpool = self._whirlpools[edge.whirlpool_pubkey]
+        tick_array_pubkeys, edge_tick_arrays = tick_arrays[(edge.whirlpool_pubkey, edge.a_to_b)]
+        hop = None
+        # no tick array at the current price (e.g. an abandoned pool) is no route, not an error
+        if amount > 0 and edge_tick_arrays[0] is not None:
+            try:
+                quote = swap_quote_with_params(SwapQuoteParams(
+                    amount=amount,
+                    amount_specified_is_input=amount_specified_is_input,
+                    a_to_b=edge.a_to_b,
+                    tick_current_index=whirlpool.tick_current_index,
+                    sqrt_price=whirlpool.sqrt_price,
+                    liquidity=whirlpool.liquidity,
+                    fee_rate=whirlpool.fee_rate,
+                    tick_spacing=whirlpool.tick_spacing,
+                    tick_arrays=edge_tick_arrays,
+                    slippage_tolerance=slippage_tolerance,
+                ))
+                hop = RouteHop(
+                    whirlpool_pubkey=edge.whirlpool_pubkey,
+                    whirlpool=whirlpool,
+                    input_token_mint=whirlpool.token_mint_a if edge.a_to_b else whirlpool.token_mint_b,
+                    output_token_mint=edge.output_token_mint,
+                    tick_array_pubkeys=tick_array_pubkeys,
+                    quote=quote,
+                )
+            except SwapTickSequenceExhaustedError:
+                # not enough liquidity within the tick arrays
+                hop = None
+
+        quote_cache[key] = hop
+        return hop
+
+    def _quote_path(
+        self,
+        path: Path,
+        input_token_mint: PublicKey,
+        amount: int,
+        amount_specified_is_input: bool,
+        slippage_tolerance: Percentage,
+        tick_arrays,
+        quote_cache: Dict,
+    ) -> Optional[Route]:
+        # exact input: quote from the first hop, exact output: quote from the last hop
+        hops = []
+        ordered = path if amount_specified_is_input else tuple(reversed(path))
+        for edge in ordered:
+            hop = self._quote_hop(edge, amount, amount_specified_is_input, slippage_tolerance, tick_arrays, quote_cache)
+            if hop is None:
+                return None
+            hops.append(hop)
+            amount = hop.quote.estimated_amount_out if amount_specified_is_input else hop.quote.estimated_amount_in
+        if not amount_specified_is_input:
+            hops.reverse()
+
+        estimated_amount_in = hops[0].quote.estimated_amount_in
+        estimated_amount_out = hops[-1].quote.estimated_amount_out
+        if amount_specified_is_input:
+            other_amount_threshold = slippage_tolerance.adjust_sub(estimated_amount_out)
+        else:
+            other_amount_threshold = slippage_tolerance.adjust_add(estimated_amount_in)
+
+        return Route(
+            input_token_mint=input_token_mint,
+            output_token_mint=hops[-1].output_token_mint,
+            amount_specified_is_input=amount_specified_is_input,
+            hops=hops,
+            estimated_amount_in=estimated_amount_in,
+            estimated_amount_out=estimated_amount_out,
+            other_amount_threshold=other_amount_threshold,
+        )
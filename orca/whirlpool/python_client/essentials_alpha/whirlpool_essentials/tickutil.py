@@ -1,10 +1,20 @@
-import math
+from typing import Sequence, Union
 from .constants import TICK_ARRAY_SIZE, MIN_TICK_INDEX, MAX_TICK_INDEX
 from .invariant import invariant
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# list of int, or numpy.ndarray of int64 if numpy is available
+TickIndexes = Union[Sequence[int], "np.ndarray"]
+
 
 def div_floor(a: int, b: int) -> int:
-    return math.floor(a / b)
+    return a // b
 
 
 class TickUtil:
@@ -42,3 +52,23 @@ class TickUtil:
     @staticmethod
     def is_tick_index_in_bounds(tick_index: int) -> bool:
         return MIN_TICK_INDEX <= tick_index <= MAX_TICK_INDEX
+
+    @staticmethod
+    def get_start_tick_index_array(tick_indexes: TickIndexes, tick_spacing: int, offset: int = 0) -> TickIndexes:
+        ticks_in_array = TICK_ARRAY_SIZE * tick_spacing
+        if NUMPY_AVAILABLE:
+            start_tick_indexes = (np.asarray(tick_indexes, dtype=np.int64) // ticks_in_array + offset) * ticks_in_array
+            if len(start_tick_indexes) > 0:
+                invariant(MIN_TICK_INDEX < int(start_tick_indexes.min()) + ticks_in_array, "too small start_tick_index")
+                invariant(int(start_tick_indexes.max()) <= MAX_TICK_INDEX, "too large start_tick_index")
+            return start_tick_indexes
+        return [TickUtil.get_start_tick_index(tick_index, tick_spacing, offset) for tick_index in tick_indexes]
+
+    @staticmethod
+    def get_initializable_tick_index_array(tick_indexes: TickIndexes, tick_spacing: int) -> TickIndexes:
+        # rounded toward zero as get_initializable_tick_index
+        if NUMPY_AVAILABLE:
+            tick_indexes = np.asarray(tick_indexes, dtype=np.int64)
+            initializable_tick_index_abs = np.abs(tick_indexes) // tick_spacing * tick_spacing
+            return np.where(tick_indexes >= 0, initializable_tick_index_abs, -initializable_tick_index_abs)
+        return [TickUtil.get_initializable_tick_index(tick_index, tick_spacing) for tick_index in tick_indexes]
@@ -1,3 +1,5 @@
+import weakref
+from typing import Dict, List, Tuple, TYPE_CHECKING
 from solana.rpc.async_api import AsyncClient
 from solana.publickey import PublicKey
 from solana.keypair import Keypair
@@ -8,9 +10,18 @@ from spl.token._layouts import MINT_LAYOUT, ACCOUNT_LAYOUT
 from spl.token.constants import TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT, ACCOUNT_LEN
 from spl.token import instructions as token_program
 from .transaction.types import Instruction, EMPTY_INSTRUCTION
-from .types import PublicKeyWithInstruction
+from .types import PublicKeyWithInstruction, PublicKeysWithInstruction
+from .rentcalculator import RentCalculator
 from .invariant import invariant
 
+if TYPE_CHECKING:
+    from .accountfetcher import AccountFetcher
+    from .wrappedsol import WrappedSolAccountManager
+
+
+# one calculator (and cached rent parameters) per connection
+_rent_calculators: "weakref.WeakKeyDictionary[AsyncClient, RentCalculator]" = weakref.WeakKeyDictionary()
+
 
 class TokenUtil:
     # https://github.com/michaelhly/solana-py/blob/32119e6924d72cd2d605a949b28f2a366941d641/src/spl/token/core.py#L373
@@ -78,6 +89,18 @@ class TokenUtil:
 
         return MintInfo(mint_authority, supply, decimals, is_initialized, freeze_authority)
 
+    @staticmethod
+    def get_rent_calculator(connection: AsyncClient) -> RentCalculator:
+        calculator = _rent_calculators.get(connection)
+        if calculator is None:
+            calculator = RentCalculator(connection)
+            _rent_calculators[connection] = calculator
+        return calculator
+
+    @staticmethod
+    async def get_minimum_balance_for_rent_exemption(connection: AsyncClient, data_len: int) -> int:
+        return await TokenUtil.get_rent_calculator(connection).get_minimum_balance_for_rent_exemption(data_len)
+
     @staticmethod
     def derive_ata(owner: PublicKey, mint: PublicKey) -> PublicKey:
         return get_associated_token_address(owner, mint)
@@ -88,12 +111,16 @@ class TokenUtil:
         owner: PublicKey,
         mint: PublicKey,
         wrapped_sol_amount: int = 0,
-        funder: PublicKey = None
+        funder: PublicKey = None,
+        wrapped_sol_account_manager: "WrappedSolAccountManager" = None,
     ) -> PublicKeyWithInstruction:
         if funder is None:
             funder = owner
 
         if mint == WRAPPED_SOL_MINT:
+            if wrapped_sol_account_manager is not None:
+                invariant(wrapped_sol_account_manager.owner == owner, "wrapped_sol_account_manager.owner == owner")
+                return await wrapped_sol_account_manager.prepare(wrapped_sol_amount)
             return await TokenUtil.prepare_wrapped_sol_token_account(
                 connection,
                 owner,
@@ -119,6 +146,70 @@ class TokenUtil:
             )
         )
 
+    @staticmethod
+    async def resolve_or_create_atas(
+        connection: AsyncClient,
+        fetcher: "AccountFetcher",
+        pairs: List[Tuple[PublicKey, PublicKey]],
+        wrapped_sol_amount: int = 0,
+        funder: PublicKey = None,
+        refresh: bool = False,
+        wrapped_sol_account_manager: "WrappedSolAccountManager" = None,
+    ) -> PublicKeysWithInstruction:
+        # pairs: list of (owner, mint), pubkeys are returned in the same order
+        atas: Dict[str, PublicKey] = {}
+        wrapped_sol_accounts: Dict[str, PublicKeyWithInstruction] = {}
+        pubkeys = []
+        for owner, mint in pairs:
+            if mint == WRAPPED_SOL_MINT:
+                key = str(owner)
+                if key not in wrapped_sol_accounts:
+                    wrapped_sol_accounts[key] = await TokenUtil.resolve_or_create_ata(
+                        connection,
+                        owner,
+                        mint,
+                        wrapped_sol_amount,
+                        funder,
+                        wrapped_sol_account_manager,
+                    )
+                pubkeys.append(wrapped_sol_accounts[key].pubkey)
+                continue
+
+            ata = TokenUtil.derive_ata(owner, mint)
+            atas.setdefault(str(ata), (ata, owner, mint))
+            pubkeys.append(ata)
+
+        unique_atas = list(atas.values())
+        token_accounts = await fetcher.list_token_accounts([ata for ata, _, _ in unique_atas], refresh)
+
+        instructions = []
+        cleanup_instructions = []
+        signers = []
+        for (ata, owner, mint), token_account in zip(unique_atas, token_accounts):
+            if token_account is not None:
+                invariant(token_account.owner == owner, "token_account.owner == owner")
+                invariant(token_account.mint == mint, "token_account.mint == mint")
+                continue
+            instructions.append(token_program.create_associated_token_account(
+                owner if funder is None else funder,
+                owner,
+                mint
+            ))
+
+        for wrapped_sol_account in wrapped_sol_accounts.values():
+            instructions.extend(wrapped_sol_account.instruction.instructions)
+            cleanup_instructions.extend(wrapped_sol_account.instruction.cleanup_instructions)
+            signers.extend(wrapped_sol_account.instruction.signers)
+
+        return PublicKeysWithInstruction(
+            pubkeys=pubkeys,
+            instruction=Instruction(
+                instructions=instructions,
+                cleanup_instructions=cleanup_instructions,
+                signers=signers,
+            )
+        )
+
     @staticmethod
     async def prepare_wrapped_sol_token_account(
         connection: AsyncClient,
@@ -130,7 +221,7 @@ class TokenUtil:
             funder = owner
 
         wsol_token_account = Keypair.generate()
-        rent_lamports = (await connection.get_minimum_balance_for_rent_exemption(ACCOUNT_LEN)).value
+        rent_lamports = await TokenUtil.get_minimum_balance_for_rent_exemption(connection, ACCOUNT_LEN)
 
         create_account_ix = system_program.create_account(system_program.CreateAccountParams(
             from_pubkey=funder,
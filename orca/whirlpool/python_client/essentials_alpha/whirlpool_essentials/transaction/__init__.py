@@ -1,2 +1,6 @@
 from .builder import TransactionBuilder
 from .types import Instruction, EMPTY_INSTRUCTION
+from .computebudget import ComputeBudgetIx, ComputeBudgetEstimator, PriorityFeeEstimator, FixedPriorityFeeEstimator
+from .compiled import CompiledTransaction
+from .processor import TransactionProcessor, SignedTransaction, TransactionFailedError
+from .batchsigner import BatchSigner
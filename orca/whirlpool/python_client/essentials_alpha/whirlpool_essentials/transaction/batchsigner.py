@@ -0,0 +1,39 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import List, Optional
+from solders.keypair import Keypair as SoldersKeypair
+from solders.signature import Signature
+from .compiled import CompiledTransaction
+
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+# module level function so that it can be pickled for ProcessPoolExecutor
+def sign_message(secret_keys: List[bytes], message: bytes) -> List[bytes]:
+    return [bytes(SoldersKeypair.from_bytes(secret_key).sign_message(message)) for secret_key in secret_keys]
+
+
+class BatchSigner:
+    # executor: None (sequential), ThreadPoolExecutor or ProcessPoolExecutor
+    def __init__(self, executor: Optional[Executor] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._executor = executor
+        self._chunk_size = chunk_size
+
+    def sign(self, transactions: List[CompiledTransaction]) -> List[bytes]:
+        secret_keys = [[signer.secret_key for signer in tx.signers] for tx in transactions]
+        messages = [tx.message for tx in transactions]
+
+        if self._executor is None:
+            signatures = map(sign_message, secret_keys, messages)
+        else:
+            signatures = self._executor.map(sign_message, secret_keys, messages, chunksize=self._chunk_size)
+
+        for tx, tx_signatures in zip(transactions, signatures):
+            tx.set_signatures([Signature.from_bytes(signature) for signature in tx_signatures])
+
+        return [tx.serialize() for tx in transactions]
+
+    async def sign_async(self, transactions: List[CompiledTransaction]) -> List[bytes]:
+        # keep the event loop responsive while the pool is signing
+        return await asyncio.get_running_loop().run_in_executor(None, self.sign, transactions)
@@ -3,15 +3,23 @@ from solana.keypair import Keypair
 from solana.blockhash import Blockhash
 from solana.transaction import Transaction, TransactionInstruction
 from solana.rpc.async_api import AsyncClient
+from solders.rpc.responses import RpcBlockhash
 from solders.signature import Signature
 from .types import Instruction, TransactionPayload
 from .processor import TransactionProcessor
+from .computebudget import ComputeBudgetEstimator
 
 
 class TransactionBuilder:
-    def __init__(self, connection: AsyncClient, fee_payer: Keypair):
+    def __init__(
+        self,
+        connection: AsyncClient,
+        fee_payer: Keypair,
+        compute_budget_estimator: Optional[ComputeBudgetEstimator] = None,
+    ):
         self._connection = connection
         self._fee_payer = fee_payer
+        self._compute_budget_estimator = compute_budget_estimator
         self._instructions = []
         self._signers = []
 
@@ -56,6 +64,16 @@ class TransactionBuilder:
         )
 
         packed = self.pack_instructions(True)
+
+        # optional: simulate to set a tight compute unit limit and attach a priority fee
+        if self._compute_budget_estimator is not None:
+            compute_budget = await self._compute_budget_estimator.estimate(
+                self._fee_payer.public_key,
+                recent_blockhash,
+                packed.instructions,
+            )
+            transaction.add(*compute_budget.to_instructions())
+
         transaction.add(*packed.instructions)
 
         return TransactionPayload(
@@ -63,8 +81,9 @@ class TransactionBuilder:
             signers=packed.signers + self._signers
         )
 
-    async def build_and_execute(self) -> Signature:
-        payload = await self.build()
+    async def build_and_execute(self, latest_blockhash: Optional[RpcBlockhash] = None) -> Signature:
+        recent_blockhash = None if latest_blockhash is None else Blockhash(str(latest_blockhash.blockhash))
+        payload = await self.build(recent_blockhash)
         processor = TransactionProcessor(self._connection, self._fee_payer)
-        signed_transaction = await processor.sign_and_construct_transaction(payload)
+        signed_transaction = await processor.sign_and_construct_transaction(payload, latest_blockhash)
         return await signed_transaction.execute()
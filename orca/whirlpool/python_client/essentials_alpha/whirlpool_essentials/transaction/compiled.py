@@ -0,0 +1,97 @@
+from typing import List, Tuple
+from solders.hash import Hash
+from solders.signature import Signature
+from solana.keypair import Keypair
+from solana.blockhash import Blockhash
+from solana.transaction import Transaction
+from ..invariant import invariant
+
+
+PUBKEY_LENGTH = 32
+MESSAGE_HEADER_LENGTH = 3
+
+
+# https://docs.solana.com/developing/programming-model/transactions#compact-array-format
+def encode_shortvec(value: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        elem = value & 0x7f
+        value >>= 7
+        if value == 0:
+            encoded.append(elem)
+            return bytes(encoded)
+        encoded.append(elem | 0x80)
+
+
+def decode_shortvec(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        elem = data[offset]
+        offset += 1
+        value |= (elem & 0x7f) << shift
+        if elem & 0x80 == 0:
+            return value, offset
+        shift += 7
+
+
+class CompiledTransaction:
+    # keeps the serialized message, so that re-signing with another blockhash
+    # only patches 32 bytes instead of rebuilding and recompiling the transaction.
+    def __init__(self, message: bytes, signers: List[Keypair]):
+        self._message = bytearray(message)
+
+        num_required_signatures = message[0]
+        num_keys, keys_offset = decode_shortvec(message, MESSAGE_HEADER_LENGTH)
+        self._blockhash_offset = keys_offset + PUBKEY_LENGTH * num_keys
+
+        # signatures must be ordered as the signer keys in the message
+        signer_map = {bytes(signer.public_key): signer for signer in signers}
+        self._signers = []
+        for i in range(num_required_signatures):
+            key_offset = keys_offset + PUBKEY_LENGTH * i
+            key = bytes(message[key_offset:key_offset + PUBKEY_LENGTH])
+            invariant(key in signer_map, "signer for required signature is missing")
+            self._signers.append(signer_map[key])
+
+        self._signature_count = encode_shortvec(num_required_signatures)
+        self._signatures: List[Signature] = []
+
+    @staticmethod
+    def from_transaction(transaction: Transaction, signers: List[Keypair]) -> "CompiledTransaction":
+        return CompiledTransaction(transaction.serialize_message(), signers)
+
+    @property
+    def message(self) -> bytes:
+        return bytes(self._message)
+
+    @property
+    def signers(self) -> List[Keypair]:
+        return self._signers
+
+    @property
+    def signature(self) -> Signature:
+        invariant(len(self._signatures) > 0, "transaction is not signed")
+        return self._signatures[0]
+
+    @property
+    def recent_blockhash(self) -> Blockhash:
+        blockhash = bytes(self._message[self._blockhash_offset:self._blockhash_offset + PUBKEY_LENGTH])
+        return Blockhash(str(Hash(blockhash)))
+
+    def set_recent_blockhash(self, recent_blockhash: Blockhash):
+        offset = self._blockhash_offset
+        self._message[offset:offset + PUBKEY_LENGTH] = bytes(Hash.from_string(str(recent_blockhash)))
+        self._signatures = []
+
+    def set_signatures(self, signatures: List[Signature]):
+        invariant(len(signatures) == len(self._signers), "len(signatures) == len(signers)")
+        self._signatures = list(signatures)
+
+    def sign(self):
+        message = bytes(self._message)
+        self.set_signatures([signer.sign(message) for signer in self._signers])
+
+    def serialize(self) -> bytes:
+        invariant(len(self._signatures) > 0, "transaction is not signed")
+        return self._signature_count + b"".join(map(bytes, self._signatures)) + bytes(self._message)
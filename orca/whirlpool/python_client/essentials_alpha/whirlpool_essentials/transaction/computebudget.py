@@ -0,0 +1,177 @@
+import abc
+import dataclasses
+import struct
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from solana.publickey import PublicKey
+from solana.blockhash import Blockhash
+from solana.transaction import Transaction, TransactionInstruction
+from solana.rpc.async_api import AsyncClient
+from ..percentage import Percentage
+from ..invariant import invariant
+
+
+# https://github.com/solana-labs/solana/blob/master/sdk/src/compute_budget.rs
+COMPUTE_BUDGET_PROGRAM_ID = PublicKey("ComputeBudget111111111111111111111111111111")
+MAX_COMPUTE_UNIT_LIMIT = 1_400_000
+
+COMPUTE_BUDGET_IX_SET_COMPUTE_UNIT_LIMIT = 2
+COMPUTE_BUDGET_IX_SET_COMPUTE_UNIT_PRICE = 3
+
+DEFAULT_COMPUTE_UNIT_MARGIN = Percentage.from_fraction(10, 100)
+DEFAULT_UNITS_CACHE_SIZE = 1024
+
+# whirlpool swap instruction data: discriminator, amount (u64), other_amount_threshold (u64), sqrt_price_limit (u128), 2 bools
+# (the same layout as instruction/encoder.py, which cannot be imported here because of a circular import)
+WHIRLPOOL_SWAP_DISCRIMINATOR = b"\xf8\xc6\x9e\x91\xe1u\x87\xc8"
+WHIRLPOOL_SWAP_DATA_SIZE = 8 + 8 + 8 + 16 + 1 + 1
+
+
+class ComputeBudgetIx:
+    @staticmethod
+    def set_compute_unit_limit(units: int) -> TransactionInstruction:
+        invariant(0 < units <= MAX_COMPUTE_UNIT_LIMIT, "0 < units <= MAX_COMPUTE_UNIT_LIMIT")
+        data = struct.pack("<BI", COMPUTE_BUDGET_IX_SET_COMPUTE_UNIT_LIMIT, units)
+        return TransactionInstruction([], COMPUTE_BUDGET_PROGRAM_ID, data)
+
+    @staticmethod
+    def set_compute_unit_price(micro_lamports: int) -> TransactionInstruction:
+        data = struct.pack("<BQ", COMPUTE_BUDGET_IX_SET_COMPUTE_UNIT_PRICE, micro_lamports)
+        return TransactionInstruction([], COMPUTE_BUDGET_PROGRAM_ID, data)
+
+
+@dataclasses.dataclass(frozen=True)
+class ComputeBudget:
+    compute_unit_limit: int
+    compute_unit_price: int
+
+    def to_instructions(self) -> List[TransactionInstruction]:
+        instructions = [ComputeBudgetIx.set_compute_unit_limit(self.compute_unit_limit)]
+        if self.compute_unit_price > 0:
+            instructions.append(ComputeBudgetIx.set_compute_unit_price(self.compute_unit_price))
+        return instructions
+
+
+class PriorityFeeEstimator(abc.ABC):
+    # returns compute unit price (micro lamports per compute unit)
+    @abc.abstractmethod
+    async def estimate(self, writable_accounts: List[PublicKey]) -> int:
+        pass
+
+
+class FixedPriorityFeeEstimator(PriorityFeeEstimator):
+    def __init__(self, micro_lamports: int):
+        self._micro_lamports = micro_lamports
+
+    async def estimate(self, writable_accounts: List[PublicKey]) -> int:
+        return self._micro_lamports
+
+
+# (program id, accounts, bucket of swap amount) of each instruction
+OperationShape = Tuple[Tuple[str, Tuple[str, ...], Optional[int]], ...]
+
+
+def get_swap_amount(ix: TransactionInstruction) -> Optional[int]:
+    data = ix.data
+    if len(data) != WHIRLPOOL_SWAP_DATA_SIZE or data[:8] != WHIRLPOOL_SWAP_DISCRIMINATOR:
+        return None
+    return struct.unpack_from("<Q", data, 8)[0]
+
+
+def get_swap_amounts(instructions: List[TransactionInstruction]) -> Tuple[int, ...]:
+    return tuple(amount for amount in map(get_swap_amount, instructions) if amount is not None)
+
+
+def get_operation_shape(instructions: List[TransactionInstruction], fee_payer: Optional[PublicKey] = None) -> OperationShape:
+    # the account set identifies the operation, except:
+    # - signers other than fee_payer are usually ephemeral keypairs (position mint, temporary WSOL account),
+    #   they are replaced with their order of appearance
+    # - compute usage of swap grows with the number of crossed ticks, so swap amount is bucketed by power of 2
+    ephemeral = {}
+    for ix in instructions:
+        for key in ix.keys:
+            if key.is_signer and key.pubkey != fee_payer:
+                ephemeral.setdefault(str(key.pubkey), "signer:{}".format(len(ephemeral)))
+
+    shape = []
+    for ix in instructions:
+        keys = tuple(ephemeral.get(str(key.pubkey), str(key.pubkey)) for key in ix.keys)
+        amount = get_swap_amount(ix)
+        shape.append((str(ix.program_id), keys, None if amount is None else amount.bit_length()))
+    return tuple(shape)
+
+
+def get_writable_accounts(instructions: List[TransactionInstruction]) -> List[PublicKey]:
+    writable = {}
+    for ix in instructions:
+        for key in ix.keys:
+            if key.is_writable:
+                writable[str(key.pubkey)] = key.pubkey
+    return list(writable.values())
+
+
+class ComputeBudgetEstimator:
+    def __init__(
+        self,
+        connection: AsyncClient,
+        fee_estimator: Optional[PriorityFeeEstimator] = None,
+        margin: Percentage = DEFAULT_COMPUTE_UNIT_MARGIN,
+        cache_size: int = DEFAULT_UNITS_CACHE_SIZE,
+    ):
+        self._connection = connection
+        self._fee_estimator = fee_estimator
+        self._margin = margin
+        self._cache_size = cache_size
+        # shape -> (simulated swap amounts, compute unit limit), least recently used first
+        self._units_cache: "OrderedDict[OperationShape, Tuple[Tuple[int, ...], int]]" = OrderedDict()
+
+    async def estimate(
+        self,
+        fee_payer: PublicKey,
+        recent_blockhash: Blockhash,
+        instructions: List[TransactionInstruction],
+        refresh: bool = False,
+    ) -> ComputeBudget:
+        shape = get_operation_shape(instructions, fee_payer)
+        amounts = get_swap_amounts(instructions)
+
+        # a limit measured with smaller swap amounts may be too low (more ticks can be crossed)
+        cached = None if refresh else self._units_cache.get(shape)
+        if cached is not None and all(amount <= simulated for amount, simulated in zip(amounts, cached[0])):
+            compute_unit_limit = cached[1]
+            self._units_cache.move_to_end(shape)
+        else:
+            units_consumed = await self.simulate(fee_payer, recent_blockhash, instructions)
+            compute_unit_limit = min(self._margin.adjust_add(units_consumed), MAX_COMPUTE_UNIT_LIMIT)
+            self._units_cache[shape] = (amounts, compute_unit_limit)
+            self._units_cache.move_to_end(shape)
+            while len(self._units_cache) > self._cache_size:
+                self._units_cache.popitem(last=False)
+
+        compute_unit_price = 0
+        if self._fee_estimator is not None:
+            compute_unit_price = await self._fee_estimator.estimate(get_writable_accounts(instructions))
+
+        return ComputeBudget(
+            compute_unit_limit=compute_unit_limit,
+            compute_unit_price=compute_unit_price,
+        )
+
+    async def simulate(
+        self,
+        fee_payer: PublicKey,
+        recent_blockhash: Blockhash,
+        instructions: List[TransactionInstruction],
+    ) -> int:
+        # simulate with the maximum limit so that the measurement is not capped by the default limit
+        transaction = Transaction(recent_blockhash=recent_blockhash, fee_payer=fee_payer)
+        transaction.add(ComputeBudgetIx.set_compute_unit_limit(MAX_COMPUTE_UNIT_LIMIT))
+        transaction.add(*instructions)
+
+        res = (await self._connection.simulate_transaction(transaction, sig_verify=False)).value
+        invariant(res.err is None, "simulation failed: {}".format(res.err))
+        invariant(res.units_consumed is not None, "units_consumed is not available")
+        return res.units_consumed
+
+    def clear_cache(self):
+        self._units_cache.clear()
@@ -1,28 +1,68 @@
+import asyncio
 from typing import List, Optional
+from solders.rpc.responses import RpcBlockhash
 from solders.signature import Signature
-from solana.rpc.commitment import Commitment, Confirmed
+from solders.transaction_status import TransactionConfirmationStatus, TransactionStatus
+from solana.rpc.commitment import Commitment, Processed, Confirmed, Finalized
+from solana.rpc.core import TransactionExpiredBlockheightExceededError
+from solana.rpc.types import TxOpts
 from solana.keypair import Keypair
 from solana.blockhash import Blockhash
 from solana.transaction import Transaction, TransactionInstruction
 from solana.rpc.async_api import AsyncClient
 from .types import Instruction, TransactionPayload
+from .compiled import CompiledTransaction
+from .batchsigner import BatchSigner
 
 
-CONFIRM_TRANSACTION_CHECK_INTERVAL_SECOND = 2
+REBROADCAST_INTERVAL_SECOND = 2
+DEFAULT_MAX_RESIGN = 3
+
+COMMITMENT_TO_CONFIRMATION_STATUS = {
+    Processed: TransactionConfirmationStatus.Processed,
+    Confirmed: TransactionConfirmationStatus.Confirmed,
+    Finalized: TransactionConfirmationStatus.Finalized,
+}
+
+
+class TransactionFailedError(Exception):
+    def __init__(self, signature: Signature, err):
+        super().__init__("{} has failed: {}".format(signature, err))
+        self.signature = signature
+        self.err = err
 
 
 class TransactionProcessor:
-    def __init__(self, connection: AsyncClient, fee_payer: Keypair, commitment: Commitment = Confirmed):
+    def __init__(
+        self,
+        connection: AsyncClient,
+        fee_payer: Keypair,
+        commitment: Commitment = Confirmed,
+        rebroadcast_interval_second: float = REBROADCAST_INTERVAL_SECOND,
+        max_resign: int = DEFAULT_MAX_RESIGN,
+    ):
         self._connection = connection
         self._fee_payer = fee_payer
         self._commitment = commitment
+        self._rebroadcast_interval_second = rebroadcast_interval_second
+        self._max_resign = max_resign
 
-    async def sign_and_construct_transaction(self, transaction_payload: TransactionPayload) -> "SignedTransaction":
-        signed_transaction = await self.sign_transaction(transaction_payload)
+    async def sign_and_construct_transaction(
+        self,
+        transaction_payload: TransactionPayload,
+        latest_blockhash: Optional[RpcBlockhash] = None,
+    ) -> "SignedTransaction":
+        signed_transaction = await self.sign_transaction(transaction_payload, latest_blockhash)
         return signed_transaction
 
-    async def sign_transaction(self, transaction_payload: TransactionPayload) -> "SignedTransaction":
-        latest_blockhash = (await self._connection.get_latest_blockhash()).value
+    async def sign_transaction(
+        self,
+        transaction_payload: TransactionPayload,
+        latest_blockhash: Optional[RpcBlockhash] = None,
+    ) -> "SignedTransaction":
+        # latest_blockhash: fetched by the caller (e.g. in a batch with other requests)
+        if latest_blockhash is None:
+            latest_blockhash = (await self._connection.get_latest_blockhash()).value
         transaction = transaction_payload.transaction
         signers = [self._fee_payer] + transaction_payload.signers
 
@@ -30,24 +70,127 @@ class TransactionProcessor:
         transaction.recent_blockhash = Blockhash(str(latest_blockhash.blockhash))
         transaction.sign(*signers)
 
-        return SignedTransaction(self, transaction, latest_blockhash.last_valid_block_height)
+        # keep the compiled message for fast re-sign on retry
+        compiled = CompiledTransaction.from_transaction(transaction, signers)
+        compiled.set_signatures(list(transaction.signatures))
+
+        return SignedTransaction(self, compiled, latest_blockhash.last_valid_block_height, transaction)
+
+    async def sign_transactions(
+        self,
+        transaction_payloads: List[TransactionPayload],
+        batch_signer: Optional[BatchSigner] = None,
+    ) -> List["SignedTransaction"]:
+        if batch_signer is None:
+            batch_signer = BatchSigner()
+
+        # all transactions in a batch share one blockhash
+        latest_blockhash = (await self._connection.get_latest_blockhash()).value
+        recent_blockhash = Blockhash(str(latest_blockhash.blockhash))
+
+        compiled_transactions = []
+        for transaction_payload in transaction_payloads:
+            transaction = transaction_payload.transaction
+            transaction.fee_payer = self._fee_payer.public_key
+            transaction.recent_blockhash = recent_blockhash
+            signers = [self._fee_payer] + transaction_payload.signers
+            compiled_transactions.append(CompiledTransaction.from_transaction(transaction, signers))
+
+        await batch_signer.sign_async(compiled_transactions)
+
+        return [
+            SignedTransaction(self, compiled, latest_blockhash.last_valid_block_height)
+            for compiled in compiled_transactions
+        ]
+
+    async def resign_transaction(self, signed_transaction: "SignedTransaction"):
+        latest_blockhash = (await self._connection.get_latest_blockhash()).value
+        signed_transaction.resign(
+            Blockhash(str(latest_blockhash.blockhash)),
+            latest_blockhash.last_valid_block_height
+        )
 
     async def send_transaction(self, signed_transaction: "SignedTransaction") -> Signature:
-        serialized = signed_transaction.transaction.serialize()
-        signature = (await self._connection.send_raw_transaction(serialized)).value
-        await self._connection.confirm_transaction(
-            signature,
-            commitment=Confirmed,
-            sleep_seconds=CONFIRM_TRANSACTION_CHECK_INTERVAL_SECOND,
-            last_valid_block_height=signed_transaction.last_valid_block_height
+        for i in range(self._max_resign + 1):
+            # re-sign only after the previous blockhash has expired and the transaction has not landed
+            if i > 0:
+                await self.resign_transaction(signed_transaction)
+            if await self._broadcast_until_confirmed(signed_transaction):
+                return signed_transaction.signature
+
+        raise TransactionExpiredBlockheightExceededError(
+            "{} has expired: block height exceeded".format(signed_transaction.signature)
         )
-        return signature
+
+    async def _broadcast_until_confirmed(self, signed_transaction: "SignedTransaction") -> bool:
+        # True: confirmed, False: expired without landing (safe to re-sign), raise: failed
+        serialized = signed_transaction.serialize()
+        signature = signed_transaction.signature
+
+        await self._connection.send_raw_transaction(serialized, TxOpts(preflight_commitment=self._commitment))
+        while True:
+            await asyncio.sleep(self._rebroadcast_interval_second)
+            status = await self._get_signature_status(signature)
+            if status is not None:
+                # landed (at least processed), it must not be re-signed even if the blockhash has expired
+                if self._is_confirmed(signature, status):
+                    return True
+                continue
+
+            block_height = (await self._connection.get_block_height(self._commitment)).value
+            if block_height > signed_transaction.last_valid_block_height:
+                # check again, it may have landed just before the expiration
+                status = await self._get_signature_status(signature)
+                if status is None:
+                    return False
+                continue
+
+            # rebroadcast the same bytes at a fixed cadence
+            await self._connection.send_raw_transaction(serialized, TxOpts(skip_preflight=True, max_retries=0))
+
+    async def _get_signature_status(self, signature: Signature) -> Optional[TransactionStatus]:
+        return (await self._connection.get_signature_statuses([signature])).value[0]
+
+    def _is_confirmed(self, signature: Signature, status: TransactionStatus) -> bool:
+        if status.err is not None:
+            raise TransactionFailedError(signature, status.err)
+        if status.confirmation_status is None:
+            return False
+        required = COMMITMENT_TO_CONFIRMATION_STATUS[self._commitment]
+        return int(status.confirmation_status) >= int(required)
 
 
 class SignedTransaction:
-    def __init__(self, processor: TransactionProcessor, transaction: Transaction, last_valid_block_height: int):
+    def __init__(
+        self,
+        processor: TransactionProcessor,
+        compiled: CompiledTransaction,
+        last_valid_block_height: int,
+        transaction: Optional[Transaction] = None,
+    ):
         self._processor = processor
-        self.transaction = transaction
+        self._compiled = compiled
+        self._transaction = transaction
+        self.last_valid_block_height = last_valid_block_height
+
+    @property
+    def transaction(self) -> Transaction:
+        # rebuilt lazily after re-sign
+        if self._transaction is None:
+            self._transaction = Transaction.deserialize(self._compiled.serialize())
+        return self._transaction
+
+    @property
+    def signature(self) -> Signature:
+        return self._compiled.signature
+
+    def serialize(self) -> bytes:
+        return self._compiled.serialize()
+
+    def resign(self, recent_blockhash: Blockhash, last_valid_block_height: int):
+        self._compiled.set_recent_blockhash(recent_blockhash)
+        self._compiled.sign()
+        self._transaction = None
         self.last_valid_block_height = last_valid_block_height
 
     async def execute(self) -> Signature:
@@ -1,5 +1,6 @@
 import dataclasses
 from enum import Enum
+from typing import List
 from solana.publickey import PublicKey
 
 from .transaction import Instruction
@@ -24,6 +25,12 @@ class PublicKeyWithInstruction:
     instruction: Instruction
 
 
+@dataclasses.dataclass(frozen=True)
+class PublicKeysWithInstruction:
+    pubkeys: List[PublicKey]
+    instruction: Instruction
+
+
 class PositionStatus(str, Enum):
     PriceIsBelowRange = "Below Range"
     PriceIsAboveRange = "Above Range"
@@ -0,0 +1,100 @@
+from typing import Optional
+from solana.publickey import PublicKey
+from solana.rpc.async_api import AsyncClient
+from solana.transaction import TransactionInstruction, AccountMeta
+from solana import system_program
+from spl.token.constants import TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT
+from spl.token import instructions as token_program
+from .transaction.types import Instruction, EMPTY_INSTRUCTION
+from .types import PublicKeyWithInstruction
+from .tokenutil import TokenUtil
+from .invariant import invariant
+
+
+# https://github.com/solana-labs/solana-program-library/blob/token-v3.5.0/token/program/src/instruction.rs
+SYNC_NATIVE_INSTRUCTION_INDEX = 17
+
+
+def sync_native(account: PublicKey) -> TransactionInstruction:
+    return TransactionInstruction(
+        keys=[AccountMeta(account, False, True)],
+        program_id=TOKEN_PROGRAM_ID,
+        data=bytes([SYNC_NATIVE_INSTRUCTION_INDEX]),
+    )
+
+
+class WrappedSolAccountManager:
+    # keeps the owner's WSOL ATA alive and tops up its wrapped balance with sync_native,
+    # instead of creating, initializing and closing a temporary WSOL account (and its signer) per operation.
+    def __init__(
+        self,
+        connection: AsyncClient,
+        owner: PublicKey,
+        funder: Optional[PublicKey] = None,
+        target_lamports: int = 0,
+    ):
+        self._connection = connection
+        self._owner = owner
+        self._funder = owner if funder is None else funder
+        # top up to at least this amount, so that following operations need no instructions
+        self._target_lamports = target_lamports
+        self._pubkey = token_program.get_associated_token_address(owner, WRAPPED_SOL_MINT)
+
+    @property
+    def pubkey(self) -> PublicKey:
+        return self._pubkey
+
+    @property
+    def owner(self) -> PublicKey:
+        return self._owner
+
+    async def get_wrapped_lamports(self) -> Optional[int]:
+        # None if the account doesn't exist yet
+        res = await self._connection.get_account_info(self._pubkey)
+        if res.value is None:
+            return None
+
+        token_account = TokenUtil.deserialize_account(res.value.data)
+        invariant(token_account.owner == self._owner, "token_account.owner == owner")
+        invariant(token_account.mint == WRAPPED_SOL_MINT, "token_account.mint == WRAPPED_SOL_MINT")
+        return token_account.amount
+
+    async def prepare(self, lamports: int) -> PublicKeyWithInstruction:
+        wrapped_lamports = await self.get_wrapped_lamports()
+
+        instructions = []
+        if wrapped_lamports is None:
+            instructions.append(token_program.create_associated_token_account(self._funder, self._owner, WRAPPED_SOL_MINT))
+            wrapped_lamports = 0
+
+        if wrapped_lamports < lamports:
+            top_up_lamports = max(lamports, self._target_lamports) - wrapped_lamports
+            instructions.append(system_program.transfer(system_program.TransferParams(
+                from_pubkey=self._funder,
+                to_pubkey=self._pubkey,
+                lamports=top_up_lamports,
+            )))
+            instructions.append(sync_native(self._pubkey))
+
+        if len(instructions) == 0:
+            return PublicKeyWithInstruction(pubkey=self._pubkey, instruction=EMPTY_INSTRUCTION)
+
+        return PublicKeyWithInstruction(
+            pubkey=self._pubkey,
+            instruction=Instruction(
+                instructions=instructions,
+                cleanup_instructions=[],
+                signers=[],
+            )
+        )
+
+    def build_close_instruction(self, dest: Optional[PublicKey] = None) -> Instruction:
+        # unwrap all lamports (wrapped balance and rent)
+        close_account_ix = token_program.close_account(token_program.CloseAccountParams(
+            program_id=TOKEN_PROGRAM_ID,
+            account=self._pubkey,
+            dest=self._owner if dest is None else dest,
+            owner=self._owner,
+            signers=[]
+        ))
+        return Instruction(instructions=[close_account_ix], cleanup_instructions=[], signers=[])
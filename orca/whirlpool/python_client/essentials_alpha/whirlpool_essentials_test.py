@@ -0,0 +1,1474 @@
+import asyncio
+import dataclasses
+import pickle
+import json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import random
+import types
+from decimal import Decimal
+from fractions import Fraction
+import unittest
+import httpx
+from solana.publickey import PublicKey
+from solana.keypair import Keypair
+from solana import system_program
+from solana.blockhash import Blockhash
+from solana.transaction import Transaction, TransactionInstruction, AccountMeta
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.core import RPCException, TransactionExpiredBlockheightExceededError
+from solders.hash import Hash
+from solders.transaction_status import TransactionStatus, TransactionConfirmationStatus, TransactionErrorInstructionError, InstructionErrorCustom
+
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+from whirlpool_essentials import DecimalUtil, PriceMath, RewardUtil, TickUtil, TokenUtil, WhirlpoolContext, RpcBatchClient, LiquidityDistribution
+from whirlpool_essentials import PDAUtil, SwapUtil, SwapRouter, PoolRegistry
+from whirlpool_essentials.splitswap import SplitSwapOptimizer, SplitSwapParams, SplitSwapPool, SwapCurve
+from whirlpool_essentials.rentcalculator import RENT_LAYOUT, Rent, RentCalculator
+from whirlpool_essentials.types import Percentage, TokenAmounts
+from whirlpool_essentials.percentage import NUMPY_AVAILABLE
+from whirlpool_essentials.constants import TICK_ARRAY_SIZE, U64_MAX, U128_MAX, ORCA_WHIRLPOOL_PROGRAM_ID
+from whirlpool_essentials.invariant import InvaliantFailedError
+from whirlpool_essentials.fixedpointmath import FixedPointMath, Q64_ONE
+from whirlpool_essentials.liquiditymath import get_amount_delta_a, get_amount_delta_b
+from whirlpool_essentials.quote import SwapQuoteParams, SwapTickSequenceExhaustedError, QuoteBuilder
+from whirlpool_essentials.quote import IncreaseLiquidityQuoteParams, IncreaseLiquidityBatchQuoteParams
+from whirlpool_essentials.quote import DecreaseLiquidityQuoteParams, DecreaseLiquidityBatchQuoteParams
+from whirlpool_essentials.quote import RangeOptimizer, RangeOptimizerParams, RangeObjective
+from whirlpool_essentials.quote import CollectFeesQuoteParams, CollectRewardsQuoteParams, CollectBatchQuoteParams
+from whirlpool_essentials.quote.rangeoptimizer import normal_in_range_probability
+from whirlpool_essentials.liquiditymath import LiquidityMath
+from whirlpool_essentials.quote.swap import swap_quote_with_params
+from whirlpool_essentials.static_client.accounts import TickArray, Whirlpool, Position
+from whirlpool_essentials.static_client.types import Tick, WhirlpoolRewardInfo, PositionRewardInfo
+from whirlpool_essentials.static_client import instructions as static_instructions
+from spl.token.constants import TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT
+from spl.token.core import AccountInfo
+from spl.token.instructions import get_associated_token_address
+from whirlpool_essentials.instruction import WhirlpoolIxEncoder
+from whirlpool_essentials.transaction import BatchSigner, CompiledTransaction, TransactionProcessor, TransactionFailedError
+from whirlpool_essentials.transaction.types import TransactionPayload
+from whirlpool_essentials.transaction.computebudget import ComputeBudgetEstimator, PriorityFeeEstimator, get_operation_shape
+
+
+TICK_SPACING = 64
+TICKS_IN_ARRAY = TICK_ARRAY_SIZE * TICK_SPACING
+
+
+def build_tick_arrays(start_tick_indexes, positions):
+    # positions: list of (tick_lower_index, tick_upper_index, liquidity)
+    tick_arrays = {}
+    for start_tick_index in start_tick_indexes:
+        ticks = [Tick(False, 0, 0, 0, 0, [0, 0, 0]) for _ in range(TICK_ARRAY_SIZE)]
+        tick_arrays[start_tick_index] = TickArray(start_tick_index, ticks, PublicKey(0))
+    for tick_lower_index, tick_upper_index, liquidity in positions:
+        for tick_index, liquidity_net in ((tick_lower_index, liquidity), (tick_upper_index, -liquidity)):
+            start_tick_index = TickUtil.get_start_tick_index(tick_index, TICK_SPACING)
+            if start_tick_index not in tick_arrays:
+                continue
+            ticks = tick_arrays[start_tick_index].ticks
+            offset = (tick_index - start_tick_index) // TICK_SPACING
+            prev = ticks[offset]
+            ticks[offset] = Tick(True, prev.liquidity_net + liquidity_net, prev.liquidity_gross + liquidity, 0, 0, [0, 0, 0])
+    return tick_arrays
+
+
+DEFAULT_PUBKEY = PublicKey(0)
+WHIRLPOOL_PUBKEY = PublicKey(7)
+REWARD_MINT = PublicKey(8)
+Q64 = 1 << 64
+
+
+def build_whirlpool(
+    tick_current_index: int = 0,
+    liquidity: int = 0,
+    fee_growth_global_a: int = 0,
+    fee_growth_global_b: int = 0,
+    reward_growths_global=(0, 0, 0),
+    emissions_per_second_x64=(0, 0, 0),
+    reward_initialized=(False, False, False),
+    reward_last_updated_timestamp: int = 0,
+) -> Whirlpool:
+    reward_infos = [
+        WhirlpoolRewardInfo(REWARD_MINT if initialized else DEFAULT_PUBKEY, REWARD_MINT if initialized else DEFAULT_PUBKEY, REWARD_MINT, emissions, growth)
+        for growth, emissions, initialized in zip(reward_growths_global, emissions_per_second_x64, reward_initialized)
+    ]
+    return Whirlpool(
+        DEFAULT_PUBKEY, [255], TICK_SPACING, [TICK_SPACING, 0], 3000, 300, liquidity,
+        PriceMath.tick_index_to_sqrt_price_x64(tick_current_index), tick_current_index, 0, 0,
+        DEFAULT_PUBKEY, DEFAULT_PUBKEY, fee_growth_global_a, DEFAULT_PUBKEY, DEFAULT_PUBKEY, fee_growth_global_b,
+        reward_last_updated_timestamp, reward_infos,
+    )
+
+
+def build_position(
+    tick_lower_index: int,
+    tick_upper_index: int,
+    liquidity: int,
+    fee_growth_checkpoint_a: int = 0,
+    fee_growth_checkpoint_b: int = 0,
+    fee_owed_a: int = 0,
+    fee_owed_b: int = 0,
+    reward_growth_checkpoints=(0, 0, 0),
+    reward_owed=(0, 0, 0),
+) -> Position:
+    reward_infos = [PositionRewardInfo(checkpoint, owed) for checkpoint, owed in zip(reward_growth_checkpoints, reward_owed)]
+    return Position(
+        WHIRLPOOL_PUBKEY, DEFAULT_PUBKEY, liquidity, tick_lower_index, tick_upper_index,
+        fee_growth_checkpoint_a, fee_owed_a, fee_growth_checkpoint_b, fee_owed_b, reward_infos,
+    )
+
+
+def build_tick(initialized: bool, fee_growth_outside_a: int = 0, fee_growth_outside_b: int = 0, reward_growths_outside=(0, 0, 0)) -> Tick:
+    return Tick(initialized, 0, 0, fee_growth_outside_a, fee_growth_outside_b, list(reward_growths_outside))
+
+
+class SwapQuoteTestCase(unittest.TestCase):
+    # wide position over 3 tick arrays in both directions and
+    # narrow position whose ticks are the first tick of tick_arrays[0] and the last tick of tick_arrays[0]
+    WIDE_LIQUIDITY = 10**12
+    NARROW_LIQUIDITY = 10**12
+    TICK_CURRENT_INDEX = 100
+
+    def setUp(self):
+        narrow_upper = TICKS_IN_ARRAY - TICK_SPACING
+        self.tick_arrays = build_tick_arrays(
+            [i * TICKS_IN_ARRAY for i in range(-2, 3)],
+            [
+                (-3 * TICKS_IN_ARRAY, 3 * TICKS_IN_ARRAY, self.WIDE_LIQUIDITY),
+                (0, narrow_upper, self.NARROW_LIQUIDITY),
+            ],
+        )
+
+    def quote(self, amount: int, a_to_b: bool):
+        step = -TICKS_IN_ARRAY if a_to_b else TICKS_IN_ARRAY
+        return swap_quote_with_params(SwapQuoteParams(
+            amount=amount,
+            amount_specified_is_input=True,
+            a_to_b=a_to_b,
+            tick_current_index=self.TICK_CURRENT_INDEX,
+            sqrt_price=PriceMath.tick_index_to_sqrt_price_x64(self.TICK_CURRENT_INDEX),
+            liquidity=self.WIDE_LIQUIDITY + self.NARROW_LIQUIDITY,
+            fee_rate=0,
+            tick_spacing=TICK_SPACING,
+            tick_arrays=[self.tick_arrays[i * step] for i in range(3)],
+            slippage_tolerance=Percentage.from_fraction(1, 100),
+        ))
+
+    def test_cross_first_tick_of_tick_array_a_to_b(self):
+        quote = self.quote(2 * 10**10, True)
+        self.assertEqual(quote.estimated_amount_in, 2 * 10**10)
+        self.assertLess(quote.estimated_end_tick_index, 0)
+        self.assertGreater(quote.estimated_end_tick_index, -TICKS_IN_ARRAY)
+
+        # the narrow position is out of range after tick 0 is crossed
+        sqrt_price_current = PriceMath.tick_index_to_sqrt_price_x64(self.TICK_CURRENT_INDEX)
+        sqrt_price_boundary = PriceMath.tick_index_to_sqrt_price_x64(0)
+        expected = get_amount_delta_b(sqrt_price_current, sqrt_price_boundary, self.WIDE_LIQUIDITY + self.NARROW_LIQUIDITY, False) \
+            + get_amount_delta_b(sqrt_price_boundary, quote.estimated_end_sqrt_price, self.WIDE_LIQUIDITY, False)
+        self.assertEqual(quote.estimated_amount_out, expected)
+
+    def test_cross_last_tick_of_tick_array_b_to_a(self):
+        quote = self.quote(10**12, False)
+        self.assertEqual(quote.estimated_amount_in, 10**12)
+        self.assertGreaterEqual(quote.estimated_end_tick_index, TICKS_IN_ARRAY - TICK_SPACING)
+        self.assertLess(quote.estimated_end_tick_index, 3 * TICKS_IN_ARRAY)
+
+        # the narrow position is out of range after the last tick of tick_arrays[0] is crossed
+        sqrt_price_current = PriceMath.tick_index_to_sqrt_price_x64(self.TICK_CURRENT_INDEX)
+        sqrt_price_boundary = PriceMath.tick_index_to_sqrt_price_x64(TICKS_IN_ARRAY - TICK_SPACING)
+        expected = get_amount_delta_a(sqrt_price_current, sqrt_price_boundary, self.WIDE_LIQUIDITY + self.NARROW_LIQUIDITY, False) \
+            + get_amount_delta_a(sqrt_price_boundary, quote.estimated_end_sqrt_price, self.WIDE_LIQUIDITY, False)
+        self.assertEqual(quote.estimated_amount_out, expected)
+
+    def test_tick_array_sequence_exhausted(self):
+        with self.assertRaises(SwapTickSequenceExhaustedError):
+            self.quote(10**17, True)
+        with self.assertRaises(SwapTickSequenceExhaustedError):
+            self.quote(10**17, False)
+
+
+class SwapRouterFetcher:
+    def __init__(self):
+        self.tick_arrays = {}
+        self.calls = 0
+
+    async def list_tick_arrays(self, pubkeys, refresh: bool = False):
+        self.calls += 1
+        return [self.tick_arrays.get(pubkey) for pubkey in pubkeys]
+
+
+class SwapRouterTestCase(unittest.TestCase):
+    MINT_A = PublicKey(1)
+    MINT_B = PublicKey(2)
+    MINT_C = PublicKey(3)
+    MINT_D = PublicKey(4)
+    LIQUIDITY = 10**12
+    SLIPPAGE = Percentage.from_fraction(1, 100)
+
+    def setUp(self):
+        self.fetcher = SwapRouterFetcher()
+        self.whirlpools = {}
+        self.pool_ab = self.add_pool(PublicKey(101), self.MINT_A, self.MINT_B, 3000)
+        self.pool_ab_low_fee = self.add_pool(PublicKey(102), self.MINT_A, self.MINT_B, 500)
+        self.pool_bc = self.add_pool(PublicKey(103), self.MINT_B, self.MINT_C, 3000)
+        self.pool_ac = self.add_pool(PublicKey(104), self.MINT_A, self.MINT_C, 10000)
+        # no tick arrays are initialized
+        self.pool_cd = self.add_pool(PublicKey(105), self.MINT_C, self.MINT_D, 3000, initialize_tick_arrays=False)
+        self.router = SwapRouter(ORCA_WHIRLPOOL_PROGRAM_ID, self.fetcher, self.whirlpools)
+
+    def add_pool(self, pubkey: PublicKey, mint_a: PublicKey, mint_b: PublicKey, fee_rate: int, initialize_tick_arrays: bool = True) -> PublicKey:
+        self.whirlpools[pubkey] = dataclasses.replace(
+            build_whirlpool(tick_current_index=0, liquidity=self.LIQUIDITY),
+            fee_rate=fee_rate, token_mint_a=mint_a, token_mint_b=mint_b,
+        )
+        if initialize_tick_arrays:
+            start_tick_indexes = [i * TICKS_IN_ARRAY for i in range(-3, 3)]
+            tick_arrays = build_tick_arrays(start_tick_indexes, [(-2 * TICKS_IN_ARRAY, 2 * TICKS_IN_ARRAY, self.LIQUIDITY)])
+            for start_tick_index, tick_array in tick_arrays.items():
+                self.fetcher.tick_arrays[PDAUtil.get_tick_array(ORCA_WHIRLPOOL_PROGRAM_ID, pubkey, start_tick_index).pubkey] = tick_array
+        return pubkey
+
+    def get_path_pubkeys(self, input_token_mint: PublicKey, output_token_mint: PublicKey):
+        return {tuple(edge.whirlpool_pubkey for edge in path) for path in self.router.get_paths(input_token_mint, output_token_mint)}
+
+    def quote_hop(self, pubkey: PublicKey, a_to_b: bool, amount: int, amount_specified_is_input: bool):
+        whirlpool = self.whirlpools[pubkey]
+        tick_array_pubkeys = SwapUtil.get_tick_array_pubkeys(whirlpool.tick_current_index, whirlpool.tick_spacing, a_to_b, ORCA_WHIRLPOOL_PROGRAM_ID, pubkey)
+        return swap_quote_with_params(SwapQuoteParams(
+            amount=amount,
+            amount_specified_is_input=amount_specified_is_input,
+            a_to_b=a_to_b,
+            tick_current_index=whirlpool.tick_current_index,
+            sqrt_price=whirlpool.sqrt_price,
+            liquidity=whirlpool.liquidity,
+            fee_rate=whirlpool.fee_rate,
+            tick_spacing=whirlpool.tick_spacing,
+            tick_arrays=[self.fetcher.tick_arrays.get(tick_array_pubkey) for tick_array_pubkey in tick_array_pubkeys],
+            slippage_tolerance=self.SLIPPAGE,
+        ))
+
+    def test_get_paths(self):
+        # direct pools and 2 hops via an intermediate token
+        self.assertEqual(self.get_path_pubkeys(self.MINT_A, self.MINT_C), {
+            (self.pool_ac,),
+            (self.pool_ab, self.pool_bc),
+            (self.pool_ab_low_fee, self.pool_bc),
+        })
+        self.assertEqual(self.get_path_pubkeys(self.MINT_A, self.MINT_B), {
+            (self.pool_ab,),
+            (self.pool_ab_low_fee,),
+            (self.pool_ac, self.pool_bc),
+        })
+        self.assertEqual(self.get_path_pubkeys(self.MINT_B, self.MINT_D), {(self.pool_bc, self.pool_cd)})
+        # more than 2 hops are not enumerated
+        self.assertEqual(self.get_path_pubkeys(self.MINT_A, self.MINT_D), {(self.pool_ac, self.pool_cd)})
+
+        for input_token_mint, output_token_mint in ((self.MINT_A, self.MINT_B), (self.MINT_A, self.MINT_C), (self.MINT_C, self.MINT_A)):
+            for path in self.router.get_paths(input_token_mint, output_token_mint):
+                # a pool is never used twice and the path connects the input with the output
+                self.assertEqual(len({edge.whirlpool_pubkey for edge in path}), len(path))
+                mint = input_token_mint
+                for edge in path:
+                    whirlpool = self.whirlpools[edge.whirlpool_pubkey]
+                    self.assertEqual(whirlpool.token_mint_a if edge.a_to_b else whirlpool.token_mint_b, mint)
+                    mint = edge.output_token_mint
+                self.assertEqual(mint, output_token_mint)
+
+        with self.assertRaises(InvaliantFailedError):
+            self.router.get_paths(self.MINT_A, self.MINT_A)
+
+    def test_find_routes_exact_input(self):
+        amount = 10**6
+        routes = asyncio.run(self.router.find_routes(self.MINT_A, self.MINT_C, amount, True, self.SLIPPAGE))
+        # tick arrays of all paths are fetched at once
+        self.assertEqual(self.fetcher.calls, 1)
+        self.assertEqual(len(routes), 3)
+        self.assertEqual([r.estimated_amount_out for r in routes], sorted([r.estimated_amount_out for r in routes], reverse=True))
+        # the low fee pool is better than the direct 1% pool
+        self.assertEqual([hop.whirlpool_pubkey for hop in routes[0].hops], [self.pool_ab_low_fee, self.pool_bc])
+
+        route = routes[0]
+        first = self.quote_hop(self.pool_ab_low_fee, True, amount, True)
+        second = self.quote_hop(self.pool_bc, True, first.estimated_amount_out, True)
+        self.assertEqual([hop.quote for hop in route.hops], [first, second])
+        self.assertEqual(route.estimated_amount_in, amount)
+        self.assertEqual(route.estimated_amount_out, second.estimated_amount_out)
+        self.assertEqual(route.other_amount_threshold, self.SLIPPAGE.adjust_sub(second.estimated_amount_out))
+
+    def test_find_routes_exact_output(self):
+        amount = 10**6
+        routes = asyncio.run(self.router.find_routes(self.MINT_C, self.MINT_A, amount, False, self.SLIPPAGE))
+        self.assertEqual(len(routes), 3)
+        self.assertEqual([r.estimated_amount_in for r in routes], sorted([r.estimated_amount_in for r in routes]))
+
+        route = next(r for r in routes if len(r.hops) == 2 and r.hops[1].whirlpool_pubkey == self.pool_ab)
+        # exact output is chained from the last hop: the input of the last hop is the output of the first hop
+        last = self.quote_hop(self.pool_ab, False, amount, False)
+        first = self.quote_hop(self.pool_bc, False, last.estimated_amount_in, False)
+        self.assertEqual([hop.quote for hop in route.hops], [first, last])
+        self.assertEqual([hop.input_token_mint for hop in route.hops], [self.MINT_C, self.MINT_B])
+        self.assertEqual(route.hops[0].quote.estimated_amount_out, route.hops[1].quote.estimated_amount_in)
+        self.assertEqual(route.estimated_amount_in, first.estimated_amount_in)
+        self.assertEqual(route.estimated_amount_out, amount)
+        self.assertEqual(route.other_amount_threshold, self.SLIPPAGE.adjust_add(first.estimated_amount_in))
+
+    def test_find_routes_without_liquidity(self):
+        # the pool without tick arrays is no route
+        self.assertEqual(asyncio.run(self.router.find_routes(self.MINT_C, self.MINT_D, 10**6, True, self.SLIPPAGE)), [])
+        self.assertIsNone(asyncio.run(self.router.find_best_route(self.MINT_A, self.MINT_D, 10**6, True, self.SLIPPAGE)))
+
+        # more than the tick arrays can provide
+        routes = asyncio.run(self.router.find_routes(self.MINT_A, self.MINT_B, 10**18, True, self.SLIPPAGE))
+        self.assertEqual(routes, [])
+
+
+class PoolRegistryFetcher:
+    def __init__(self, whirlpools):
+        self.whirlpools = whirlpools
+
+    async def list_whirlpools(self, pubkeys, refresh: bool = False):
+        return [self.whirlpools.get(pubkey) for pubkey in pubkeys]
+
+
+class PoolRegistryTestCase(unittest.TestCase):
+    MINT_A = PublicKey(1)
+    MINT_B = PublicKey(2)
+    MINT_C = PublicKey(3)
+
+    def build_whirlpool(self, mint_a: PublicKey, mint_b: PublicKey, tick_spacing: int, fee_rate: int, liquidity: int = 0) -> Whirlpool:
+        return dataclasses.replace(
+            build_whirlpool(liquidity=liquidity),
+            token_mint_a=mint_a, token_mint_b=mint_b, tick_spacing=tick_spacing, fee_rate=fee_rate,
+        )
+
+    def setUp(self):
+        self.pool_ab_64 = PublicKey(101)
+        self.pool_ab_8 = PublicKey(102)
+        self.pool_bc_64 = PublicKey(103)
+        self.registry = PoolRegistry({
+            self.pool_ab_64: self.build_whirlpool(self.MINT_A, self.MINT_B, 64, 3000),
+            self.pool_ab_8: self.build_whirlpool(self.MINT_A, self.MINT_B, 8, 500),
+            self.pool_bc_64: self.build_whirlpool(self.MINT_B, self.MINT_C, 64, 3000),
+        })
+
+    def test_lookup(self):
+        self.assertEqual(len(self.registry), 3)
+        # the order of mints doesn't matter
+        self.assertEqual(set(self.registry.get_pools_by_pair(self.MINT_B, self.MINT_A)), {self.pool_ab_64, self.pool_ab_8})
+        self.assertEqual(set(self.registry.get_pools_by_tick_spacing(self.MINT_A, self.MINT_B, 8)), {self.pool_ab_8})
+        self.assertEqual(set(self.registry.get_pools_by_fee_rate(self.MINT_B, self.MINT_C, 3000)), {self.pool_bc_64})
+        self.assertEqual(set(self.registry.get_pools_by_token(self.MINT_B)), {self.pool_ab_64, self.pool_ab_8, self.pool_bc_64})
+        self.assertEqual(self.registry.get_pools_by_pair(self.MINT_A, self.MINT_C), {})
+
+    def test_update_fee_rate(self):
+        updated = self.build_whirlpool(self.MINT_A, self.MINT_B, 64, 10000)
+        self.registry.update(self.pool_ab_64, updated)
+        self.assertEqual(self.registry.get_pools_by_fee_rate(self.MINT_A, self.MINT_B, 3000), {})
+        self.assertEqual(self.registry.get_pools_by_fee_rate(self.MINT_A, self.MINT_B, 10000), {self.pool_ab_64: updated})
+        # other indexes are not affected and return the updated state
+        self.assertIs(self.registry.get_pools_by_tick_spacing(self.MINT_A, self.MINT_B, 64)[self.pool_ab_64], updated)
+        self.assertEqual(set(self.registry.get_pools_by_pair(self.MINT_A, self.MINT_B)), {self.pool_ab_64, self.pool_ab_8})
+        self.assertEqual(len(self.registry), 3)
+
+    def test_update_state(self):
+        # fee_rate is unchanged, only the state is replaced
+        updated = self.build_whirlpool(self.MINT_A, self.MINT_B, 64, 3000, liquidity=12345)
+        self.registry.update(self.pool_ab_64, updated)
+        self.assertIs(self.registry.get_whirlpool(self.pool_ab_64), updated)
+        self.assertIs(self.registry.get_pools_by_fee_rate(self.MINT_A, self.MINT_B, 3000)[self.pool_ab_64], updated)
+
+    def test_remove(self):
+        self.registry.remove(self.pool_bc_64)
+        self.assertNotIn(self.pool_bc_64, self.registry)
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(self.registry.get_pools_by_pair(self.MINT_B, self.MINT_C), {})
+        self.assertEqual(self.registry.get_pools_by_tick_spacing(self.MINT_B, self.MINT_C, 64), {})
+        self.assertEqual(self.registry.get_pools_by_token(self.MINT_C), {})
+        self.assertEqual(set(self.registry.get_pools_by_token(self.MINT_B)), {self.pool_ab_64, self.pool_ab_8})
+
+        # removing an unknown whirlpool is a no-op
+        self.registry.remove(self.pool_bc_64)
+        self.assertEqual(len(self.registry), 2)
+
+        # re-added whirlpool is indexed again
+        self.registry.update(self.pool_bc_64, self.build_whirlpool(self.MINT_B, self.MINT_C, 64, 3000))
+        self.assertEqual(set(self.registry.get_pools_by_token(self.MINT_C)), {self.pool_bc_64})
+
+    def test_refresh(self):
+        updated = self.build_whirlpool(self.MINT_A, self.MINT_B, 8, 100)
+        # pool_bc_64 is closed
+        fetcher = PoolRegistryFetcher({self.pool_ab_8: updated})
+        asyncio.run(self.registry.refresh(fetcher, [self.pool_ab_8, self.pool_bc_64]))
+        self.assertEqual(self.registry.get_pools_by_fee_rate(self.MINT_A, self.MINT_B, 100), {self.pool_ab_8: updated})
+        self.assertEqual(self.registry.get_pools_by_fee_rate(self.MINT_A, self.MINT_B, 500), {})
+        self.assertNotIn(self.pool_bc_64, self.registry)
+        self.assertIn(self.pool_ab_64, self.registry)
+
+
+class LiquidityBatchQuoteTestCase(unittest.TestCase):
+    MINT_A = PublicKey(1)
+    MINT_B = PublicKey(2)
+    TICK_CURRENT_INDEX = -1000
+    SLIPPAGE = Percentage.from_fraction(1, 100)
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.ranges = []
+        for _ in range(300):
+            lower = rng.randrange(-3000, 1000) // TICK_SPACING * TICK_SPACING
+            upper = lower + rng.randrange(1, 40) * TICK_SPACING
+            self.ranges.append((lower, upper))
+        # ranges touching the current price
+        current = TickUtil.get_initializable_tick_index(self.TICK_CURRENT_INDEX, TICK_SPACING)
+        self.ranges += [(current - TICK_SPACING, current), (current, current + TICK_SPACING), (current - TICK_SPACING, current + TICK_SPACING)]
+        self.amounts = [rng.choice([0, 1, rng.randrange(1, 10**12)]) for _ in self.ranges]
+        self.sqrt_price = PriceMath.tick_index_to_sqrt_price_x64(self.TICK_CURRENT_INDEX) + 12345
+
+    def test_increase_liquidity_batch_equals_single(self):
+        for input_token_mint in (self.MINT_A, self.MINT_B):
+            batch = QuoteBuilder.increase_liquidity_by_input_token_batch(IncreaseLiquidityBatchQuoteParams(
+                input_token_amounts=self.amounts,
+                input_token_mint=input_token_mint,
+                token_mint_a=self.MINT_A,
+                token_mint_b=self.MINT_B,
+                tick_current_index=self.TICK_CURRENT_INDEX,
+                sqrt_price=self.sqrt_price,
+                tick_lower_indexes=[lower for lower, _ in self.ranges],
+                tick_upper_indexes=[upper for _, upper in self.ranges],
+                slippage_tolerance=self.SLIPPAGE,
+            ))
+            single = [
+                QuoteBuilder.increase_liquidity_by_input_token(IncreaseLiquidityQuoteParams(
+                    input_token_amount=amount,
+                    input_token_mint=input_token_mint,
+                    token_mint_a=self.MINT_A,
+                    token_mint_b=self.MINT_B,
+                    tick_current_index=self.TICK_CURRENT_INDEX,
+                    sqrt_price=self.sqrt_price,
+                    tick_lower_index=lower,
+                    tick_upper_index=upper,
+                    slippage_tolerance=self.SLIPPAGE,
+                ))
+                for amount, (lower, upper) in zip(self.amounts, self.ranges)
+            ]
+            self.assertEqual(batch, single)
+            self.assertTrue(any(quote.liquidity > 0 for quote in batch))
+
+    def test_decrease_liquidity_batch_equals_single(self):
+        batch = QuoteBuilder.decrease_liquidity_by_liquidity_batch(DecreaseLiquidityBatchQuoteParams(
+            liquidities=self.amounts,
+            tick_current_index=self.TICK_CURRENT_INDEX,
+            sqrt_price=self.sqrt_price,
+            tick_lower_indexes=[lower for lower, _ in self.ranges],
+            tick_upper_indexes=[upper for _, upper in self.ranges],
+            slippage_tolerance=self.SLIPPAGE,
+        ))
+        single = [
+            QuoteBuilder.decrease_liquidity_by_liquidity(DecreaseLiquidityQuoteParams(
+                liquidity=liquidity,
+                tick_current_index=self.TICK_CURRENT_INDEX,
+                sqrt_price=self.sqrt_price,
+                tick_lower_index=lower,
+                tick_upper_index=upper,
+                slippage_tolerance=self.SLIPPAGE,
+            ))
+            for liquidity, (lower, upper) in zip(self.amounts, self.ranges)
+        ]
+        self.assertEqual(batch, single)
+
+    def test_batch_length_mismatch(self):
+        with self.assertRaises(InvaliantFailedError):
+            QuoteBuilder.decrease_liquidity_by_liquidity_batch(DecreaseLiquidityBatchQuoteParams(
+                liquidities=[1, 2],
+                tick_current_index=self.TICK_CURRENT_INDEX,
+                sqrt_price=self.sqrt_price,
+                tick_lower_indexes=[0],
+                tick_upper_indexes=[64],
+                slippage_tolerance=self.SLIPPAGE,
+            ))
+
+
+class RangeOptimizerTestCase(unittest.TestCase):
+    MINT_A = PublicKey(1)
+    MINT_B = PublicKey(2)
+    SLIPPAGE = Percentage.from_fraction(1, 100)
+
+    def brute_force(self, params: RangeOptimizerParams, in_range_probability):
+        budget_a = params.slippage_tolerance.adjust_sub(params.token_max_a)
+        budget_b = params.slippage_tolerance.adjust_sub(params.token_max_b)
+        current = params.tick_current_index
+        scores = []
+        spacing = params.tick_spacing
+        # every initializable lower <= current < upper within max_width of the current tick
+        lowers = [t for t in range(current - params.max_width, current + 1) if t % spacing == 0]
+        uppers = [t for t in range(current + 1, current + params.max_width + 1) if t % spacing == 0]
+        for lower in lowers:
+            for upper in uppers:
+                if not (params.min_width <= upper - lower <= params.max_width):
+                    continue
+                sqrt_price_lower = PriceMath.tick_index_to_sqrt_price_x64(lower)
+                sqrt_price_upper = PriceMath.tick_index_to_sqrt_price_x64(upper)
+                liquidity = LiquidityMath.get_max_liquidity_from_token_amounts(
+                    params.sqrt_price, sqrt_price_lower, sqrt_price_upper, TokenAmounts(budget_a, budget_b)
+                )
+                scores.append(liquidity if in_range_probability is None else liquidity * in_range_probability(lower, upper))
+        return sorted(scores, reverse=True)[:params.top_k]
+
+    def build_params(self, rng: random.Random, **kwargs) -> RangeOptimizerParams:
+        tick_spacing = rng.choice([1, 8, 64])
+        tick_current_index = rng.randrange(-5000, 5000)
+        sqrt_price = rng.randrange(
+            PriceMath.tick_index_to_sqrt_price_x64(tick_current_index),
+            PriceMath.tick_index_to_sqrt_price_x64(tick_current_index + 1),
+        )
+        min_width = rng.randrange(1, 10) * tick_spacing
+        return RangeOptimizerParams(
+            token_max_a=rng.randrange(10**6, 10**12),
+            token_max_b=rng.randrange(10**6, 10**12),
+            token_mint_a=self.MINT_A,
+            token_mint_b=self.MINT_B,
+            tick_current_index=tick_current_index,
+            sqrt_price=sqrt_price,
+            tick_spacing=tick_spacing,
+            min_width=min_width,
+            max_width=min_width + rng.randrange(0, 40) * tick_spacing,
+            slippage_tolerance=self.SLIPPAGE,
+            top_k=rng.randrange(1, 6),
+            **kwargs,
+        )
+
+    def assertMatchesBruteForce(self, params: RangeOptimizerParams, in_range_probability=None):
+        candidates = RangeOptimizer.optimize(params)
+        expected = self.brute_force(params, in_range_probability)
+        self.assertEqual([candidate.score for candidate in candidates], expected)
+        for candidate in candidates:
+            self.assertLessEqual(candidate.tick_lower_index, params.tick_current_index)
+            self.assertGreater(candidate.tick_upper_index, params.tick_current_index)
+            self.assertLessEqual(candidate.quote.token_max_a, params.token_max_a)
+            self.assertLessEqual(candidate.quote.token_max_b, params.token_max_b)
+
+    def test_liquidity_objective(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            self.assertMatchesBruteForce(self.build_params(rng))
+
+    def test_fee_capture_objective(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            tick_volatility = rng.choice([10.0, 200.0, 3000.0])
+            params = self.build_params(rng, objective=RangeObjective.FeeCapture, tick_volatility=tick_volatility)
+            self.assertMatchesBruteForce(params, normal_in_range_probability(params.tick_current_index, tick_volatility))
+
+
+class CollectFeesQuoteTestCase(unittest.TestCase):
+    TICK_LOWER_INDEX = -128
+    TICK_UPPER_INDEX = 128
+    TICK_LOWER = build_tick(True, 100, 300)
+    TICK_UPPER = build_tick(True, 200, 50)
+
+    def quote(self, tick_current_index: int, position: Position, tick_lower: Tick = TICK_LOWER, tick_upper: Tick = TICK_UPPER):
+        whirlpool = build_whirlpool(tick_current_index, fee_growth_global_a=1000, fee_growth_global_b=2000)
+        quote = QuoteBuilder.collect_fees(CollectFeesQuoteParams(whirlpool, position, tick_lower, tick_upper))
+
+        # same result through the batch quote
+        tick_arrays = build_tick_arrays([-TICKS_IN_ARRAY, 0], [])
+        tick_arrays[-TICKS_IN_ARRAY].ticks[-2] = tick_lower
+        tick_arrays[0].ticks[2] = tick_upper
+        tick_arrays = [dataclasses.replace(tick_array, whirlpool=WHIRLPOOL_PUBKEY) for tick_array in tick_arrays.values()]
+        batch = QuoteBuilder.collect_batch(CollectBatchQuoteParams(whirlpool, [position], tick_arrays))
+        self.assertEqual(batch[0].fees, quote)
+        return quote
+
+    def build_position(self, liquidity: int = Q64, **kwargs) -> Position:
+        return build_position(self.TICK_LOWER_INDEX, self.TICK_UPPER_INDEX, liquidity, **kwargs)
+
+    def test_price_in_range(self):
+        # inside = global - outside(lower) - outside(upper) = (1000 - 100 - 200, 2000 - 300 - 50) = (700, 1650)
+        quote = self.quote(0, self.build_position(fee_growth_checkpoint_a=500, fee_growth_checkpoint_b=1650, fee_owed_a=7, fee_owed_b=3))
+        self.assertEqual((quote.fee_owed_a, quote.fee_owed_b), (7 + 200, 3))
+
+    def test_price_below_range_wraps(self):
+        # below = global - outside(lower) = (900, 1700), above = outside(upper) = (200, 50)
+        # inside = (1000 - 900 - 200, 2000 - 1700 - 50) = (-100 mod 2^128, 250)
+        quote = self.quote(-200, self.build_position(fee_growth_checkpoint_a=2**128 - 150, fee_growth_checkpoint_b=200))
+        self.assertEqual((quote.fee_owed_a, quote.fee_owed_b), (50, 50))
+
+    def test_price_above_range_wraps(self):
+        # below = outside(lower) = (100, 300), above = global - outside(upper) = (800, 1950)
+        # inside = (1000 - 100 - 800, 2000 - 300 - 1950) = (100, -250 mod 2^128)
+        quote = self.quote(200, self.build_position(fee_growth_checkpoint_a=40, fee_growth_checkpoint_b=2**128 - 260))
+        self.assertEqual((quote.fee_owed_a, quote.fee_owed_b), (60, 10))
+
+    def test_price_at_upper_tick(self):
+        # tick_current_index == tick_upper_index is above the range
+        quote = self.quote(self.TICK_UPPER_INDEX, self.build_position(fee_growth_checkpoint_b=2**128 - 260))
+        self.assertEqual((quote.fee_owed_a, quote.fee_owed_b), (100, 10))
+
+    def test_uninitialized_ticks(self):
+        # below = global, above = 0, so inside = 0
+        uninitialized = build_tick(False, 12345, 67890)
+        quote = self.quote(0, self.build_position(fee_owed_a=1, fee_owed_b=2), uninitialized, uninitialized)
+        self.assertEqual((quote.fee_owed_a, quote.fee_owed_b), (1, 2))
+
+    def test_zero_liquidity(self):
+        quote = self.quote(0, self.build_position(0, fee_owed_a=5, fee_owed_b=6))
+        self.assertEqual((quote.fee_owed_a, quote.fee_owed_b), (5, 6))
+
+    def test_fractional_liquidity_is_floored(self):
+        # 1.5 * (700 - 599) = 151.5
+        quote = self.quote(0, self.build_position(3 * Q64 // 2, fee_growth_checkpoint_a=599, fee_growth_checkpoint_b=1650))
+        self.assertEqual(quote.fee_owed_a, 151)
+
+    def test_fee_owed_wraps_u64(self):
+        quote = self.quote(0, self.build_position(fee_growth_checkpoint_a=698, fee_growth_checkpoint_b=1650, fee_owed_a=2**64 - 1))
+        self.assertEqual(quote.fee_owed_a, 1)
+
+
+class RewardGrowthTestCase(unittest.TestCase):
+    LIQUIDITY = 1000
+    # 5 tokens per second
+    EMISSIONS = (5 * Q64, 7 * Q64, 0)
+
+    def build_whirlpool(self, liquidity: int = LIQUIDITY, reward_growths_global=(0, 0, 0), emissions_per_second_x64=EMISSIONS, tick_current_index: int = 0) -> Whirlpool:
+        return build_whirlpool(
+            tick_current_index,
+            liquidity=liquidity,
+            reward_growths_global=reward_growths_global,
+            emissions_per_second_x64=emissions_per_second_x64,
+            reward_initialized=(True, True, False),
+            reward_last_updated_timestamp=1000,
+        )
+
+    def test_reward_growth_delta(self):
+        # 10 seconds * 5 tokens / 1000 liquidity
+        self.assertEqual(RewardUtil.get_reward_growth_delta(10, 5 * Q64, 1000), 50 * Q64 // 1000)
+        # time_delta * emissions overflows u128
+        self.assertEqual(RewardUtil.get_reward_growth_delta(2**65, 2**64, 1), 0)
+        self.assertEqual(RewardUtil.get_reward_growth_delta(1, 2**128 - 1, 1), 2**128 - 1)
+
+    def test_next_reward_growths_global(self):
+        whirlpool = self.build_whirlpool(reward_growths_global=(100, 2**128 - 1, 300))
+        growths = RewardUtil.get_next_reward_growths_global(whirlpool, 1010)
+        self.assertEqual(growths[0], 100 + 50 * Q64 // 1000)
+        # wraps around u128
+        self.assertEqual(growths[1], 70 * Q64 // 1000 - 1)
+        # not initialized
+        self.assertEqual(growths[2], 300)
+
+    def test_next_reward_growths_global_zero_liquidity(self):
+        whirlpool = self.build_whirlpool(liquidity=0, reward_growths_global=(100, 200, 300))
+        self.assertEqual(RewardUtil.get_next_reward_growths_global(whirlpool, 2000), [100, 200, 300])
+        with self.assertRaises(InvaliantFailedError):
+            RewardUtil.get_next_reward_growths_global(whirlpool, 999)
+
+    def test_collect_rewards_quote(self):
+        whirlpool = self.build_whirlpool(reward_growths_global=(1000, 2000, 0))
+        tick_lower = build_tick(True, reward_growths_outside=(100, 300, 0))
+        tick_upper = build_tick(True, reward_growths_outside=(200, 2**128 - 10, 0))
+        # the position has a half of the liquidity: 10 seconds * 5 tokens / 2 = 25 (24 after flooring the x64 growth)
+        position = build_position(-128, 128, 500, reward_growth_checkpoints=(700, 1700 + 10, 0), reward_owed=(1, 2, 3))
+
+        at_last_update = QuoteBuilder.collect_rewards(CollectRewardsQuoteParams(whirlpool, position, tick_lower, tick_upper))
+        # inside = (1000 - 100 - 200, 2000 - 300 - (2^128 - 10)) = (700, 1710)
+        self.assertEqual(at_last_update.reward_owed, [1, 2, None])
+
+        quote = QuoteBuilder.collect_rewards(CollectRewardsQuoteParams(whirlpool, position, tick_lower, tick_upper, timestamp=1010))
+        self.assertEqual(quote.reward_owed, [1 + 500 * (50 * Q64 // 1000) // Q64, 2 + 500 * (70 * Q64 // 1000) // Q64, None])
+        self.assertEqual(quote.reward_owed[:2], [1 + 24, 2 + 34])
+
+    def test_collect_rewards_quote_out_of_range(self):
+        # the price is below the range, so the projected growth is not inside of it
+        whirlpool = self.build_whirlpool(tick_current_index=-200)
+        tick_lower = build_tick(True)
+        tick_upper = build_tick(True)
+        position = build_position(-128, 128, 500)
+        quote = QuoteBuilder.collect_rewards(CollectRewardsQuoteParams(whirlpool, position, tick_lower, tick_upper, timestamp=1010))
+        self.assertEqual(quote.reward_owed, [0, 0, None])
+
+    def test_position_emissions(self):
+        whirlpool = self.build_whirlpool()
+        positions = [build_position(-128, 128, 250), build_position(128, 256, 250)]
+        self.assertEqual(RewardUtil.get_position_emissions_per_second_x64(whirlpool, positions), [[5 * Q64 // 4, 7 * Q64 // 4, 0], [0, 0, 0]])
+        empty = self.build_whirlpool(liquidity=0)
+        self.assertEqual(RewardUtil.get_position_emissions_per_second_x64(empty, positions[:1]), [[0, 0, 0]])
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+class LiquidityDistributionTestCase(unittest.TestCase):
+    START_TICK_INDEXES = [i * TICKS_IN_ARRAY for i in range(-4, 4)]
+
+    def build_random_tick_arrays(self, rng: random.Random, start_tick_indexes, count: int):
+        positions = []
+        for _ in range(count):
+            lower = rng.randrange(-4 * TICKS_IN_ARRAY, 4 * TICKS_IN_ARRAY - TICK_SPACING) // TICK_SPACING * TICK_SPACING
+            upper = rng.randrange(lower + TICK_SPACING, 4 * TICKS_IN_ARRAY + 1, TICK_SPACING)
+            positions.append((lower, upper, rng.randrange(1, 10**20)))
+        return build_tick_arrays(start_tick_indexes, positions)
+
+    def assert_same_distribution(self, actual: LiquidityDistribution, expected: LiquidityDistribution):
+        self.assertEqual(actual.tick_indexes.tolist(), expected.tick_indexes.tolist())
+        self.assertEqual(actual.liquidity_net.tolist(), expected.liquidity_net.tolist())
+        self.assertEqual(actual.liquidity.tolist(), expected.liquidity.tolist())
+
+    def test_update_tick_array_equals_rebuild(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            # start with a subset of the tick arrays, then replace or add random ones
+            initial = rng.sample(self.START_TICK_INDEXES, rng.randrange(0, len(self.START_TICK_INDEXES)))
+            tick_arrays = self.build_random_tick_arrays(rng, initial, 30)
+            distribution = LiquidityDistribution(TICK_SPACING, list(tick_arrays.values()))
+            for _ in range(10):
+                start_tick_index = rng.choice(self.START_TICK_INDEXES)
+                if rng.random() < 0.2:
+                    # all ticks of the tick array are uninitialized
+                    tick_array = build_tick_arrays([start_tick_index], [])[start_tick_index]
+                else:
+                    tick_array = self.build_random_tick_arrays(rng, [start_tick_index], 10)[start_tick_index]
+                tick_arrays[start_tick_index] = tick_array
+                distribution.update_tick_array(tick_array)
+                self.assert_same_distribution(distribution, LiquidityDistribution(TICK_SPACING, list(tick_arrays.values())))
+
+    def test_get_liquidity(self):
+        tick_arrays = build_tick_arrays([-TICKS_IN_ARRAY, 0], [(-128, 128, 100), (0, 256, 50)])
+        distribution = LiquidityDistribution(TICK_SPACING, list(tick_arrays.values()))
+        self.assertEqual(distribution.tick_indexes.tolist(), [-128, 0, 128, 256])
+        self.assertEqual(distribution.liquidity.tolist(), [100, 150, 50, 0])
+        self.assertEqual([distribution.get_liquidity(t) for t in (-129, -128, -1, 0, 127, 128, 256)], [0, 100, 100, 150, 150, 50, 0])
+        self.assertEqual(distribution.get_liquidity_array([-129, -128, -1, 0, 127, 128, 256]).tolist(), [0, 100, 100, 150, 150, 50, 0])
+
+    def test_tick_arrays_of_different_whirlpools(self):
+        tick_arrays = build_tick_arrays([0], [(0, 64, 1)])
+        distribution = LiquidityDistribution(TICK_SPACING, list(tick_arrays.values()))
+        other = TickArray(TICKS_IN_ARRAY, tick_arrays[0].ticks, WHIRLPOOL_PUBKEY)
+        with self.assertRaises(InvaliantFailedError):
+            distribution.update_tick_array(other)
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+class SplitSwapOptimizerTestCase(unittest.TestCase):
+    MINT_A = PublicKey(1)
+    MINT_B = PublicKey(2)
+    SLIPPAGE = Percentage.from_fraction(1, 100)
+
+    def build_pool(self, rng: random.Random, pubkey: PublicKey, a_to_b: bool, fee_rate: int) -> SplitSwapPool:
+        tick_current_index = rng.randrange(-TICKS_IN_ARRAY, TICKS_IN_ARRAY)
+        positions = []
+        for _ in range(rng.randrange(1, 10)):
+            lower = rng.randrange(-3 * TICKS_IN_ARRAY, 3 * TICKS_IN_ARRAY) // TICK_SPACING * TICK_SPACING
+            upper = lower + rng.randrange(1, 100) * TICK_SPACING
+            positions.append((lower, upper, rng.randrange(10**9, 10**12)))
+        # a full range position keeps the liquidity non-zero around the current price
+        positions.append((-6 * TICKS_IN_ARRAY, 6 * TICKS_IN_ARRAY, 10**9))
+        tick_arrays = build_tick_arrays([i * TICKS_IN_ARRAY for i in range(-6, 6)], positions)
+
+        liquidity = sum(l for lower, upper, l in positions if lower <= tick_current_index < upper)
+        whirlpool = dataclasses.replace(
+            build_whirlpool(tick_current_index=tick_current_index, liquidity=liquidity),
+            fee_rate=fee_rate, token_mint_a=self.MINT_A, token_mint_b=self.MINT_B,
+        )
+        offsets = (0, -1, -2) if a_to_b else (0, 1, 2)
+        return SplitSwapPool(
+            whirlpool_pubkey=pubkey,
+            whirlpool=whirlpool,
+            distribution=LiquidityDistribution(TICK_SPACING, list(tick_arrays.values())),
+            tick_arrays=[tick_arrays[TickUtil.get_start_tick_index(tick_current_index, TICK_SPACING, offset)] for offset in offsets],
+        )
+
+    def quote(self, pool: SplitSwapPool, amount: int, a_to_b: bool):
+        whirlpool = pool.whirlpool
+        return swap_quote_with_params(SwapQuoteParams(
+            amount=amount,
+            amount_specified_is_input=True,
+            a_to_b=a_to_b,
+            tick_current_index=whirlpool.tick_current_index,
+            sqrt_price=whirlpool.sqrt_price,
+            liquidity=whirlpool.liquidity,
+            fee_rate=whirlpool.fee_rate,
+            tick_spacing=whirlpool.tick_spacing,
+            tick_arrays=pool.tick_arrays,
+            slippage_tolerance=self.SLIPPAGE,
+        ))
+
+    def test_allocations(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            a_to_b = rng.random() < 0.5
+            pools = [self.build_pool(rng, PublicKey(100 + i), a_to_b, rng.choice([100, 500, 3000, 10000])) for i in range(rng.randrange(1, 4))]
+            max_inputs = {pool.whirlpool_pubkey: SwapCurve(pool, a_to_b).get_max_input_amount() for pool in pools}
+            amount = rng.randrange(1, sum(max_inputs.values()) + 1)
+
+            plan = SplitSwapOptimizer.optimize(SplitSwapParams(amount, a_to_b, pools, self.SLIPPAGE))
+            self.assertEqual(sum(leg.quote.amount for leg in plan.legs), amount)
+            self.assertEqual(plan.estimated_amount_out, sum(leg.quote.estimated_amount_out for leg in plan.legs))
+            for leg in plan.legs:
+                self.assertGreater(leg.quote.amount, 0)
+                self.assertLessEqual(leg.quote.amount, max_inputs[leg.whirlpool_pubkey])
+                self.assertLessEqual(leg.quote.estimated_amount_in, leg.quote.amount)
+
+    def test_single_pool_equals_swap_quote(self):
+        rng = random.Random(1)
+        for a_to_b in (True, False):
+            pool = self.build_pool(rng, PublicKey(100), a_to_b, 3000)
+            max_input = SwapCurve(pool, a_to_b).get_max_input_amount()
+            for amount in (1, 1000, max_input // 3, max_input // 2):
+                plan = SplitSwapOptimizer.optimize(SplitSwapParams(amount, a_to_b, [pool], self.SLIPPAGE))
+                expected = self.quote(pool, amount, a_to_b)
+                self.assertEqual(len(plan.legs), 1)
+                # the quote of the leg is limited to the end of the tick arrays, which is not reached
+                self.assertEqual(dataclasses.replace(plan.legs[0].quote, sqrt_price_limit=expected.sqrt_price_limit), expected)
+                self.assertEqual(plan.estimated_amount_in, expected.estimated_amount_in)
+                self.assertEqual(plan.estimated_amount_out, expected.estimated_amount_out)
+                self.assertEqual(plan.other_amount_threshold, expected.other_amount_threshold)
+
+    def test_not_worse_than_single_pool(self):
+        rng = random.Random(2)
+        for _ in range(10):
+            a_to_b = rng.random() < 0.5
+            pools = [self.build_pool(rng, PublicKey(100 + i), a_to_b, fee_rate) for i, fee_rate in enumerate((500, 3000))]
+            amount = min(SwapCurve(pool, a_to_b).get_max_input_amount() for pool in pools) // 2
+            plan = SplitSwapOptimizer.optimize(SplitSwapParams(amount, a_to_b, pools, self.SLIPPAGE))
+            best_single = max(self.quote(pool, amount, a_to_b).estimated_amount_out for pool in pools)
+            # rounding of each leg may lose a unit per leg
+            self.assertGreaterEqual(plan.estimated_amount_out + len(plan.legs), best_single)
+
+    def test_not_enough_liquidity(self):
+        rng = random.Random(3)
+        pool = self.build_pool(rng, PublicKey(100), True, 3000)
+        max_input = SwapCurve(pool, True).get_max_input_amount()
+        with self.assertRaises(InvaliantFailedError):
+            SplitSwapOptimizer.optimize(SplitSwapParams(max_input + 1, True, [pool], self.SLIPPAGE))
+
+
+class FixedPointMathTestCase(unittest.TestCase):
+    def test_mul_div(self):
+        self.assertEqual(FixedPointMath.mul_div(0, U128_MAX, 1), 0)
+        self.assertEqual(FixedPointMath.mul_div(0, 0, 1, True), 0)
+        self.assertEqual(FixedPointMath.mul_div(U128_MAX, 1, 1), U128_MAX)
+        self.assertEqual(FixedPointMath.mul_div(U128_MAX, U128_MAX, U128_MAX, True), U128_MAX)
+        self.assertEqual(FixedPointMath.mul_div(U64_MAX, U64_MAX, 1), U64_MAX * U64_MAX)
+        # rounding
+        self.assertEqual(FixedPointMath.mul_div(7, 3, 2), 10)
+        self.assertEqual(FixedPointMath.mul_div(7, 3, 2, True), 11)
+        self.assertEqual(FixedPointMath.mul_div(6, 2, 3, True), 4)
+        self.assertEqual(FixedPointMath.mul_div(U128_MAX, 2, 7, True), (U128_MAX * 2) // 7 + 1)
+        with self.assertRaises(InvaliantFailedError):
+            FixedPointMath.mul_div(U128_MAX, 2, 1)
+        with self.assertRaises(InvaliantFailedError):
+            FixedPointMath.mul_div(1, 1, 0)
+
+    def test_mul_shift_right(self):
+        self.assertEqual(FixedPointMath.mul_shift_right(0, U128_MAX), 0)
+        self.assertEqual(FixedPointMath.mul_shift_right(U64_MAX, Q64_ONE), U64_MAX)
+        self.assertEqual(FixedPointMath.mul_shift_right(U64_MAX, Q64_ONE, True), U64_MAX)
+        self.assertEqual(FixedPointMath.mul_shift_right(1, 1), 0)
+        self.assertEqual(FixedPointMath.mul_shift_right(1, 1, True), 1)
+        self.assertEqual(FixedPointMath.mul_shift_right(3, Q64_ONE // 2), 1)
+        self.assertEqual(FixedPointMath.mul_shift_right(3, Q64_ONE // 2, True), 2)
+        with self.assertRaises(InvaliantFailedError):
+            FixedPointMath.mul_shift_right(Q64_ONE, Q64_ONE)
+        with self.assertRaises(InvaliantFailedError):
+            FixedPointMath.mul_shift_right(U64_MAX, Q64_ONE + 1, True)
+
+    def test_div_round_up_if(self):
+        self.assertEqual(FixedPointMath.div_round_up_if(0, 5, True), 0)
+        self.assertEqual(FixedPointMath.div_round_up_if(10, 5, True), 2)
+        self.assertEqual(FixedPointMath.div_round_up_if(11, 5, False), 2)
+        self.assertEqual(FixedPointMath.div_round_up_if(11, 5, True), 3)
+        self.assertEqual(FixedPointMath.div_round_up_if(U128_MAX, U64_MAX, False), Q64_ONE + 1)
+        self.assertEqual(FixedPointMath.div_round_up_if(U128_MAX, Q64_ONE, True), Q64_ONE)
+        self.assertEqual(FixedPointMath.div_round_up(U128_MAX, Q64_ONE), Q64_ONE)
+        with self.assertRaises(InvaliantFailedError):
+            FixedPointMath.div_round_up_if(1, 0, True)
+
+    def test_sqrt(self):
+        self.assertEqual(FixedPointMath.sqrt(0), 0)
+        self.assertEqual(FixedPointMath.sqrt(0, True), 0)
+        self.assertEqual(FixedPointMath.sqrt(16, True), 4)
+        self.assertEqual(FixedPointMath.sqrt(15), 3)
+        self.assertEqual(FixedPointMath.sqrt(15, True), 4)
+        self.assertEqual(FixedPointMath.sqrt(U128_MAX), U64_MAX)
+        self.assertEqual(FixedPointMath.sqrt(U128_MAX, True), Q64_ONE)
+        self.assertEqual(FixedPointMath.sqrt(U64_MAX * U64_MAX, True), U64_MAX)
+
+    def test_sqrt_x64(self):
+        self.assertEqual(FixedPointMath.sqrt_x64(0), 0)
+        self.assertEqual(FixedPointMath.sqrt_x64(Q64_ONE), Q64_ONE)
+        self.assertEqual(FixedPointMath.sqrt_x64(4 * Q64_ONE, True), 2 * Q64_ONE)
+        # sqrt(2) * 2^64
+        self.assertEqual(FixedPointMath.sqrt_x64(2 * Q64_ONE), 26087635650665564424)
+        self.assertEqual(FixedPointMath.sqrt_x64(2 * Q64_ONE, True), 26087635650665564425)
+        self.assertEqual(FixedPointMath.sqrt_x64(U128_MAX), FixedPointMath.sqrt(U128_MAX << 64))
+
+    def test_to_x64(self):
+        self.assertEqual(FixedPointMath.to_x64(0), 0)
+        self.assertEqual(FixedPointMath.to_x64(1), Q64_ONE)
+        self.assertEqual(FixedPointMath.to_x64(U64_MAX), U64_MAX << 64)
+        self.assertEqual(FixedPointMath.to_x64(Decimal("0.5")), Q64_ONE // 2)
+        self.assertEqual(FixedPointMath.to_x64(Fraction(1, 3)), 6148914691236517205)
+        self.assertEqual(FixedPointMath.to_x64(Fraction(1, 3), True), 6148914691236517206)
+        self.assertEqual(FixedPointMath.to_x64(Fraction(1, 2), True), Q64_ONE // 2)
+
+    def test_x64_to(self):
+        for num_x64 in (0, 1, Q64_ONE // 3, Q64_ONE, U64_MAX, U128_MAX):
+            self.assertEqual(FixedPointMath.x64_to_fraction(num_x64), Fraction(num_x64, Q64_ONE))
+            # exact
+            self.assertEqual(Fraction(FixedPointMath.x64_to_decimal(num_x64)), Fraction(num_x64, Q64_ONE))
+            self.assertEqual(FixedPointMath.to_x64(FixedPointMath.x64_to_decimal(num_x64)), num_x64)
+        self.assertEqual(FixedPointMath.x64_to_decimal(1), Decimal("5.42101086242752217003726400434970855712890625E-20"))
+        self.assertEqual(FixedPointMath.x128_to_decimal(1 << 128, 3), Decimal(1000))
+        self.assertEqual(Fraction(FixedPointMath.x128_to_decimal(U128_MAX, -2)), Fraction(U128_MAX, 100 << 128))
+
+
+class PriceMathTestCase(unittest.TestCase):
+    def test_sqrt_price_x64_to_price_is_bounded(self):
+        price = PriceMath.sqrt_price_x64_to_price(3253078221838975758, 9, 6)
+        self.assertLessEqual(len(price.as_tuple().digits), 100)
+        self.assertEqual(DecimalUtil.to_fixed(price, 6), Decimal("31.099225"))
+        self.assertEqual(PriceMath.sqrt_price_x64_to_price(1 << 64, 6, 6), Decimal(1))
+
+    def test_sqrt_price_x64_to_price_round_trip(self):
+        for decimals_a, decimals_b in ((9, 6), (6, 9), (6, 6), (0, 9)):
+            for tick_index in (-443636, -100000, -1, 0, 1, 12345, 443636):
+                sqrt_price = PriceMath.tick_index_to_sqrt_price_x64(tick_index)
+                price = PriceMath.sqrt_price_x64_to_price(sqrt_price, decimals_a, decimals_b)
+                self.assertEqual(PriceMath.price_to_sqrt_price_x64(price, decimals_a, decimals_b), sqrt_price)
+                self.assertEqual(PriceMath.price_to_tick_index(price, decimals_a, decimals_b), tick_index)
+
+
+class PercentageTestCase(unittest.TestCase):
+    def assertPercentage(self, percentage: Percentage, numerator: int, denominator: int):
+        self.assertEqual((percentage.numerator, percentage.denominator), (numerator, denominator))
+
+    def test_from_percentage_accepts_str_decimal_and_int(self):
+        for value in ("1", " 1 ", "1.0", "1e0", Decimal("1"), Decimal("1.00"), 1):
+            self.assertPercentage(Percentage.from_percentage(value), 1, 100)
+        for value in ("0.01", Decimal("0.01"), "1E-2"):
+            self.assertPercentage(Percentage.from_percentage(value), 1, 10000)
+        for value in ("0", Decimal(0), 0):
+            self.assertPercentage(Percentage.from_percentage(value), 0, 1)
+        self.assertPercentage(Percentage.from_percentage(100), 1, 1)
+        # truncated to 4 decimals
+        self.assertPercentage(Percentage.from_percentage(Decimal("12.34567")), 1929, 15625)  # 123456 / 1000000
+
+    def test_from_percentage_rejects_out_of_range(self):
+        for value in ("100.01", "0.00001", "-1", Decimal("-0.5"), 101):
+            with self.assertRaises(InvaliantFailedError):
+                Percentage.from_percentage(value)
+
+    def test_cached_instances_are_immutable(self):
+        slippage = Percentage.from_fraction(1, 100)
+        self.assertIs(Percentage.from_fraction(1, 100), slippage)
+        with self.assertRaises(AttributeError):
+            slippage.numerator = 50
+        with self.assertRaises(AttributeError):
+            del slippage.denominator
+        self.assertPercentage(Percentage.from_fraction(1, 100), 1, 100)
+
+    def test_pickle(self):
+        slippage = pickle.loads(pickle.dumps(Percentage.from_fraction(3, 1000)))
+        self.assertPercentage(slippage, 3, 1000)
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "numpy is not installed")
+class PercentageArrayTestCase(unittest.TestCase):
+    AMOUNTS = [0, 1, 100, 12345678901234, 2**64 - 1]
+
+    def test_adjust_array_0_percent(self):
+        slippage = Percentage.from_percentage("0")
+        amounts = np.array(self.AMOUNTS, dtype=np.uint64)
+        self.assertEqual(slippage.adjust_sub_array(amounts).tolist(), self.AMOUNTS)
+        self.assertEqual(slippage.adjust_add_array(amounts).tolist(), self.AMOUNTS)
+
+    def test_adjust_array_100_percent(self):
+        slippage = Percentage.from_percentage("100")
+        amounts = np.array(self.AMOUNTS, dtype=np.uint64)
+        self.assertEqual(slippage.adjust_sub_array(amounts).tolist(), [0] * len(self.AMOUNTS))
+        self.assertEqual(slippage.adjust_add_array(amounts).tolist(), [amount * 2 for amount in self.AMOUNTS])
+
+    def test_adjust_array_matches_scalar(self):
+        amounts = np.array(self.AMOUNTS, dtype=np.uint64)
+        for percentage in ("0", "0.01", "1", "99.99", "100"):
+            slippage = Percentage.from_percentage(percentage)
+            self.assertEqual(slippage.adjust_sub_array(amounts).tolist(), [slippage.adjust_sub(amount) for amount in self.AMOUNTS])
+            self.assertEqual(slippage.adjust_add_array(amounts).tolist(), [slippage.adjust_add(amount) for amount in self.AMOUNTS])
+
+
+class WhirlpoolIxEncoderTestCase(unittest.TestCase):
+    CASES = 200
+    U64_MAX = 2**64 - 1
+    U128_MAX = 2**128 - 1
+
+    def setUp(self):
+        self.rng = random.Random(0)
+
+    def random_pubkey(self) -> PublicKey:
+        return PublicKey(self.rng.getrandbits(256).to_bytes(32, "little"))
+
+    def random_u64(self) -> int:
+        return self.rng.choice([0, 1, self.U64_MAX, self.rng.getrandbits(64)])
+
+    def random_u128(self) -> int:
+        return self.rng.choice([0, 1, self.U64_MAX, self.U64_MAX + 1, self.U128_MAX, self.rng.getrandbits(128)])
+
+    def assertSameInstruction(self, encoded: TransactionInstruction, expected: TransactionInstruction):
+        self.assertEqual(encoded.program_id, expected.program_id)
+        self.assertEqual(encoded.data, expected.data)
+        self.assertEqual(
+            [(meta.pubkey, meta.is_signer, meta.is_writable) for meta in encoded.keys],
+            [(meta.pubkey, meta.is_signer, meta.is_writable) for meta in expected.keys],
+        )
+
+    def test_swap(self):
+        for _ in range(self.CASES):
+            program_id = self.random_pubkey()
+            args = {
+                "amount": self.random_u64(),
+                "other_amount_threshold": self.random_u64(),
+                "sqrt_price_limit": self.random_u128(),
+                "amount_specified_is_input": self.rng.random() < 0.5,
+                "a_to_b": self.rng.random() < 0.5,
+            }
+            names = ["token_authority", "whirlpool", "token_owner_account_a", "token_vault_a", "token_owner_account_b", "token_vault_b", "tick_array0", "tick_array1", "tick_array2", "oracle"]
+            accounts = {name: self.random_pubkey() for name in names}
+            encoded = WhirlpoolIxEncoder.swap(program_id, *args.values(), *accounts.values())
+            expected = static_instructions.swap(args, {"token_program": TOKEN_PROGRAM_ID, **accounts}, program_id)
+            self.assertSameInstruction(encoded, expected)
+
+    def test_modify_liquidity(self):
+        for encode, build, arg_names in (
+            (WhirlpoolIxEncoder.increase_liquidity, static_instructions.increase_liquidity, ["liquidity_amount", "token_max_a", "token_max_b"]),
+            (WhirlpoolIxEncoder.decrease_liquidity, static_instructions.decrease_liquidity, ["liquidity_amount", "token_min_a", "token_min_b"]),
+        ):
+            for _ in range(self.CASES):
+                program_id = self.random_pubkey()
+                args = dict(zip(arg_names, [self.random_u128(), self.random_u64(), self.random_u64()]))
+                names = ["whirlpool", "position_authority", "position", "position_token_account", "token_owner_account_a", "token_owner_account_b", "token_vault_a", "token_vault_b", "tick_array_lower", "tick_array_upper"]
+                accounts = {name: self.random_pubkey() for name in names}
+                encoded = encode(program_id, *args.values(), *accounts.values())
+                expected = build(args, {"token_program": TOKEN_PROGRAM_ID, **accounts}, program_id)
+                self.assertSameInstruction(encoded, expected)
+
+    def test_keys_are_not_shared(self):
+        ix_0 = build_swap_ix(1)
+        ix_0.keys[0].is_writable = True
+        ix_1 = build_swap_ix(1)
+        self.assertFalse(ix_1.keys[0].is_writable)
+
+
+def build_swap_ix(amount: int, whirlpool: PublicKey = PublicKey(1), token_authority: PublicKey = PublicKey(2)) -> TransactionInstruction:
+    return WhirlpoolIxEncoder.swap(
+        PublicKey(3), amount, 0, PriceMath.tick_index_to_sqrt_price_x64(0), True, True,
+        token_authority, whirlpool, PublicKey(4), PublicKey(5), PublicKey(6), PublicKey(7),
+        PublicKey(8), PublicKey(9), PublicKey(10), PublicKey(11),
+    )
+
+
+class SimulationConnection:
+    def __init__(self, units_consumed: int):
+        self.units_consumed = units_consumed
+        self.simulated = 0
+
+    async def simulate_transaction(self, transaction, sig_verify=False):
+        self.simulated += 1
+        return types.SimpleNamespace(value=types.SimpleNamespace(err=None, units_consumed=self.units_consumed))
+
+
+class ComputeBudgetTestCase(unittest.TestCase):
+    FEE_PAYER = PublicKey(2)
+    BLOCKHASH = Blockhash(str(PublicKey(12)))
+
+    def test_priority_fee_estimator_is_abstract(self):
+        with self.assertRaises(TypeError):
+            PriorityFeeEstimator()
+
+    def test_shape_ignores_ephemeral_signers(self):
+        def open_position_like(mint: PublicKey):
+            return [TransactionInstruction([
+                AccountMeta(self.FEE_PAYER, True, True),
+                AccountMeta(mint, True, True),
+                AccountMeta(PublicKey(1), False, True),
+            ], PublicKey(3), b"")]
+        shape_0 = get_operation_shape(open_position_like(Keypair().public_key), self.FEE_PAYER)
+        shape_1 = get_operation_shape(open_position_like(Keypair().public_key), self.FEE_PAYER)
+        self.assertEqual(shape_0, shape_1)
+        self.assertIn(str(self.FEE_PAYER), shape_0[0][1])
+
+    def test_shape_buckets_swap_amount(self):
+        shape = lambda amount: get_operation_shape([build_swap_ix(amount)], self.FEE_PAYER)
+        self.assertEqual(shape(1100), shape(1500))
+        self.assertNotEqual(shape(1100), shape(5000))
+
+    def test_estimate_resimulates_larger_swap(self):
+        connection = SimulationConnection(100_000)
+        estimator = ComputeBudgetEstimator(connection)
+        estimate = lambda amount: asyncio.run(estimator.estimate(self.FEE_PAYER, self.BLOCKHASH, [build_swap_ix(amount)]))
+
+        self.assertEqual(estimate(1200).compute_unit_limit, 110_000)
+        self.assertEqual(connection.simulated, 1)
+        estimate(1100)
+        self.assertEqual(connection.simulated, 1)
+        # same bucket, but larger than the simulated amount
+        connection.units_consumed = 120_000
+        self.assertEqual(estimate(1500).compute_unit_limit, 132_000)
+        self.assertEqual(connection.simulated, 2)
+
+    def test_estimate_cache_is_bounded(self):
+        connection = SimulationConnection(100_000)
+        estimator = ComputeBudgetEstimator(connection, cache_size=4)
+        for i in range(10):
+            asyncio.run(estimator.estimate(self.FEE_PAYER, self.BLOCKHASH, [build_swap_ix(1000, whirlpool=PublicKey(100 + i))]))
+        self.assertEqual(len(estimator._units_cache), 4)
+        # the most recently used shapes are kept
+        asyncio.run(estimator.estimate(self.FEE_PAYER, self.BLOCKHASH, [build_swap_ix(1000, whirlpool=PublicKey(109))]))
+        self.assertEqual(connection.simulated, 10)
+
+
+def build_memo_like_transaction(signers) -> Transaction:
+    transaction = Transaction()
+    transaction.add(TransactionInstruction(
+        [AccountMeta(signer.public_key, True, i == 0) for i, signer in enumerate(signers)] + [AccountMeta(PublicKey(1), False, True)],
+        PublicKey(3),
+        b"memo",
+    ))
+    return transaction
+
+
+class ProcessorConnection:
+    # statuses: called with the number of get_signature_statuses calls so far
+    def __init__(self, statuses, block_height: int = 0):
+        self.statuses = statuses
+        self.block_height = block_height
+        self.blockhashes = 0
+        self.status_calls = 0
+        self.sent = []
+
+    async def get_latest_blockhash(self):
+        self.blockhashes += 1
+        blockhash = Hash(bytes([self.blockhashes] * 32))
+        return types.SimpleNamespace(value=types.SimpleNamespace(blockhash=blockhash, last_valid_block_height=100))
+
+    async def send_raw_transaction(self, serialized, opts=None):
+        self.sent.append(serialized)
+
+    async def get_signature_statuses(self, signatures):
+        self.status_calls += 1
+        return types.SimpleNamespace(value=[self.statuses(self.status_calls)])
+
+    async def get_block_height(self, commitment=None):
+        return types.SimpleNamespace(value=self.block_height)
+
+
+def build_status(confirmation_status: TransactionConfirmationStatus, err=None) -> TransactionStatus:
+    return TransactionStatus(1, None, err, err, confirmation_status)
+
+
+class TransactionProcessorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fee_payer = Keypair()
+        self.signer = Keypair()
+
+    def send(self, connection: ProcessorConnection, max_resign: int = 3):
+        processor = TransactionProcessor(connection, self.fee_payer, rebroadcast_interval_second=0, max_resign=max_resign)
+        payload = TransactionPayload(build_memo_like_transaction([self.fee_payer, self.signer]), [self.signer])
+
+        async def run():
+            signed = await processor.sign_transaction(payload)
+            return await signed.execute()
+        return asyncio.run(run())
+
+    def test_resign_matches_fresh_transaction(self):
+        signers = [self.fee_payer, self.signer]
+        transaction = build_memo_like_transaction(signers)
+        transaction.recent_blockhash = Blockhash(str(Hash(bytes([1] * 32))))
+        transaction.sign(*signers)
+        compiled = CompiledTransaction.from_transaction(transaction, signers)
+        compiled.set_signatures(list(transaction.signatures))
+        self.assertEqual(compiled.serialize(), transaction.serialize())
+
+        recent_blockhash = Blockhash(str(Hash(bytes([2] * 32))))
+        compiled.set_recent_blockhash(recent_blockhash)
+        compiled.sign()
+
+        fresh = build_memo_like_transaction(signers)
+        fresh.recent_blockhash = recent_blockhash
+        fresh.sign(*signers)
+        self.assertEqual(compiled.serialize(), fresh.serialize())
+        self.assertEqual(compiled.recent_blockhash, recent_blockhash)
+
+    def test_landed_transaction_is_not_resigned(self):
+        # processed before the blockhash has expired, confirmed after that
+        statuses = lambda call: build_status(TransactionConfirmationStatus.Processed if call < 5 else TransactionConfirmationStatus.Confirmed)
+        connection = ProcessorConnection(statuses, block_height=1000)
+        signature = self.send(connection)
+        self.assertEqual(connection.blockhashes, 1)
+        self.assertEqual(len(set(connection.sent)), 1)
+        self.assertEqual(connection.status_calls, 5)
+        self.assertEqual(bytes(signature), connection.sent[0][1:65])
+
+    def test_failed_transaction_raises(self):
+        err = TransactionErrorInstructionError(0, InstructionErrorCustom(6000))
+        connection = ProcessorConnection(lambda call: build_status(TransactionConfirmationStatus.Processed, err))
+        with self.assertRaises(TransactionFailedError) as cm:
+            self.send(connection)
+        self.assertEqual(cm.exception.err, err)
+        self.assertEqual(connection.blockhashes, 1)
+
+    def test_resign_exhausted_raises(self):
+        # never lands and the blockhash has always expired
+        connection = ProcessorConnection(lambda call: None, block_height=1000)
+        with self.assertRaises(TransactionExpiredBlockheightExceededError):
+            self.send(connection, max_resign=2)
+        self.assertEqual(connection.blockhashes, 3)
+        self.assertEqual(len(set(connection.sent)), 3)
+
+
+class BatchSignerTestCase(unittest.TestCase):
+    def build_transactions(self):
+        signers = [Keypair.from_seed(bytes([i] * 32)) for i in range(1, 4)]
+        transactions = []
+        for i in range(20):
+            tx_signers = signers[:1 + i % len(signers)]
+            transaction = build_memo_like_transaction(tx_signers)
+            transaction.fee_payer = tx_signers[0].public_key
+            transaction.recent_blockhash = Blockhash(str(Hash(bytes([i] * 32))))
+            transactions.append((transaction, tx_signers))
+        return transactions
+
+    def sign(self, batch_signer: BatchSigner):
+        compiled = [CompiledTransaction.from_transaction(tx, signers) for tx, signers in self.build_transactions()]
+        return batch_signer.sign(compiled)
+
+    def test_executors_produce_identical_bytes(self):
+        expected = []
+        for transaction, signers in self.build_transactions():
+            transaction.sign(*signers)
+            expected.append(transaction.serialize())
+
+        self.assertEqual(self.sign(BatchSigner()), expected)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(self.sign(BatchSigner(executor, chunk_size=3)), expected)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(self.sign(BatchSigner(executor, chunk_size=3)), expected)
+
+
+class StubConnection:
+    pass
+
+
+class EndpointClientStub:
+    # replaces the RPC methods of an AsyncClient in an EndpointPool
+    RENT_DATA = RENT_LAYOUT.pack(3480, 2.0, 50)
+
+    def __init__(self, client, name: str, served: list):
+        self.name = name
+        self.served = served
+        for method in ("get_account_info", "get_multiple_accounts", "get_epoch_info"):
+            setattr(client, method, getattr(self, method))
+
+    async def get_account_info(self, pubkey, *args, **kwargs):
+        self.served.append(("get_account_info", self.name))
+        return types.SimpleNamespace(value=types.SimpleNamespace(data=self.RENT_DATA))
+
+    async def get_multiple_accounts(self, pubkeys, *args, **kwargs):
+        self.served.append(("get_multiple_accounts", self.name))
+        return types.SimpleNamespace(value=[None] * len(pubkeys))
+
+    async def get_epoch_info(self, *args, **kwargs):
+        self.served.append(("get_epoch_info", self.name))
+        return types.SimpleNamespace(value=types.SimpleNamespace(epoch=400, slots_in_epoch=432000, slot_index=1000))
+
+
+class RentTestCase(unittest.TestCase):
+    # mainnet parameters
+    RENT = Rent(3480, 2.0, 50)
+
+    def test_minimum_balance_matches_known_values(self):
+        # solana rent --lamports
+        self.assertEqual(self.RENT.minimum_balance(0), 890880)
+        self.assertEqual(self.RENT.minimum_balance(82), 1461600)  # mint
+        self.assertEqual(self.RENT.minimum_balance(165), 2039280)  # token account
+
+    def test_minimum_balance_matches_rust_formula(self):
+        # ((ACCOUNT_STORAGE_OVERHEAD + data_len) * lamports_per_byte_year) as f64 * exemption_threshold) as u64
+        for rent in (self.RENT, Rent(1, 1.5, 0), Rent(3481, 0.3, 0), Rent(10**9, 2.5, 100)):
+            for data_len in (0, 1, 165, 10240, 10 * 1024 * 1024):
+                expected = int(float((128 + data_len) * rent.lamports_per_byte_year) * rent.exemption_threshold)
+                self.assertEqual(rent.minimum_balance(data_len), expected)
+
+    def test_from_bytes(self):
+        self.assertEqual(Rent.from_bytes(RENT_LAYOUT.pack(3480, 2.0, 50)), self.RENT)
+
+    def test_calculator_refreshes_once_for_concurrent_callers(self):
+        served = []
+        client = StubConnection()
+        EndpointClientStub(client, "client", served)
+        calculator = RentCalculator(client)
+
+        async def run():
+            return await asyncio.gather(*[calculator.get_minimum_balance_for_rent_exemption(165) for _ in range(5)])
+        self.assertEqual(asyncio.run(run()), [2039280] * 5)
+        self.assertEqual(sorted(served), [("get_account_info", "client"), ("get_epoch_info", "client")])
+        self.assertEqual(calculator.epoch, 400)
+
+
+class TokenAccountFetcher:
+    def __init__(self, token_accounts):
+        self.token_accounts = token_accounts
+        self.listed = []
+
+    async def list_token_accounts(self, pubkeys, refresh=False):
+        self.listed.append(list(pubkeys))
+        return [self.token_accounts.get(str(pubkey)) for pubkey in pubkeys]
+
+
+class ResolveOrCreateAtasTestCase(unittest.TestCase):
+    OWNER_0 = PublicKey(100)
+    OWNER_1 = PublicKey(101)
+    MINT_0 = PublicKey(200)
+    MINT_1 = PublicKey(201)
+
+    def resolve(self, pairs, token_accounts={}):
+        connection = StubConnection()
+        EndpointClientStub(connection, "connection", [])
+        fetcher = TokenAccountFetcher(token_accounts)
+        resolved = asyncio.run(TokenUtil.resolve_or_create_atas(connection, fetcher, pairs, 10**9, PublicKey(1)))
+        return resolved, fetcher
+
+    def test_create_instructions_are_deduplicated(self):
+        existing = get_associated_token_address(self.OWNER_1, self.MINT_0)
+        token_accounts = {str(existing): AccountInfo(self.MINT_0, self.OWNER_1, 0, None, 0, True, False, False, None, None)}
+        pairs = [(self.OWNER_0, self.MINT_0), (self.OWNER_0, self.MINT_1), (self.OWNER_0, self.MINT_0), (self.OWNER_1, self.MINT_0)]
+        resolved, fetcher = self.resolve(pairs, token_accounts)
+
+        self.assertEqual(resolved.pubkeys, [get_associated_token_address(owner, mint) for owner, mint in pairs])
+        self.assertEqual(len(fetcher.listed), 1)
+        self.assertEqual(len(fetcher.listed[0]), 3)
+        # existing ATA of OWNER_1 is not created
+        created = [ix.keys[1].pubkey for ix in resolved.instruction.instructions]
+        self.assertEqual(created, [get_associated_token_address(self.OWNER_0, self.MINT_0), get_associated_token_address(self.OWNER_0, self.MINT_1)])
+        # funder pays
+        self.assertTrue(all(ix.keys[0].pubkey == PublicKey(1) for ix in resolved.instruction.instructions))
+
+    def test_wrapped_sol_account_per_owner(self):
+        pairs = [(self.OWNER_0, WRAPPED_SOL_MINT), (self.OWNER_1, WRAPPED_SOL_MINT), (self.OWNER_0, WRAPPED_SOL_MINT), (self.OWNER_0, self.MINT_0)]
+        resolved, fetcher = self.resolve(pairs)
+
+        self.assertEqual(resolved.pubkeys[0], resolved.pubkeys[2])
+        self.assertNotEqual(resolved.pubkeys[0], resolved.pubkeys[1])
+        self.assertEqual([signer.public_key for signer in resolved.instruction.signers], resolved.pubkeys[:2])
+        # create ATA for MINT_0, create and initialize for each wrapped SOL account, close for each wrapped SOL account
+        self.assertEqual(len(resolved.instruction.instructions), 1 + 2 * 2)
+        self.assertEqual(len(resolved.instruction.cleanup_instructions), 2)
+        self.assertEqual(fetcher.listed, [[get_associated_token_address(self.OWNER_0, self.MINT_0)]])
+
+
+class WhirlpoolContextFromEndpointsTestCase(unittest.TestCase):
+    def test_resolve_or_create_atas_with_wrapped_sol(self):
+        ctx = WhirlpoolContext.from_endpoints(PublicKey(1), ["http://localhost:18899", "http://localhost:28899"], Keypair())
+        served = []
+        for client, name in zip(ctx.endpoint_pool.clients, ("slow", "fast")):
+            EndpointClientStub(client, name, served)
+        ctx.endpoint_pool.record_latency(0, 1.0)
+        ctx.endpoint_pool.record_latency(1, 0.1)
+
+        owner = PublicKey(2)
+        usdc = PublicKey(3)
+
+        async def run():
+            try:
+                return await TokenUtil.resolve_or_create_atas(ctx.connection, ctx.fetcher, [(owner, WRAPPED_SOL_MINT), (owner, usdc)], 10**9)
+            finally:
+                await ctx.close()
+        resolved = asyncio.run(run())
+
+        # create ATA for usdc, create and initialize the wrapped SOL account
+        self.assertEqual(len(resolved.instruction.instructions), 3)
+        self.assertEqual(len(resolved.instruction.cleanup_instructions), 1)
+        self.assertEqual(len(resolved.instruction.signers), 1)
+        self.assertEqual(resolved.pubkeys[0], resolved.instruction.signers[0].public_key)
+        self.assertEqual(resolved.pubkeys[1], TokenUtil.derive_ata(owner, usdc))
+        create_account = system_program.decode_create_account(resolved.instruction.instructions[1])
+        self.assertEqual(create_account.lamports, (128 + 165) * 3480 * 2 + 10**9)
+        # not hedged methods go to the fastest endpoint
+        self.assertIn(("get_epoch_info", "fast"), served)
+        self.assertNotIn(("get_epoch_info", "slow"), served)
+
+
+class RpcBatchClientTestCase(unittest.TestCase):
+    ENDPOINT = "http://localhost:8899"
+
+    def setUp(self):
+        self.posts = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        bodies = json.loads(request.content)
+        self.posts.append(bodies)
+        responses = []
+        for body in bodies:
+            if body["method"] == "getMinimumBalanceForRentExemption":
+                usize = body["params"][0]
+                if usize == 0:
+                    responses.append({"jsonrpc": "2.0", "id": body["id"], "error": {"code": -32602, "message": "invalid usize"}})
+                else:
+                    responses.append({"jsonrpc": "2.0", "id": body["id"], "result": (128 + usize) * 6960})
+            elif body["method"] == "getLatestBlockhash":
+                value = {"blockhash": str(Hash(bytes([7] * 32))), "lastValidBlockHeight": 100}
+                responses.append({"jsonrpc": "2.0", "id": body["id"], "result": {"context": {"slot": 1}, "value": value}})
+            elif body["method"] == "getAccountInfo":
+                responses.append({"jsonrpc": "2.0", "id": body["id"], "result": {"context": {"slot": 1}, "value": None}})
+        # out of order
+        return httpx.Response(200, json=list(reversed(responses)))
+
+    def run_batch(self, calls):
+        async def run():
+            session = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+            client = RpcBatchClient(AsyncClient(self.ENDPOINT), self.ENDPOINT, session=session)
+            try:
+                return await asyncio.gather(*[call(client) for call in calls], return_exceptions=True)
+            finally:
+                await session.aclose()
+        return asyncio.run(run())
+
+    def test_concurrent_calls_are_sent_in_one_post(self):
+        results = self.run_batch([
+            lambda client: client.get_minimum_balance_for_rent_exemption(165),
+            lambda client: client.get_latest_blockhash(),
+            lambda client: client.get_account_info(PublicKey(1)),
+            lambda client: client.get_minimum_balance_for_rent_exemption(82),
+        ])
+        self.assertEqual(len(self.posts), 1)
+        self.assertEqual([body["id"] for body in self.posts[0]], [0, 1, 2, 3])
+        # responses are mapped back by id
+        self.assertEqual(results[0].value, (128 + 165) * 6960)
+        self.assertEqual(results[1].value.last_valid_block_height, 100)
+        self.assertIsNone(results[2].value)
+        self.assertEqual(results[3].value, (128 + 82) * 6960)
+
+    def test_error_entry_raises(self):
+        results = self.run_batch([
+            lambda client: client.get_minimum_balance_for_rent_exemption(165),
+            lambda client: client.get_minimum_balance_for_rent_exemption(0),
+        ])
+        self.assertEqual(len(self.posts), 1)
+        self.assertEqual(results[0].value, (128 + 165) * 6960)
+        self.assertIsInstance(results[1], RPCException)
+
+    def test_max_batch_size(self):
+        async def run():
+            session = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+            client = RpcBatchClient(AsyncClient(self.ENDPOINT), self.ENDPOINT, max_batch_size=2, session=session)
+            try:
+                return await asyncio.gather(*[client.get_minimum_balance_for_rent_exemption(i) for i in range(1, 6)])
+            finally:
+                await session.aclose()
+        results = asyncio.run(run())
+        self.assertEqual([len(bodies) for bodies in self.posts], [2, 2, 1])
+        self.assertEqual([result.value for result in results], [(128 + i) * 6960 for i in range(1, 6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -63,8 +63,9 @@ async def main():
             data = msg[0].result.value.data
 
             whirlpool = program.coder.accounts.parse(data).data
-            price = PriceMath.sqrt_price_x64_to_price(whirlpool.sqrt_price, token_a_decimal, token_b_decimal)
-            print("whirlpool price", to_fixed(price, token_b_decimal), "@slot", slot)
+            # integer only formatting (no Decimal) on every message
+            price = PriceMath.sqrt_price_x64_to_price_str(whirlpool.sqrt_price, token_a_decimal, token_b_decimal, token_b_decimal)
+            print("whirlpool price", price, "@slot", slot)
 
         await websocket.account_unsubscribe(subscription_id)
 
@@ -2,7 +2,8 @@
 
 import math
 from typing import List
-from decimal import Decimal
+from decimal import Decimal, Context, ROUND_HALF_EVEN, localcontext
+from functools import lru_cache
 from solana.publickey import PublicKey
 from spl.token.instructions import get_associated_token_address
 from spl.token.core import MintInfo, AccountInfo
@@ -42,11 +43,30 @@ def div_floor(a: int, b: int) -> int:
     return math.floor(a / b)
 
 
+# local context, so that results don't depend on the caller's Decimal context
+DECIMAL_CONTEXT = Context(prec=100, rounding=ROUND_HALF_EVEN)
+
+
+@lru_cache(maxsize=None)
+def get_quantizer(decimals: int) -> Decimal:
+    return Decimal(1).scaleb(-decimals)
+
+
 def to_fixed(price: Decimal, decimals: int) -> Decimal:
+    return price.quantize(get_quantizer(decimals), context=DECIMAL_CONTEXT)
+
+
+def fraction_to_fixed_str(numerator: int, denominator: int, decimals: int) -> str:
+    # same result as str(to_fixed(Decimal(numerator) / Decimal(denominator), decimals)) with integer math only
+    q, r = divmod(numerator * 10**decimals, denominator)
+    if r * 2 > denominator or (r * 2 == denominator and q & 1 == 1):
+        q += 1  # ROUND_HALF_EVEN
+
+    digits = str(q)
     if decimals == 0:
-        return price.quantize(Decimal("1"))
-    else:
-        return price.quantize(Decimal("0." + "0"*(decimals-1) + "1"))
+        return digits
+    digits = digits.rjust(decimals + 1, "0")
+    return "{}.{}".format(digits[:-decimals], digits[-decimals:])
 
 
 def mul_shift(a: int, b: int, shift: int) -> int:
@@ -209,10 +229,24 @@ class PriceMath:
     # https://github.com/orca-so/whirlpools/blob/main/sdk/src/utils/public/price-math.ts#L22
     @staticmethod
     def sqrt_price_x64_to_price(sqrt_price_x64: int, decimals_a: int, decimals_b: int) -> Decimal:
-        decimal_adjust = Decimal(10)**(decimals_a - decimals_b)
-        price = MathUtil.from_x64(sqrt_price_x64)**2 * decimal_adjust
+        # independent from the caller's Decimal context
+        with localcontext(DECIMAL_CONTEXT):
+            decimal_adjust = Decimal(10)**(decimals_a - decimals_b)
+            price = MathUtil.from_x64(sqrt_price_x64)**2 * decimal_adjust
         return price
 
+    @staticmethod
+    def sqrt_price_x64_to_price_str(sqrt_price_x64: int, decimals_a: int, decimals_b: int, decimals: int) -> str:
+        # fast path for display: price as fixed-point string using integer math only
+        numerator = sqrt_price_x64**2
+        denominator = 1 << 128
+        decimals_diff = decimals_a - decimals_b
+        if decimals_diff >= 0:
+            numerator *= 10**decimals_diff
+        else:
+            denominator *= 10**(-decimals_diff)
+        return fraction_to_fixed_str(numerator, denominator, decimals)
+
     # https://orca-so.github.io/whirlpools/classes/PriceMath.html#sqrtPriceX64ToTickIndex
     # https://github.com/orca-so/whirlpools/blob/2df89bb/sdk/src/utils/public/price-math.ts#L49
     @staticmethod
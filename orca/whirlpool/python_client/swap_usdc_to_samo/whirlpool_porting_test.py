@@ -1,5 +1,5 @@
 import unittest
-from decimal import Decimal
+from decimal import Decimal, Context, ROUND_DOWN, localcontext
 from solana.publickey import PublicKey
 
 from whirlpool_porting import ORCA_WHIRLPOOL_PROGRAM_ID, ORCA_WHIRLPOOLS_CONFIG, PoolUtil, derive_ata, to_fixed, DecimalUtil, PriceMath, SwapUtil, PDAUtil, TickUtil, MIN_TICK_INDEX, MAX_TICK_INDEX, MIN_SQRT_PRICE, MAX_SQRT_PRICE, U64_MAX, TICK_ARRAY_SIZE
@@ -124,6 +124,13 @@ class PriceMathTestCase(unittest.TestCase):
         expected = 1584
         self.assertEqual(result, expected)
 
+    def test_sqrt_price_x64_to_price_uses_local_context(self):
+        expected = PriceMath.sqrt_price_x64_to_price(3253078221838975758, 9, 6)
+        with localcontext(Context(prec=5, rounding=ROUND_DOWN)):
+            result = PriceMath.sqrt_price_x64_to_price(3253078221838975758, 9, 6)
+        self.assertEqual(result, expected)
+        self.assertEqual(to_fixed(result, 6), Decimal("31.099225"))
+
     def test_sqrt_price_x64_to_price_01(self):
         result = PriceMath.sqrt_price_x64_to_price(1 << 64, 9, 6)
         expected = 1000
@@ -139,6 +146,27 @@ class PriceMathTestCase(unittest.TestCase):
         expected = Decimal("0.9398901994968307280837320329027312154207")
         self.assertTrue(abs(result - expected) < 0.000000001)
 
+    def test_sqrt_price_x64_to_price_str_01(self):
+        result = PriceMath.sqrt_price_x64_to_price_str(1 << 64, 9, 6, 6)
+        expected = "1000.000000"
+        self.assertEqual(result, expected)
+
+    def test_sqrt_price_x64_to_price_str_02(self):
+        sqrt_price_x64 = 3262859719519939898
+        result = PriceMath.sqrt_price_x64_to_price_str(sqrt_price_x64, 9, 6, 6)
+        expected = str(to_fixed(PriceMath.sqrt_price_x64_to_price(sqrt_price_x64, 9, 6), 6))
+        self.assertEqual(result, expected)
+
+    def test_sqrt_price_x64_to_price_str_03(self):
+        result = PriceMath.sqrt_price_x64_to_price_str(17883737353544829048, 6, 9, 4)
+        expected = "0.0009"
+        self.assertEqual(result, expected)
+
+    def test_sqrt_price_x64_to_price_str_04(self):
+        result = PriceMath.sqrt_price_x64_to_price_str(2780551521206535680, 9, 6, 0)
+        expected = "23"
+        self.assertEqual(result, expected)
+
     def test_tick_index_to_price_01(self):
         result = PriceMath.tick_index_to_price(0, 9, 6)
         expected = Decimal("1000")
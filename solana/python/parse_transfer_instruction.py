@@ -1,5 +1,5 @@
 from enum import IntEnum
-from typing import List
+from typing import List, Optional, Tuple
 from solders.instruction import Instruction, AccountMeta
 from solana.rpc.api import Client
 from solana.transaction import Signature
@@ -46,6 +46,14 @@ def main():
 # see: https://kevinheavey.github.io/solders/api_reference/transaction_status.html
 # see: https://kevinheavey.github.io/solders/api_reference/instruction.html
 def flatten_instructions(tx: solders.transaction_status.EncodedTransactionWithStatusMeta) -> List[Instruction]:
+    return [ix for _, _, ix in flatten_instructions_with_index(tx)]
+
+
+# (outer index, inner index (None for outer instruction), instruction)
+IndexedInstruction = Tuple[int, Optional[int], Instruction]
+
+
+def flatten_instructions_with_index(tx: solders.transaction_status.EncodedTransactionWithStatusMeta) -> List[IndexedInstruction]:
     meta = tx.meta
     message = tx.transaction.message
     instructions = tx.transaction.message.instructions
@@ -57,17 +65,21 @@ def flatten_instructions(tx: solders.transaction_status.EncodedTransactionWithSt
     readonly_keys = meta.loaded_addresses.readonly
     keys = [*static_keys, *writable_keys, *readonly_keys]
 
+    # outer index -> inner instructions (one pass, instead of scanning inner_instructions for each outer instruction)
+    inner_instructions_map = {}
+    for inner in inner_instructions or []:
+        inner_instructions_map.setdefault(inner.index, []).extend(inner.instructions)
+
     # flatten outer/inner instructions
-    all_instructions: List[solders.transaction_status.UiCompiledInstruction] = []
+    all_instructions: List[Tuple[int, Optional[int], solders.transaction_status.UiCompiledInstruction]] = []
     for outer_index, outer in enumerate(instructions):
-        all_instructions.append(outer)
-        for inner in inner_instructions:
-            if inner.index == outer_index:
-                all_instructions.extend(inner.instructions)
+        all_instructions.append((outer_index, None, outer))
+        for inner_index, inner in enumerate(inner_instructions_map.get(outer_index, [])):
+            all_instructions.append((outer_index, inner_index, inner))
 
     # decode to Instruction type
-    all_decoded_instructions: List[Instruction] = []
-    for ix in all_instructions:
+    all_decoded_instructions: List[IndexedInstruction] = []
+    for outer_index, inner_index, ix in all_instructions:
         # Pubkey to AccountMeta
         accounts = list(map(
             # we are not interested in is_signer, is_writable, so just set False...
@@ -75,11 +87,11 @@ def flatten_instructions(tx: solders.transaction_status.EncodedTransactionWithSt
             ix.accounts
         ))
 
-        all_decoded_instructions.append(Instruction(
+        all_decoded_instructions.append((outer_index, inner_index, Instruction(
             program_id=keys[ix.program_id_index],
             accounts=accounts,
             data=base58.b58decode(ix.data),
-        ))
+        )))
 
     return all_decoded_instructions
 
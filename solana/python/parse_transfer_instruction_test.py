@@ -0,0 +1,130 @@
+import json
+import unittest
+from solders.pubkey import Pubkey
+from solders.rpc.responses import GetTransactionResp
+from spl.token.constants import TOKEN_PROGRAM_ID
+
+from parse_transfer_instruction import IsSPLTokenTransfer, flatten_instructions, flatten_instructions_with_index, is_spl_token_transfer
+
+
+def build_pubkey(i: int) -> Pubkey:
+    return Pubkey(bytes([i] * 32))
+
+
+PAYER = build_pubkey(1)
+SOURCE = build_pubkey(2)
+DEST = build_pubkey(3)
+MEMO_PROGRAM_ID = build_pubkey(4)
+# loaded from the address lookup table
+LOADED_SOURCE = build_pubkey(5)
+LOADED_MINT = build_pubkey(6)
+LOOKUP_TABLE = build_pubkey(7)
+
+# base58 encoded instruction data
+TRANSFER_100 = "3WBgs5fm8oDy"  # Transfer, amount 100
+TRANSFER_CHECKED_200 = "iebpfJqb8eMw3"  # TransferChecked, amount 200, decimals 6
+MEMO = "3oBige"  # b"memo"
+
+# account keys: static (0-3, 4 is the memo program), loaded writable (5), loaded readonly (6)
+PAYER_INDEX, SOURCE_INDEX, DEST_INDEX, TOKEN_PROGRAM_INDEX, MEMO_PROGRAM_INDEX, LOADED_SOURCE_INDEX, LOADED_MINT_INDEX = range(7)
+
+
+def build_compiled_instruction(program_id_index: int, accounts, data: str):
+    return {"programIdIndex": program_id_index, "accounts": accounts, "data": data}
+
+
+def build_transaction(instructions, inner_instructions):
+    resp = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {
+            "slot": 1,
+            "blockTime": None,
+            "version": 0,
+            "transaction": {
+                "signatures": ["1" * 64],
+                "message": {
+                    "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0, "numReadonlyUnsignedAccounts": 2},
+                    "accountKeys": [str(PAYER), str(SOURCE), str(DEST), str(TOKEN_PROGRAM_ID), str(MEMO_PROGRAM_ID)],
+                    "recentBlockhash": "1" * 32,
+                    "instructions": instructions,
+                    "addressTableLookups": [{"accountKey": str(LOOKUP_TABLE), "writableIndexes": [0], "readonlyIndexes": [1]}],
+                },
+            },
+            "meta": {
+                "err": None,
+                "status": {"Ok": None},
+                "fee": 5000,
+                "preBalances": [0, 0, 0, 0, 0, 0, 0],
+                "postBalances": [0, 0, 0, 0, 0, 0, 0],
+                "innerInstructions": inner_instructions,
+                "logMessages": [],
+                "preTokenBalances": [],
+                "postTokenBalances": [],
+                "rewards": [],
+                "loadedAddresses": {"writable": [str(LOADED_SOURCE)], "readonly": [str(LOADED_MINT)]},
+            },
+        },
+    }
+    return GetTransactionResp.from_json(json.dumps(resp)).value.transaction
+
+
+class FlattenInstructionsTestCase(unittest.TestCase):
+    def setUp(self):
+        memo = build_compiled_instruction(MEMO_PROGRAM_INDEX, [PAYER_INDEX], MEMO)
+        transfer = build_compiled_instruction(TOKEN_PROGRAM_INDEX, [SOURCE_INDEX, DEST_INDEX, PAYER_INDEX], TRANSFER_100)
+        transfer_checked = build_compiled_instruction(TOKEN_PROGRAM_INDEX, [LOADED_SOURCE_INDEX, LOADED_MINT_INDEX, DEST_INDEX, PAYER_INDEX], TRANSFER_CHECKED_200)
+        empty = build_compiled_instruction(MEMO_PROGRAM_INDEX, [], "")
+
+        self.tx = build_transaction(
+            [memo, transfer, empty],
+            # not sorted by index, and inner instructions of an outer instruction in two entries
+            [
+                {"index": 2, "instructions": [transfer_checked]},
+                {"index": 0, "instructions": [transfer, memo]},
+                {"index": 2, "instructions": [memo]},
+            ],
+        )
+
+    def test_flatten_instructions_with_index(self):
+        flattened = flatten_instructions_with_index(self.tx)
+
+        # outer instruction first, then its inner instructions
+        self.assertEqual([(outer_index, inner_index) for outer_index, inner_index, _ in flattened], [
+            (0, None), (0, 0), (0, 1),
+            (1, None),
+            (2, None), (2, 0), (2, 1),
+        ])
+        self.assertEqual([ix.program_id for _, _, ix in flattened], [
+            MEMO_PROGRAM_ID, TOKEN_PROGRAM_ID, MEMO_PROGRAM_ID,
+            TOKEN_PROGRAM_ID,
+            MEMO_PROGRAM_ID, TOKEN_PROGRAM_ID, MEMO_PROGRAM_ID,
+        ])
+        self.assertEqual([ix.data for _, _, ix in flattened], [
+            b"memo", bytes([3]) + (100).to_bytes(8, "little"), b"memo",
+            bytes([3]) + (100).to_bytes(8, "little"),
+            b"", bytes([12]) + (200).to_bytes(8, "little") + bytes([6]), b"memo",
+        ])
+
+        # account indexes beyond the static keys point to the loaded addresses (writable first)
+        _, _, transfer_checked = flattened[5]
+        self.assertEqual([meta.pubkey for meta in transfer_checked.accounts], [LOADED_SOURCE, LOADED_MINT, DEST, PAYER])
+        self.assertEqual(flattened[4][2].accounts, [])
+
+    def test_flatten_instructions(self):
+        self.assertEqual(flatten_instructions(self.tx), [ix for _, _, ix in flatten_instructions_with_index(self.tx)])
+
+    def test_without_inner_instructions(self):
+        tx = build_transaction([build_compiled_instruction(MEMO_PROGRAM_INDEX, [PAYER_INDEX], MEMO)], [])
+        self.assertEqual([(outer_index, inner_index) for outer_index, inner_index, _ in flatten_instructions_with_index(tx)], [(0, None)])
+
+    def test_is_spl_token_transfer(self):
+        self.assertEqual([is_spl_token_transfer(ix) for _, _, ix in flatten_instructions_with_index(self.tx)], [
+            IsSPLTokenTransfer.FALSE, IsSPLTokenTransfer.TRUE_TRANSFER, IsSPLTokenTransfer.FALSE,
+            IsSPLTokenTransfer.TRUE_TRANSFER,
+            IsSPLTokenTransfer.FALSE, IsSPLTokenTransfer.TRUE_TRANSFER_CHECKED, IsSPLTokenTransfer.FALSE,
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+from solana.keypair import Keypair
+from solana.publickey import PublicKey
+from solana.rpc.commitment import Confirmed
+from solana.rpc.api import Client
+from solana.transaction import TransactionInstruction, Transaction, AccountMeta
+from solana import system_program
+from spl.token.constants import TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT
+from spl.token import instructions as token_program
+from spl.token._layouts import ACCOUNT_LAYOUT
+import base64
+import json
+import math
+
+RPC_ENDPOINT_URL = "https://api.devnet.solana.com"
+WALLET_JSON = "dev_wallet.json"
+
+# https://github.com/solana-labs/solana-program-library/blob/token-v3.5.0/token/program/src/instruction.rs
+SYNC_NATIVE_INSTRUCTION_INDEX = 17
+
+def load_keypair_from_jsonfile(path: str) -> Keypair:
+    raw_json = json.load(open(path, 'r'))
+    return Keypair.from_secret_key(bytes(raw_json))
+
+def ui_amount_to_u64(amount: float, decimals: int) -> int:
+    return math.floor(amount * 10**decimals)
+
+def sync_native(account: PublicKey) -> TransactionInstruction:
+    return TransactionInstruction(
+        keys=[AccountMeta(account, False, True)],
+        program_id=TOKEN_PROGRAM_ID,
+        data=bytes([SYNC_NATIVE_INSTRUCTION_INDEX]))
+
+def prepare_persistent_wsol_token_account_instructions(
+    connection: Client,
+    funder: Keypair,
+    owner: PublicKey,
+    lamports: int,
+) -> (PublicKey, list[TransactionInstruction]):
+    # WSOL ATA is kept open, so no new keypair (signer) and no close instruction are needed.
+    # only if the wrapped balance is not enough, lamports are transferred and sync_native updates the balance.
+    wsol_ata = token_program.get_associated_token_address(owner, WRAPPED_SOL_MINT)
+    account = connection.get_account_info(wsol_ata)["result"]["value"]
+
+    instructions = []
+    if account is None:
+        instructions.append(token_program.create_associated_token_account(funder.public_key, owner, WRAPPED_SOL_MINT))
+        wrapped_lamports = 0
+    else:
+        wrapped_lamports = ACCOUNT_LAYOUT.parse(base64.b64decode(account["data"][0])).amount
+
+    if wrapped_lamports < lamports:
+        instructions.append(system_program.transfer(system_program.TransferParams(
+            from_pubkey=funder.public_key,
+            to_pubkey=wsol_ata,
+            lamports=lamports - wrapped_lamports)))
+        instructions.append(sync_native(wsol_ata))
+
+    return (wsol_ata, instructions)
+
+def main():
+    wallet = load_keypair_from_jsonfile(WALLET_JSON)
+    connection = Client(RPC_ENDPOINT_URL)
+    print("wallet pubkey", wallet.public_key.to_base58())
+    print("endpoint", RPC_ENDPOINT_URL)
+
+    wrapping_lamports = ui_amount_to_u64(0.01, 9)
+    print("wrapping lamports", wrapping_lamports)
+
+    # get persistent WSOL token account and instructions to top up its wrapped balance
+    # (see create_delete_wsol_account.py for temporary WSOL token account)
+    wsol_ata, prepare_ixs = prepare_persistent_wsol_token_account_instructions(
+        connection=connection,
+        funder=wallet,
+        owner=wallet.public_key,
+        lamports=wrapping_lamports)
+    print("wsol token account address", wsol_ata.to_base58())
+    print("prepare instructions", len(prepare_ixs))
+
+    if len(prepare_ixs) == 0:
+        print("wrapped balance is enough")
+        return
+
+    # build tx
+    tx = Transaction(fee_payer=wallet.public_key)
+    tx.add(*prepare_ixs)
+    # add some instructions using wsol_ata
+    signers = [wallet]
+
+    # execute tx
+    signature = connection.send_transaction(tx, *signers)["result"]
+    print("signature", signature)
+    connection.confirm_transaction(signature, Confirmed)
+    print("confirmed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+from solders.pubkey import Pubkey
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Commitment
+from solana.transaction import Signature
+from spl.token.instructions import decode_transfer, decode_transfer_checked
+import solders
+
+from parse_transfer_instruction import IsSPLTokenTransfer, flatten_instructions_with_index, is_spl_token_transfer
+
+RPC_ENDPOINT_URL = "https://api.mainnet-beta.solana.com"
+
+
+@dataclass(frozen=True)
+class TransferRecord:
+    signature: str
+    slot: int
+    outer_index: int
+    inner_index: Optional[int]  # None if the transfer is an outer instruction
+    source: Pubkey
+    dest: Pubkey
+    owner: Pubkey
+    amount: int
+    checked: bool
+    # available only for TransferChecked
+    mint: Optional[Pubkey]
+    decimals: Optional[int]
+
+
+class TransferExtractor:
+    # fetches many transactions concurrently and streams their SPL Token transfers.
+    # max_concurrency limits in-flight getTransaction requests (public RPC endpoints are rate limited).
+    def __init__(self, connection: AsyncClient, max_concurrency: int = 8, commitment: Optional[Commitment] = None, include_failed: bool = False):
+        self._connection = connection
+        self._max_concurrency = max_concurrency
+        self._commitment = commitment
+        self._include_failed = include_failed
+
+    async def extract(self, signatures: List[str]) -> AsyncIterator[TransferRecord]:
+        # records of a transaction are yielded in instruction order,
+        # transactions are yielded in the order they are fetched (not the order of signatures)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def fetch(signature: str):
+            async with semaphore:
+                res = await self._connection.get_transaction(
+                    tx_sig=Signature.from_string(signature),
+                    encoding="json",
+                    commitment=self._commitment,
+                    max_supported_transaction_version=0
+                )
+                return signature, res.value
+
+        tasks = [asyncio.ensure_future(fetch(signature)) for signature in signatures]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                signature, tx = await completed
+                # not found (not confirmed yet or out of the RPC's history)
+                if tx is None:
+                    continue
+                for record in self.extract_from_transaction(signature, tx):
+                    yield record
+        finally:
+            # consumer stopped early or fetch failed
+            for task in tasks:
+                task.cancel()
+
+    def extract_from_transaction(self, signature: str, tx: solders.transaction_status.EncodedConfirmedTransactionWithStatusMeta) -> List[TransferRecord]:
+        encoded_tx = tx.transaction
+        if encoded_tx.meta is not None and encoded_tx.meta.err is not None and not self._include_failed:
+            return []
+
+        records = []
+        for outer_index, inner_index, ix in flatten_instructions_with_index(encoded_tx):
+            is_spl_token_transfer_ix = is_spl_token_transfer(ix)
+
+            if is_spl_token_transfer_ix == IsSPLTokenTransfer.FALSE:
+                continue
+            elif is_spl_token_transfer_ix == IsSPLTokenTransfer.TRUE_TRANSFER:
+                decoded = decode_transfer(ix)
+                mint, decimals = None, None
+            elif is_spl_token_transfer_ix == IsSPLTokenTransfer.TRUE_TRANSFER_CHECKED:
+                decoded = decode_transfer_checked(ix)
+                mint, decimals = decoded.mint, decoded.decimals
+
+            records.append(TransferRecord(
+                signature=signature,
+                slot=tx.slot,
+                outer_index=outer_index,
+                inner_index=inner_index,
+                source=decoded.source,
+                dest=decoded.dest,
+                owner=decoded.owner,
+                amount=decoded.amount,
+                checked=is_spl_token_transfer_ix == IsSPLTokenTransfer.TRUE_TRANSFER_CHECKED,
+                mint=mint,
+                decimals=decimals,
+            ))
+        return records
+
+
+async def main():
+    connection = AsyncClient(RPC_ENDPOINT_URL)
+
+    signatures = [
+        # https://solana.fm/tx/HadZphETZ62rKTK2CYtZiqJrxHfNpfmP16bHYwJPxQaQbVdvDWxKuaA1dbRosNw88yJdNAMHkaxFkvE8NviMVC3?cluster=mainnet-solanafmbeta
+        "HadZphETZ62rKTK2CYtZiqJrxHfNpfmP16bHYwJPxQaQbVdvDWxKuaA1dbRosNw88yJdNAMHkaxFkvE8NviMVC3",
+    ]
+
+    extractor = TransferExtractor(connection, max_concurrency=4)
+    async for record in extractor.extract(signatures):
+        print(record.signature[:8], record.outer_index, record.inner_index, record.source, "=>", record.dest, "amount(u64)", record.amount)
+
+    await connection.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())